@@ -0,0 +1,129 @@
+# Content-Addressed Blob Store
+
+import hashlib
+import zlib
+
+
+# Blobs at least this many bytes long are stored zlib-compressed
+DEFAULT_COMPRESS_THRESHOLD = 512
+
+INSERT_BLOB = "INSERT OR IGNORE INTO blobs (hash, size, compressed, data) VALUES (?, ?, ?, ?)"
+
+
+def content_hash(text):
+    """
+    Compute the content address of a text.
+    
+    Args:
+        text (str): The text.
+    
+    Returns:
+        str: The hex SHA-256 digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_blob(text, compress_threshold=DEFAULT_COMPRESS_THRESHOLD):
+    """
+    Encode a text for storage, compressing it if it is large enough.
+    
+    Compression is only kept when it actually makes the blob smaller.
+    
+    Args:
+        text (str): The text.
+        compress_threshold (int, optional): Minimum size in bytes to compress.
+            Defaults to DEFAULT_COMPRESS_THRESHOLD.
+    
+    Returns:
+        tuple: (size, compressed, data) with the uncompressed size in bytes,
+            whether data is compressed, and the stored bytes.
+    """
+    data = text.encode("utf-8")
+    size = len(data)
+    if size >= compress_threshold:
+        packed = zlib.compress(data, 6)
+        if len(packed) < size:
+            return size, True, packed
+    return size, False, data
+
+
+def decode_blob(compressed, data):
+    """
+    Decode a stored blob back into its text.
+    
+    Args:
+        compressed (bool): Whether the data is compressed.
+        data (bytes): The stored bytes.
+    
+    Returns:
+        str: The text.
+    """
+    if compressed:
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def store_blobs(conn, texts, compress_threshold=DEFAULT_COMPRESS_THRESHOLD):
+    """
+    Store texts in the blobs table, each distinct text only once.
+    
+    Texts already in the table are neither compressed nor written again.
+    The caller must hold the writer connection.
+    
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+        texts (iterable): The texts to store.
+        compress_threshold (int, optional): Minimum size in bytes to compress.
+            Defaults to DEFAULT_COMPRESS_THRESHOLD.
+    
+    Returns:
+        dict: Mapping of each text to its hash.
+    """
+    hashes = {}
+    for text in texts:
+        if text not in hashes:
+            hashes[text] = content_hash(text)
+    if not hashes:
+        return hashes
+    
+    by_hash = {digest: text for text, digest in hashes.items()}
+    existing = set()
+    digests = list(by_hash)
+    # Stay below SQLite's limit on bound parameters
+    for i in range(0, len(digests), 500):
+        chunk = digests[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        existing.update(row[0] for row in conn.execute(
+            f"SELECT hash FROM blobs WHERE hash IN ({placeholders})", chunk
+        ))
+    
+    rows = []
+    for digest, text in by_hash.items():
+        if digest not in existing:
+            rows.append((digest, *encode_blob(text, compress_threshold)))
+    if rows:
+        conn.executemany(INSERT_BLOB, rows)
+    return hashes
+
+
+def load_blobs(conn, hashes):
+    """
+    Load texts from the blobs table.
+    
+    Args:
+        conn (sqlite3.Connection): A connection to read with.
+        hashes (iterable): The hashes to load.
+    
+    Returns:
+        dict: Mapping of hash to text, for the hashes that were found.
+    """
+    digests = list(set(hashes))
+    texts = {}
+    for i in range(0, len(digests), 500):
+        chunk = digests[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for digest, compressed, data in conn.execute(
+            f"SELECT hash, compressed, data FROM blobs WHERE hash IN ({placeholders})", chunk
+        ):
+            texts[digest] = decode_blob(compressed, data)
+    return texts
@@ -0,0 +1,189 @@
+# SQLite Connection Manager
+
+import atexit
+import itertools
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionManager:
+    """
+    Class handing out SQLite connections for a single database file.
+    
+    There is one shared manager per database path. Each thread gets its own
+    read-only connection, while all writes go through a single writer
+    connection guarded by a lock. The database runs in WAL mode so readers
+    never wait for the writer, and schema setup runs once per process.
+    """
+    
+    _managers = {}
+    _managers_lock = threading.Lock()
+    _memory_ids = itertools.count(1)
+    
+    def __init__(self, db_path, busy_timeout_ms=5000):
+        """
+        Initialize the manager and open the writer connection.
+        
+        Args:
+            db_path (str): Path to the SQLite database file, or ":memory:".
+            busy_timeout_ms (int, optional): How long a connection waits on a locked
+                database before failing, in milliseconds. Defaults to 5000.
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        if db_path == ":memory:":
+            # A named shared-cache database, so every connection sees the same data
+            self._target = f"file:agent_memdb_{next(self._memory_ids)}?mode=memory&cache=shared"
+        else:
+            self._target = db_path
+        
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self.log_writer = None
+        self.closed = False
+        
+        self._writer = self._open(read_only=False)
+        if db_path != ":memory:":
+            # Only takes effect on a new file: lets log retention release pages incrementally
+            self._writer.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._writer.execute("PRAGMA journal_mode=WAL")
+            self._writer.execute("PRAGMA synchronous=NORMAL")
+    
+    @classmethod
+    def get(cls, db_path, busy_timeout_ms=5000):
+        """
+        Get the shared manager for a database, creating it on first use.
+        
+        In-memory databases are never shared, each call gets a new one.
+        
+        Args:
+            db_path (str): Path to the SQLite database file.
+            busy_timeout_ms (int, optional): Busy timeout for new managers. Defaults to 5000.
+        
+        Returns:
+            ConnectionManager: The shared manager.
+        """
+        if db_path == ":memory:":
+            manager = cls(db_path, busy_timeout_ms)
+            atexit.register(manager.close)
+            return manager
+        
+        key = os.path.abspath(db_path)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None or manager.closed:
+                manager = cls(db_path, busy_timeout_ms)
+                cls._managers[key] = manager
+                atexit.register(manager.close)
+            return manager
+    
+    def _open(self, read_only):
+        """
+        Open a new connection with the manager's settings.
+        
+        Args:
+            read_only (bool): Whether the connection may only read.
+        
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        uri = self._target.startswith("file:")
+        conn = sqlite3.connect(
+            self._target,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            uri=uri
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+    
+    def reader(self):
+        """
+        Get the calling thread's read-only connection.
+        
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open(read_only=True)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    @contextmanager
+    def writer(self):
+        """
+        Hold the writer connection for one transaction.
+        
+        The transaction is committed when the block exits normally and rolled
+        back if it raises.
+        
+        Yields:
+            sqlite3.Connection: The writer connection.
+        """
+        with self._write_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+    
+    def initialize_schema(self, create_schema):
+        """
+        Run schema setup once for this database.
+        
+        Args:
+            create_schema (callable): Called with the writer connection inside a transaction.
+        """
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            with self.writer() as conn:
+                create_schema(conn)
+            self._schema_ready = True
+    
+    def get_log_writer(self, batch_size=100, flush_interval=0.5, max_queue=10000):
+        """
+        Get the database's background log writer, starting it on first use.
+        
+        Args:
+            batch_size (int, optional): Maximum number of logs per transaction. Defaults to 100.
+            flush_interval (float, optional): Maximum seconds a log waits before being written. Defaults to 0.5.
+            max_queue (int, optional): Maximum number of pending logs. Defaults to 10000.
+        
+        Returns:
+            LogWriter: The shared log writer.
+        """
+        from agent.log_writer import LogWriter
+        
+        with self._schema_lock:
+            if self.log_writer is None:
+                self.log_writer = LogWriter(self, batch_size, flush_interval, max_queue)
+            return self.log_writer
+    
+    def close(self):
+        """
+        Drain the log writer and close every connection.
+        """
+        if self.closed:
+            return
+        if self.log_writer is not None:
+            self.log_writer.close()
+        self.closed = True
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+        with self._write_lock:
+            self._writer.close()
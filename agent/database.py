@@ -1,12 +1,33 @@
 # Database Module for AI Agent
 
+import heapq
 import sqlite3
 import os
 import json
+import re
+from datetime import datetime, timedelta, timezone
+
+from agent.blob_store import load_blobs, store_blobs
+from agent.connection import ConnectionManager
+from agent.log_archive import LogArchive, copy_lengths
+from agent.log_writer import (
+    blob_compress_threshold, current_timestamp, insert_logs, load_tool_results, reference_results,
+    stored_results
+)
+
+
+# Counts changes to the tools table, so derived indexes can tell they are stale
+BUMP_TOOL_CATALOG_VERSION = """
+    INSERT INTO meta (key, value) VALUES ('tool_catalog_version', 1)
+    ON CONFLICT (key) DO UPDATE SET value = value + 1
+"""
 
 class AgentDatabase:
     """
     Class for managing the embedded SQLite database for the AI Agent.
+    
+    All instances opened on the same file share one ConnectionManager, so
+    reads use a per-thread connection and writes go through a single writer.
     """
     
     def __init__(self, db_path):
@@ -17,8 +38,12 @@ class AgentDatabase:
             db_path (str): Path to the SQLite database file.
         """
         self.db_path = db_path
-        self.conn = None
-        self.cursor = None
+        self.manager = None
+        self.log_writer = None
+        self.archive = LogArchive(os.getenv(
+            "LOG_ARCHIVE_DIR",
+            os.path.join(os.path.dirname(db_path) if db_path != ":memory:" else "", "archive")
+        ))
     
     def connect(self):
         """
@@ -30,13 +55,15 @@ class AgentDatabase:
         try:
             # Ensure the directory exists
             db_dir = os.path.dirname(self.db_path)
-            if not os.path.exists(db_dir):
-                os.makedirs(db_dir)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
                 print(f"Created database directory: {db_dir}")
-                
+            
             # Connect to the database (will create it if it doesn't exist)
-            self.conn = sqlite3.connect(self.db_path)
-            self.cursor = self.conn.cursor()
+            self.manager = ConnectionManager.get(
+                self.db_path,
+                busy_timeout_ms=int(os.getenv("DATABASE_BUSY_TIMEOUT_MS", "5000"))
+            )
             print(f"Connected to database: {self.db_path}")
             return True
         except sqlite3.Error as e:
@@ -45,54 +72,188 @@ class AgentDatabase:
     
     def disconnect(self):
         """
-        Disconnect from the SQLite database.
+        Disconnect from the SQLite database, writing any queued logs first.
+        
+        The shared connections stay open for other users of the same file and
+        are closed when the process exits.
         """
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
+        self.flush_logs()
+        self.log_writer = None
+        self.manager = None
+    
+    def _ensure_connected(self):
+        """
+        Connect if not already connected.
+        
+        Returns:
+            bool: True if connected, False otherwise.
+        """
+        if self.manager is None or self.manager.closed:
+            return self.connect()
+        return True
     
     def initialize_database(self):
         """
         Initialize the database by creating necessary tables if they don't exist.
         
+        The schema is only created once per process, however many
+        AgentDatabase instances share the file.
+        
         Returns:
             bool: True if initialization successful, False otherwise.
         """
-        if not self.conn:
-            if not self.connect():
-                return False
+        if not self._ensure_connected():
+            return False
         
         try:
-            # Create tools table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tools (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    vector_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create logs table for storing interaction logs
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS logs (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    user_query TEXT,
-                    agent_response TEXT,
-                    tools_used TEXT
-                )
-            """)
-            
-            self.conn.commit()
+            self.manager.initialize_schema(self._create_schema)
             return True
         except sqlite3.Error as e:
             print(f"Database initialization error: {e}")
             return False
     
-    def add_tool(self, name, description, vector_data=None):
+    def _create_schema(self, conn):
+        """
+        Create the tables.
+        
+        Args:
+            conn (sqlite3.Connection): The writer connection.
+        """
+        # Create tools table
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tools (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                vector_data TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                category TEXT
+            )
+        """)
+        if "category" not in [row[1] for row in conn.execute("PRAGMA table_info(tools)")]:
+            conn.execute("ALTER TABLE tools ADD COLUMN category TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tools_category ON tools (category)")
+        
+        # Create logs table for storing interaction logs
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                user_query TEXT,
+                agent_response TEXT,
+                tools_used TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)")
+        
+        # Create tool_calls table, one row per tool used in a logged interaction
+        backfill = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tool_calls'"
+        ).fetchone() is None
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tool_calls (
+                id INTEGER PRIMARY KEY,
+                log_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
+                tool_name TEXT NOT NULL,
+                result_length INTEGER,
+                response_length INTEGER,
+                result_hash TEXT
+            )
+        """)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(tool_calls)")]
+        if "result_hash" not in columns:
+            conn.execute("ALTER TABLE tool_calls ADD COLUMN result_hash TEXT")
+            conn.execute("""
+                UPDATE tool_calls SET result_hash = (
+                    SELECT json_extract(tool.value, '$.result_hash')
+                    FROM logs, json_each(logs.tools_used) AS tool
+                    WHERE logs.id = tool_calls.log_id AND tool.key = tool_calls.position
+                      AND json_valid(logs.tools_used)
+                )
+            """)
+        # Covering indexes: windowed counts scan the first, per-tool
+        # statistics scan one tool's range of the other two
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_calls_timestamp ON tool_calls (timestamp, tool_name)")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tool_calls_response
+            ON tool_calls (tool_name, timestamp, response_length)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tool_calls_result
+            ON tool_calls (tool_name, timestamp, result_length)
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_calls_log ON tool_calls (log_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_calls_result_hash ON tool_calls (result_hash)")
+        
+        # Create blobs table, holding each distinct tool result once
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                compressed INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+        """)
+        
+        # Create meta table for database-wide counters
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value
+            )
+        """)
+        
+        # Create logs_fts full-text index over the queries and answers of logs,
+        # kept in sync by triggers so the batched writer needs no extra work
+        index_logs = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'logs_fts'"
+        ).fetchone() is None
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+                user_query, agent_response,
+                content='logs', content_rowid='id', tokenize='porter unicode61'
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN
+                INSERT INTO logs_fts (rowid, user_query, agent_response)
+                VALUES (new.id, new.user_query, new.agent_response);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN
+                INSERT INTO logs_fts (logs_fts, rowid, user_query, agent_response)
+                VALUES ('delete', old.id, old.user_query, old.agent_response);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS logs_fts_update AFTER UPDATE OF user_query, agent_response ON logs BEGIN
+                INSERT INTO logs_fts (logs_fts, rowid, user_query, agent_response)
+                VALUES ('delete', old.id, old.user_query, old.agent_response);
+                INSERT INTO logs_fts (rowid, user_query, agent_response)
+                VALUES (new.id, new.user_query, new.agent_response);
+            END
+        """)
+        if index_logs:
+            conn.execute("INSERT INTO logs_fts (logs_fts) VALUES ('rebuild')")
+        
+        if backfill:
+            # Split the tools of logs written before the table existed
+            conn.execute("""
+                INSERT INTO tool_calls (
+                    log_id, position, timestamp, tool_name, result_length, response_length, result_hash
+                )
+                SELECT logs.id, CAST(tool.key AS INTEGER), logs.timestamp,
+                       COALESCE(json_extract(tool.value, '$.name'), tool.value),
+                       length(json_extract(tool.value, '$.result')), length(logs.agent_response),
+                       json_extract(tool.value, '$.result_hash')
+                FROM logs, json_each(logs.tools_used) AS tool
+                WHERE logs.tools_used IS NOT NULL AND json_valid(logs.tools_used)
+            """)
+    
+    def add_tool(self, name, description, vector_data=None, category=None):
         """
         Add a tool to the database.
         
@@ -100,26 +261,84 @@ class AgentDatabase:
             name (str): Name of the tool.
             description (str): Description of the tool.
             vector_data (list, optional): Vector representation of the tool. Defaults to None.
+            category (str, optional): Category of the tool. Defaults to None.
         
         Returns:
             int: The ID of the inserted tool, or -1 if an error occurred.
         """
-        if not self.conn:
-            if not self.connect():
-                return -1
+        if not self._ensure_connected():
+            return -1
         
         try:
             vector_json = json.dumps(vector_data) if vector_data else None
-            self.cursor.execute(
-                "INSERT INTO tools (name, description, vector_data) VALUES (?, ?, ?)",
-                (name, description, vector_json)
-            )
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with self.manager.writer() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO tools (name, description, vector_data, category) VALUES (?, ?, ?, ?)",
+                    (name, description, vector_json, category)
+                )
+                conn.execute(BUMP_TOOL_CATALOG_VERSION)
+            return cursor.lastrowid
         except sqlite3.Error as e:
             print(f"Error adding tool: {e}")
             return -1
     
+    def add_tools(self, tools):
+        """
+        Add several tools to the database in one transaction.
+        
+        Args:
+            tools (list): (name, description, vector_data, category) tuples, where
+                vector_data is a vector, its JSON text, or None.
+        
+        Returns:
+            int: The number of tools added, or -1 if an error occurred.
+        """
+        if not self._ensure_connected():
+            return -1
+        
+        rows = []
+        for name, description, vector_data, category in tools:
+            if vector_data is not None and not isinstance(vector_data, str):
+                vector_data = json.dumps(vector_data) if len(vector_data) else None
+            rows.append((name, description, vector_data, category))
+        
+        try:
+            with self.manager.writer() as conn:
+                conn.executemany(
+                    "INSERT INTO tools (name, description, vector_data, category) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(BUMP_TOOL_CATALOG_VERSION)
+            return len(rows)
+        except sqlite3.Error as e:
+            print(f"Error adding tools: {e}")
+            return -1
+    
+    def update_tool_vectors(self, vectors):
+        """
+        Replace the stored vectors of several tools in one transaction.
+        
+        Args:
+            vectors (dict): Mapping of tool ID to vector.
+        
+        Returns:
+            bool: True if the update succeeded, False otherwise.
+        """
+        if not self._ensure_connected():
+            return False
+        
+        try:
+            with self.manager.writer() as conn:
+                conn.executemany(
+                    "UPDATE tools SET vector_data = ? WHERE id = ?",
+                    [(json.dumps(vector), tool_id) for tool_id, vector in vectors.items()]
+                )
+                conn.execute(BUMP_TOOL_CATALOG_VERSION)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error updating tool vectors: {e}")
+            return False
+    
     def get_tool(self, tool_id):
         """
         Get a tool from the database by ID.
@@ -130,20 +349,22 @@ class AgentDatabase:
         Returns:
             dict: The tool data, or None if the tool was not found.
         """
-        if not self.conn:
-            if not self.connect():
-                return None
+        if not self._ensure_connected():
+            return None
         
         try:
-            self.cursor.execute("SELECT * FROM tools WHERE id = ?", (tool_id,))
-            row = self.cursor.fetchone()
+            row = self.manager.reader().execute(
+                "SELECT id, name, description, vector_data, created_at, category FROM tools WHERE id = ?",
+                (tool_id,)
+            ).fetchone()
             if row:
                 return {
                     "id": row[0],
                     "name": row[1],
                     "description": row[2],
                     "vector_data": json.loads(row[3]) if row[3] else None,
-                    "created_at": row[4]
+                    "created_at": row[4],
+                    "category": row[5]
                 }
             return None
         except sqlite3.Error as e:
@@ -157,13 +378,13 @@ class AgentDatabase:
         Returns:
             list: A list of tool dictionaries.
         """
-        if not self.conn:
-            if not self.connect():
-                return []
+        if not self._ensure_connected():
+            return []
         
         try:
-            self.cursor.execute("SELECT * FROM tools")
-            rows = self.cursor.fetchall()
+            rows = self.manager.reader().execute(
+                "SELECT id, name, description, vector_data, created_at, category FROM tools"
+            ).fetchall()
             tools = []
             for row in rows:
                 tools.append({
@@ -171,37 +392,810 @@ class AgentDatabase:
                     "name": row[1],
                     "description": row[2],
                     "vector_data": json.loads(row[3]) if row[3] else None,
-                    "created_at": row[4]
+                    "created_at": row[4],
+                    "category": row[5]
                 })
             return tools
         except sqlite3.Error as e:
             print(f"Error getting tools: {e}")
             return []
     
+    def iter_tools(self, chunk_size=1000, category=None):
+        """
+        Stream the tools from the database in chunks.
+        
+        Rows are read from one cursor with fetchmany, and vectors are left as
+        the stored JSON text, so only one chunk is held in memory at a time and
+        callers decode just the vectors they need.
+        
+        Args:
+            chunk_size (int, optional): Number of tools per chunk. Defaults to 1000.
+            category (str, optional): Only stream tools of this category. Defaults to None (all).
+        
+        Yields:
+            list: (id, name, description, category, vector_json) tuples, in ID order.
+        """
+        if not self._ensure_connected():
+            return
+        
+        query = "SELECT id, name, description, category, vector_data FROM tools"
+        params = ()
+        if category is not None:
+            query += " WHERE category = ?"
+            params = (category,)
+        cursor = self.manager.reader().execute(query + " ORDER BY id", params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+    
+    def get_tool_vector_dimension(self):
+        """
+        Get the dimension of the stored tool vectors, from the first tool that has one.
+        
+        Returns:
+            int: The dimension, or None if no tool has a vector or an error occurred.
+        """
+        if not self._ensure_connected():
+            return None
+        
+        try:
+            row = self.manager.reader().execute(
+                "SELECT json_array_length(vector_data) FROM tools WHERE vector_data IS NOT NULL ORDER BY id LIMIT 1"
+            ).fetchone()
+            return int(row[0]) if row and row[0] is not None else None
+        except sqlite3.Error as e:
+            print(f"Error getting tool vector dimension: {e}")
+            return None
+    
+    def get_tool_catalog_version(self):
+        """
+        Get the version of the tool catalog, which changes whenever tools are written.
+        
+        Returns:
+            int: The version, 0 if no tool was ever written, or None if an error occurred.
+        """
+        if not self._ensure_connected():
+            return None
+        
+        try:
+            row = self.manager.reader().execute(
+                "SELECT value FROM meta WHERE key = 'tool_catalog_version'"
+            ).fetchone()
+            return int(row[0]) if row else 0
+        except sqlite3.Error as e:
+            print(f"Error getting tool catalog version: {e}")
+            return None
+    
+    def enable_async_logging(self, batch_size=100, flush_interval=0.5, max_queue=10000):
+        """
+        Write interaction logs from a background thread in batched transactions.
+        
+        The writer is shared by every AgentDatabase on the same file.
+        
+        Args:
+            batch_size (int, optional): Maximum number of logs per transaction. Defaults to 100.
+            flush_interval (float, optional): Maximum seconds a log waits before being written. Defaults to 0.5.
+            max_queue (int, optional): Maximum number of pending logs before log_interaction blocks. Defaults to 10000.
+        """
+        if self.log_writer is None and self._ensure_connected():
+            self.log_writer = self.manager.get_log_writer(batch_size, flush_interval, max_queue)
+    
+    def flush_logs(self):
+        """
+        Block until all queued interaction logs have been written.
+        """
+        if self.log_writer:
+            self.log_writer.flush()
+    
     def log_interaction(self, user_query, agent_response, tools_used=None):
         """
         Log an interaction with the agent.
         
+        Each tool used is also recorded in the tool_calls table for analytics.
+        With asynchronous logging enabled, the log is queued for the background
+        writer and this only blocks if the queue is full.
+        
         Args:
             user_query (str): The user's query.
             agent_response (str): The agent's response.
             tools_used (list, optional): List of tools used in the interaction. Defaults to None.
         
         Returns:
-            int: The ID of the inserted log, or -1 if an error occurred.
+            int: The ID of the inserted log, 0 if the log was queued for the
+                background writer, or -1 if an error occurred.
         """
-        if not self.conn:
-            if not self.connect():
-                return -1
+        if self.log_writer:
+            return 0 if self.log_writer.submit(user_query, agent_response, tools_used) else -1
+        
+        if not self._ensure_connected():
+            return -1
         
         try:
-            tools_json = json.dumps(tools_used) if tools_used else None
-            self.cursor.execute(
-                "INSERT INTO logs (user_query, agent_response, tools_used) VALUES (?, ?, ?)",
-                (user_query, agent_response, tools_json)
-            )
-            self.conn.commit()
-            return self.cursor.lastrowid
-        except sqlite3.Error as e:
+            with self.manager.writer() as conn:
+                return insert_logs(conn, [(current_timestamp(), user_query, agent_response, tools_used)])
+        except (sqlite3.Error, TypeError, ValueError) as e:
             print(f"Error logging interaction: {e}")
             return -1
+    
+    def get_blob(self, blob_hash):
+        """
+        Get a stored tool result by its hash.
+        
+        Args:
+            blob_hash (str): The hash of the result.
+        
+        Returns:
+            str: The result, or None if no blob has this hash.
+        """
+        if not self._ensure_connected():
+            return None
+        
+        try:
+            return load_blobs(self.manager.reader(), [blob_hash]).get(blob_hash)
+        except sqlite3.Error as e:
+            print(f"Error getting blob: {e}")
+            return None
+    
+    def get_log(self, log_id, resolve_results=True, include_archive=True):
+        """
+        Get a logged interaction by ID.
+        
+        A log no longer in the database is looked up in the archive partitions.
+        
+        Args:
+            log_id (int): The ID of the log.
+            resolve_results (bool, optional): Whether to load the tool results referenced
+                by hash back into each tool's "result". Defaults to True.
+            include_archive (bool, optional): Whether to look for archived logs. Defaults to True.
+        
+        Returns:
+            dict: The log data, or None if the log was not found.
+        """
+        if not self._ensure_connected():
+            return None
+        
+        try:
+            conn = self.manager.reader()
+            row = conn.execute(
+                "SELECT id, timestamp, user_query, agent_response, tools_used FROM logs WHERE id = ?",
+                (log_id,)
+            ).fetchone()
+            if not row:
+                # Logs up to archived_log_id may have been archived
+                archived = conn.execute(
+                    "SELECT value FROM meta WHERE key = 'archived_log_id'"
+                ).fetchone()
+                if include_archive and archived and log_id <= archived[0]:
+                    return self.archive.read_log(log_id, resolve_results)
+                return None
+            
+            return self._log_from_row(conn, row, resolve_results)
+        except sqlite3.Error as e:
+            print(f"Error getting log: {e}")
+            return None
+    
+    def _log_from_row(self, conn, row, resolve_results):
+        """
+        Build a log dictionary from a logs row.
+        
+        Args:
+            conn (sqlite3.Connection): The connection the row was read with.
+            row (tuple): The (id, timestamp, user_query, agent_response, tools_used) row.
+            resolve_results (bool): Whether to load referenced tool results.
+        
+        Returns:
+            dict: The log data.
+        """
+        tools_used = json.loads(row[4]) if row[4] else None
+        if resolve_results:
+            load_tool_results(conn, tools_used)
+        return {
+            "id": row[0],
+            "timestamp": row[1],
+            "user_query": row[2],
+            "agent_response": row[3],
+            "tools_used": tools_used
+        }
+    
+    def _database_size(self, conn):
+        """
+        Get the size of the database file in use.
+        
+        Args:
+            conn (sqlite3.Connection): A connection to the database.
+        
+        Returns:
+            int: The size in bytes, excluding free pages.
+        """
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * conn.execute("PRAGMA page_size").fetchone()[0]
+    
+    def compact_logs(self, batch_size=500, vacuum=True):
+        """
+        Move tool results stored inline in older logs into the blobs table.
+        
+        Logs are rewritten in batches of one transaction each, so the agent
+        can keep logging while this runs. Logs that already reference their
+        results are skipped.
+        
+        Args:
+            batch_size (int, optional): Number of logs per transaction. Defaults to 500.
+            vacuum (bool, optional): Whether to VACUUM afterwards to shrink the file. Defaults to True.
+        
+        Returns:
+            dict: Counts of "logs" rewritten and "blobs" added, and the database
+                size in bytes "before" and "after", or None if an error occurred.
+        """
+        if not self._ensure_connected():
+            return None
+        
+        threshold = blob_compress_threshold()
+        stats = {"logs": 0, "blobs": 0}
+        try:
+            with self.manager.writer() as conn:
+                stats["before"] = self._database_size(conn)
+                blobs_before = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+            
+            last_id = 0
+            while True:
+                with self.manager.writer() as conn:
+                    rows = conn.execute("""
+                        SELECT id, tools_used FROM logs
+                        WHERE id > ? AND instr(tools_used, '"result"') > 0
+                        ORDER BY id LIMIT ?
+                    """, (last_id, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    last_id = rows[-1][0]
+                    
+                    logs = []
+                    for log_id, tools_json in rows:
+                        try:
+                            tools_used = json.loads(tools_json)
+                        except ValueError:
+                            continue
+                        if isinstance(tools_used, list) and any(True for _ in stored_results(tools_used)):
+                            logs.append((log_id, tools_used))
+                    
+                    hashes = store_blobs(
+                        conn,
+                        (result for _, tools_used in logs for result in stored_results(tools_used)),
+                        threshold
+                    )
+                    conn.executemany(
+                        "UPDATE logs SET tools_used = ? WHERE id = ?",
+                        [(json.dumps(reference_results(tools_used, hashes)), log_id)
+                         for log_id, tools_used in logs]
+                    )
+                    conn.executemany(
+                        "UPDATE tool_calls SET result_hash = ? WHERE log_id = ? AND position = ?",
+                        [(hashes[tool["result"]], log_id, position)
+                         for log_id, tools_used in logs
+                         for position, tool in enumerate(tools_used)
+                         if isinstance(tool, dict) and isinstance(tool.get("result"), str)]
+                    )
+                    stats["logs"] += len(logs)
+            
+            with self.manager.writer() as conn:
+                stats["blobs"] = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] - blobs_before
+            if vacuum:
+                with self.manager.writer() as conn:
+                    conn.execute("VACUUM")
+            with self.manager.writer() as conn:
+                stats["after"] = self._database_size(conn)
+            return stats
+        except sqlite3.Error as e:
+            print(f"Error compacting logs: {e}")
+            return None
+    
+    def archive_logs(self, retention_days=None, batch_size=1000):
+        """
+        Move logs older than the retention period into the cold archive.
+        
+        Whole UTC days older than retention_days are moved, oldest first, each
+        into its own archive partition. Every batch is committed to the archive
+        before it is deleted from this database in one transaction, together
+        with its tool calls and any tool results no other log references, and
+        the freed pages are then released with an incremental vacuum. A
+        database created without incremental auto-vacuum is converted with one
+        full VACUUM the first time this runs.
+        
+        Args:
+            retention_days (int, optional): Number of days of logs to keep, counting
+                today; 0 archives every log. Defaults to LOG_RETENTION_DAYS, or 30.
+            batch_size (int, optional): Number of logs per transaction. Defaults to 1000.
+        
+        Returns:
+            dict: The number of "logs" archived, the "partitions" (days) written,
+                and the database size in bytes "before" and "after", or None if
+                an error occurred.
+        """
+        if not self._ensure_connected():
+            return None
+        
+        if retention_days is None:
+            retention_days = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        cutoff = (today - timedelta(days=max(retention_days, 0) - 1)).strftime("%Y-%m-%d %H:%M:%S")
+        
+        stats = {"logs": 0, "partitions": []}
+        try:
+            with self.manager.writer() as conn:
+                stats["before"] = self._database_size(conn)
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    conn.execute("VACUUM")
+            
+            while True:
+                day = self.manager.reader().execute(
+                    "SELECT date(MIN(timestamp)) FROM logs WHERE timestamp < ?", (cutoff,)
+                ).fetchone()[0]
+                if day is None:
+                    break
+                next_day = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+                stats["logs"] += self._archive_day(day, min(next_day, cutoff), batch_size)
+                stats["partitions"].append(day)
+            
+            with self.manager.writer() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                stats["after"] = self._database_size(conn)
+            return stats
+        except sqlite3.Error as e:
+            print(f"Error archiving logs: {e}")
+            return None
+    
+    def _archive_day(self, day, end, batch_size):
+        """
+        Move the logs of one day into its archive partition.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+            end (str): Exclusive end of the logs to move, as a UTC timestamp string.
+            batch_size (int): Number of logs per transaction.
+        
+        Returns:
+            int: The number of logs moved.
+        """
+        moved = 0
+        archive_conn = self.archive.open_partition(day)
+        try:
+            while True:
+                with self.manager.writer() as conn:
+                    logs = conn.execute("""
+                        SELECT id, timestamp, user_query, agent_response, tools_used FROM logs
+                        WHERE timestamp >= ? AND timestamp < ?
+                        ORDER BY timestamp
+                        LIMIT ?
+                    """, (f"{day} 00:00:00", end, batch_size)).fetchall()
+                    if not logs:
+                        break
+                    
+                    ids = [row[0] for row in logs]
+                    id_list = ",".join(str(log_id) for log_id in ids)
+                    tool_calls = conn.execute(f"""
+                        SELECT log_id, position, timestamp, tool_name, result_length, response_length, result_hash
+                        FROM tool_calls WHERE log_id IN ({id_list})
+                    """).fetchall()
+                    hash_list = sorted({row[6] for row in tool_calls if row[6]})
+                    placeholders = ",".join("?" * len(hash_list))
+                    blobs = conn.execute(
+                        f"SELECT hash, size, compressed, data FROM blobs WHERE hash IN ({placeholders})",
+                        hash_list
+                    ).fetchall() if hash_list else []
+                    
+                    self.archive.write_batch(archive_conn, logs, tool_calls, blobs)
+                    
+                    conn.execute(f"DELETE FROM tool_calls WHERE log_id IN ({id_list})")
+                    conn.execute(f"DELETE FROM logs WHERE id IN ({id_list})")
+                    if hash_list:
+                        conn.execute(f"""
+                            DELETE FROM blobs WHERE hash IN ({placeholders}) AND NOT EXISTS (
+                                SELECT 1 FROM tool_calls WHERE tool_calls.result_hash = blobs.hash
+                            )
+                        """, hash_list)
+                    conn.execute("""
+                        INSERT INTO meta (key, value) VALUES ('archived_log_id', ?)
+                        ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)
+                    """, (max(ids),))
+                    moved += len(logs)
+                
+                with self.manager.writer() as conn:
+                    # executescript steps the pragma until every free page is released
+                    conn.executescript("PRAGMA incremental_vacuum")
+        finally:
+            self.archive.finish_partition(archive_conn)
+        return moved
+    
+    def get_logs(self, window_seconds=None, start=None, end=None, limit=None,
+                 resolve_results=False, include_archive=True):
+        """
+        Get the logged interactions within a time window.
+        
+        When the window reaches back into archived days, their partitions are
+        read as well; days outside the window are never opened.
+        
+        Args:
+            window_seconds (float, optional): Only return logs from the last this many
+                seconds before end. Defaults to None.
+            start (datetime or str, optional): Start of the window (UTC). Defaults to None (unbounded).
+            end (datetime or str, optional): End of the window (UTC). Defaults to None (now).
+            limit (int, optional): Maximum number of logs, oldest first. Defaults to None (all).
+            resolve_results (bool, optional): Whether to load referenced tool results. Defaults to False.
+            include_archive (bool, optional): Whether to read archived logs. Defaults to True.
+        
+        Returns:
+            list: Log dictionaries as returned by get_log(), in time order.
+        """
+        if not self._ensure_connected():
+            return []
+        
+        window = self._time_window(window_seconds, start, end)
+        logs = []
+        try:
+            if include_archive:
+                for day in self.archive.partitions(window[0][:10], window[1][:10]):
+                    remaining = None if limit is None else limit - len(logs)
+                    if remaining is not None and remaining <= 0:
+                        break
+                    logs.extend(self.archive.read_logs(day, *window, remaining, resolve_results))
+            
+            # Logs written late for an archived day are older than archived ones,
+            # so the database's logs are merged in rather than appended
+            conn = self.manager.reader()
+            rows = conn.execute("""
+                SELECT id, timestamp, user_query, agent_response, tools_used FROM logs
+                WHERE timestamp >= ? AND timestamp <= ?
+                ORDER BY timestamp, id
+                LIMIT ?
+            """, (*window, -1 if limit is None else limit)).fetchall()
+            archived_ids = {log["id"] for log in logs}
+            logs = list(heapq.merge(
+                logs,
+                (self._log_from_row(conn, row, resolve_results) for row in rows if row[0] not in archived_ids),
+                key=lambda log: (log["timestamp"], log["id"])
+            ))
+            return logs[:limit]
+        except sqlite3.Error as e:
+            print(f"Error getting logs: {e}")
+            return []
+    
+    def search_logs(self, text, limit=10):
+        """
+        Find logged interactions by the words of their query or answer.
+        
+        Every word of the text must appear (after stemming); matches are
+        ranked by BM25, with words in the query weighted twice as much as
+        words in the answer. Only logs still in the database are searched,
+        not archived ones.
+        
+        Args:
+            text (str): The words to search for.
+            limit (int, optional): Maximum number of results. Defaults to 10.
+        
+        Returns:
+            list: Dictionaries with "id", "timestamp", "user_query", "agent_response"
+                and "score" (lower is better), best match first.
+        """
+        terms = re.findall(r"\w+", text)
+        if not terms or not self._ensure_connected():
+            return []
+        
+        # Quote every word so FTS5 operators in the text are matched literally
+        match = " ".join(f'"{term}"' for term in terms)
+        try:
+            rows = self.manager.reader().execute("""
+                SELECT logs.id, logs.timestamp, logs.user_query, logs.agent_response, logs_fts.rank
+                FROM logs_fts JOIN logs ON logs.id = logs_fts.rowid
+                WHERE logs_fts MATCH ? AND logs_fts.rank MATCH 'bm25(2.0, 1.0)'
+                ORDER BY logs_fts.rank
+                LIMIT ?
+            """, (match, limit)).fetchall()
+            return [
+                {
+                    "id": row[0],
+                    "timestamp": row[1],
+                    "user_query": row[2],
+                    "agent_response": row[3],
+                    "score": row[4]
+                }
+                for row in rows
+            ]
+        except sqlite3.Error as e:
+            print(f"Error searching logs: {e}")
+            return []
+    
+    def rebuild_search_index(self):
+        """
+        Rebuild the full-text index of logs from scratch and merge it into one segment.
+        
+        Returns:
+            bool: True if the rebuild succeeded, False otherwise.
+        """
+        if not self._ensure_connected():
+            return False
+        
+        try:
+            with self.manager.writer() as conn:
+                conn.execute("INSERT INTO logs_fts (logs_fts) VALUES ('rebuild')")
+                conn.execute("INSERT INTO logs_fts (logs_fts) VALUES ('optimize')")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error rebuilding search index: {e}")
+            return False
+    
+    def _time_window(self, window_seconds=None, start=None, end=None):
+        """
+        Resolve a time window to timestamp bounds comparable with the stored ones.
+        
+        Args:
+            window_seconds (float, optional): Length of the window ending at end. Defaults to None.
+            start (datetime or str, optional): Start of the window. Defaults to None (unbounded).
+            end (datetime or str, optional): End of the window. Defaults to None (now).
+        
+        Returns:
+            tuple: The (start, end) bounds as "YYYY-MM-DD HH:MM:SS" UTC strings.
+        """
+        def to_timestamp(value):
+            if isinstance(value, datetime):
+                if value.tzinfo is not None:
+                    value = value.astimezone(timezone.utc)
+                return value.strftime("%Y-%m-%d %H:%M:%S")
+            return value
+        
+        end_time = end if end is not None else datetime.now(timezone.utc)
+        if window_seconds is not None:
+            if not isinstance(end_time, datetime):
+                end_time = datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S")
+            start = end_time - timedelta(seconds=window_seconds)
+        
+        return (to_timestamp(start) if start is not None else "0000-00-00 00:00:00",
+                to_timestamp(end_time))
+    
+    def get_tool_usage(self, window_seconds=None, start=None, end=None, limit=None, include_archive=True):
+        """
+        Count tool calls per tool within a time window.
+        
+        Archived days within the window are counted as well.
+        
+        Args:
+            window_seconds (float, optional): Only count calls from the last this many seconds
+                before end. Defaults to None.
+            start (datetime or str, optional): Start of the window (UTC). Defaults to None (unbounded).
+            end (datetime or str, optional): End of the window (UTC). Defaults to None (now).
+            limit (int, optional): Maximum number of tools to return. Defaults to None (all).
+            include_archive (bool, optional): Whether to count archived calls. Defaults to True.
+        
+        Returns:
+            list: Dictionaries with "name" and "calls", most called first.
+        """
+        if not self._ensure_connected():
+            return []
+        
+        window = self._time_window(window_seconds, start, end)
+        try:
+            days = self.archive.partitions(window[0][:10], window[1][:10]) if include_archive else []
+            rows = self.manager.reader().execute("""
+                SELECT tool_name, COUNT(*) AS calls FROM tool_calls
+                WHERE timestamp >= ? AND timestamp <= ?
+                GROUP BY tool_name
+                ORDER BY calls DESC, tool_name
+                LIMIT ?
+            """, (*window, -1 if limit is None or days else limit)).fetchall()
+            
+            if days:
+                counts = dict(rows)
+                for day in days:
+                    for name, calls in self.archive.tool_usage(day, *window).items():
+                        counts[name] = counts.get(name, 0) + calls
+                rows = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            return [{"name": name, "calls": calls} for name, calls in rows]
+        except sqlite3.Error as e:
+            print(f"Error getting tool usage: {e}")
+            return []
+    
+    def _get_tool_call_names(self, conn):
+        """
+        Get the distinct tool names in the tool_calls table.
+        
+        Each name is found with one index seek past the previous one, instead
+        of scanning every call.
+        
+        Args:
+            conn (sqlite3.Connection): A connection to read with.
+        
+        Returns:
+            list: The tool names in sorted order.
+        """
+        names = []
+        name = conn.execute("SELECT MIN(tool_name) FROM tool_calls").fetchone()[0]
+        while name is not None:
+            names.append(name)
+            name = conn.execute(
+                "SELECT MIN(tool_name) FROM tool_calls WHERE tool_name > ?", (name,)
+            ).fetchone()[0]
+        return names
+    
+    def _length_percentiles(self, conn, source, params, percentiles):
+        """
+        Compute percentiles of the lengths selected by a subquery, inside SQLite.
+        
+        The lengths are counted, then numbered in order by a window function,
+        and only the rows at the ranks the percentiles fall between are
+        returned; each percentile interpolates linearly between them, like
+        numpy.percentile.
+        
+        Args:
+            conn (sqlite3.Connection): A connection to read with.
+            source (str): A subquery selecting the lengths as a "length" column.
+            params (tuple): The parameters of the subquery.
+            percentiles (tuple): Percentiles to compute.
+        
+        Returns:
+            dict: "calls" and "p<N>" entries, or None if no lengths were selected.
+        """
+        calls = conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+        if calls == 0:
+            return None
+        
+        positions = [p / 100 * (calls - 1) for p in percentiles]
+        ranks = sorted({rank for position in positions
+                        for rank in (int(position), min(int(position) + 1, calls - 1))})
+        values = dict(conn.execute(f"""
+            SELECT position, length FROM (
+                SELECT length, ROW_NUMBER() OVER (ORDER BY length) - 1 AS position FROM {source}
+            )
+            WHERE position IN ({",".join("?" * len(ranks))})
+        """, (*params, *ranks)).fetchall())
+        
+        entry = {"calls": calls}
+        for p, position in zip(percentiles, positions):
+            low = values[int(position)]
+            high = values[min(int(position) + 1, calls - 1)]
+            entry[f"p{p:g}"] = float(low + (high - low) * (position - int(position)))
+        return entry
+    
+    def get_tool_length_percentiles(self, column="response_length", percentiles=(50, 95, 99),
+                                    window_seconds=None, start=None, end=None, tool_name=None,
+                                    include_archive=True):
+        """
+        Compute percentiles of response or result lengths per tool within a time window.
+        
+        Each tool is read as one range of a covering index, so only the calls
+        inside the window are visited, and the percentiles are computed in
+        SQL, so only the lengths at the percentile ranks are returned. When the
+        window reaches back into archived days, the lengths of the window's
+        calls in the database and those partitions are first gathered in a
+        temporary in-memory database.
+        
+        Args:
+            column (str, optional): "response_length" (length of the agent's answer) or
+                "result_length" (length of the tool's result). Defaults to "response_length".
+            percentiles (tuple, optional): Percentiles to compute. Defaults to (50, 95, 99).
+            window_seconds (float, optional): Only use calls from the last this many seconds
+                before end. Defaults to None.
+            start (datetime or str, optional): Start of the window (UTC). Defaults to None (unbounded).
+            end (datetime or str, optional): End of the window (UTC). Defaults to None (now).
+            tool_name (str, optional): Only compute for this tool. Defaults to None (all tools).
+            include_archive (bool, optional): Whether to use archived calls. Defaults to True.
+        
+        Returns:
+            dict: Mapping of tool name to a dictionary with "calls" and "p<N>" entries.
+        """
+        if column not in ("response_length", "result_length"):
+            raise ValueError(f"Unknown length column: {column}")
+        if not self._ensure_connected():
+            return {}
+        
+        window = self._time_window(window_seconds, start, end)
+        try:
+            days = self.archive.partitions(window[0][:10], window[1][:10]) if include_archive else []
+            if days:
+                return self._archived_length_percentiles(column, percentiles, window, tool_name, days)
+            
+            conn = self.manager.reader()
+            if tool_name is None:
+                names = self._get_tool_call_names(conn)
+            else:
+                names = [tool_name]
+            source = f"""(
+                SELECT {column} AS length FROM tool_calls
+                WHERE tool_name = ? AND timestamp >= ? AND timestamp <= ? AND {column} IS NOT NULL
+            )"""
+            
+            stats = {}
+            for name in names:
+                entry = self._length_percentiles(conn, source, (name, *window), percentiles)
+                if entry is not None:
+                    stats[name] = entry
+            return stats
+        except sqlite3.Error as e:
+            print(f"Error getting tool length percentiles: {e}")
+            return {}
+    
+    def _archived_length_percentiles(self, column, percentiles, window, tool_name, days):
+        """
+        Compute length percentiles per tool over the database and archive partitions.
+        
+        Args:
+            column (str): "response_length" or "result_length".
+            percentiles (tuple): Percentiles to compute.
+            window (tuple): The (start, end) bounds as UTC timestamp strings.
+            tool_name (str): Only compute for this tool, or None for all tools.
+            days (list): The archived days within the window.
+        
+        Returns:
+            dict: Mapping of tool name to a dictionary with "calls" and "p<N>" entries.
+        """
+        conn = sqlite3.connect("file::memory:", uri=True, isolation_level=None)
+        try:
+            conn.execute("""
+                CREATE TABLE lengths (
+                    log_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    tool_name TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    PRIMARY KEY (log_id, position)
+                )
+            """)
+            for day in days:
+                copy_lengths(conn, self.archive.partition_path(day), column, *window, tool_name)
+            copy_lengths(conn, self.db_path, column, *window, tool_name)
+            conn.execute("CREATE INDEX idx_lengths ON lengths (tool_name, length)")
+            
+            names = [row[0] for row in conn.execute("SELECT DISTINCT tool_name FROM lengths ORDER BY tool_name")]
+            source = "(SELECT length FROM lengths WHERE tool_name = ?)"
+            return {name: self._length_percentiles(conn, source, (name,), percentiles) for name in names}
+        finally:
+            conn.close()
+    
+    def get_interaction_counts(self, bucket_seconds=3600, window_seconds=None, start=None, end=None,
+                               include_archive=True):
+        """
+        Count logged interactions per time bucket within a time window.
+        
+        Archived days within the window are counted as well.
+        
+        Args:
+            bucket_seconds (int, optional): Bucket width in seconds. Defaults to 3600.
+            window_seconds (float, optional): Only count interactions from the last this many
+                seconds before end. Defaults to None.
+            start (datetime or str, optional): Start of the window (UTC). Defaults to None (unbounded).
+            end (datetime or str, optional): End of the window (UTC). Defaults to None (now).
+            include_archive (bool, optional): Whether to count archived interactions. Defaults to True.
+        
+        Returns:
+            list: (bucket_start, count) tuples in time order, bucket_start as a UTC timestamp string.
+        """
+        if not self._ensure_connected():
+            return []
+        
+        window = self._time_window(window_seconds, start, end)
+        try:
+            rows = self.manager.reader().execute("""
+                SELECT CAST(strftime('%s', timestamp) AS INTEGER) / ? * ? AS bucket, COUNT(*)
+                FROM logs
+                WHERE timestamp >= ? AND timestamp <= ?
+                GROUP BY bucket
+                ORDER BY bucket
+            """, (int(bucket_seconds), int(bucket_seconds), *window)).fetchall()
+            
+            days = self.archive.partitions(window[0][:10], window[1][:10]) if include_archive else []
+            if days:
+                counts = dict(rows)
+                for day in days:
+                    for bucket, count in self.archive.interaction_counts(day, *window, int(bucket_seconds)).items():
+                        counts[bucket] = counts.get(bucket, 0) + count
+                rows = sorted(counts.items())
+            return [
+                (datetime.fromtimestamp(bucket, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"), count)
+                for bucket, count in rows
+            ]
+        except sqlite3.Error as e:
+            print(f"Error getting interaction counts: {e}")
+            return []
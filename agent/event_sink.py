@@ -0,0 +1,211 @@
+# Event Sinks for Agent Output
+
+import atexit
+import json
+import queue
+import sys
+import threading
+from collections import deque
+
+
+class EventSink:
+    """
+    Base class for consumers of agent events.
+    
+    An event is a dict with a "type" key (e.g. "query", "thinking", "token")
+    and a "content" key, the same shape used by the interaction history.
+    """
+    
+    def emit(self, event):
+        """
+        Accept a single event.
+        
+        Args:
+            event (dict): The event to consume.
+        """
+        raise NotImplementedError
+    
+    def flush(self):
+        """
+        Make sure every event emitted so far has been fully processed.
+        """
+        pass
+    
+    def close(self):
+        """
+        Flush pending events and release any resources held by the sink.
+        """
+        self.flush()
+
+
+class NullSink(EventSink):
+    """
+    Sink that discards every event, for headless runs.
+    """
+    
+    def emit(self, event):
+        """
+        Discard the event.
+        
+        Args:
+            event (dict): The event to discard.
+        """
+        pass
+
+
+class RingBufferSink(EventSink):
+    """
+    Sink that keeps only the most recent events in a bounded ring buffer.
+    """
+    
+    def __init__(self, maxlen=1000):
+        """
+        Initialize the ring buffer.
+        
+        Args:
+            maxlen (int, optional): Maximum number of events to keep. Defaults to 1000.
+        """
+        self.events = deque(maxlen=maxlen)
+    
+    def emit(self, event):
+        """
+        Store the event, evicting the oldest one if the buffer is full.
+        
+        Args:
+            event (dict): The event to store.
+        """
+        self.events.append(event)
+    
+    def get_events(self):
+        """
+        Get a snapshot of the buffered events.
+        
+        Returns:
+            list: The buffered events, oldest first.
+        """
+        return list(self.events)
+    
+    def clear(self):
+        """
+        Remove all buffered events.
+        """
+        self.events.clear()
+    
+    def __len__(self):
+        return len(self.events)
+
+
+def format_event_json(event):
+    """
+    Format an event as a single JSON line.
+    
+    Args:
+        event (dict): The event to format.
+    
+    Returns:
+        str: The JSON line, including the trailing newline.
+    """
+    return json.dumps(event, default=str) + "\n"
+
+
+class AsyncBatchedSink(EventSink):
+    """
+    Sink that formats events and writes them to a stream or file from a
+    background thread, in batches, so that emitting never blocks on I/O.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, target=None, formatter=format_event_json, batch_size=256,
+                 flush_interval=0.05, max_queue=10000):
+        """
+        Initialize the writer and start its background thread.
+        
+        Args:
+            target (optional): A writable text stream or a file path. Defaults to sys.stdout.
+            formatter (callable, optional): Turns an event into the text to write. Defaults to JSON lines.
+            batch_size (int, optional): Maximum number of events written per batch. Defaults to 256.
+            flush_interval (float, optional): Seconds to wait for more events before writing
+                a partial batch. Defaults to 0.05.
+            max_queue (int, optional): Maximum number of pending events. When full, emit
+                blocks until the writer catches up. Defaults to 10000.
+        """
+        if target is None:
+            target = sys.stdout
+        if isinstance(target, str):
+            self.stream = open(target, "a", encoding="utf-8")
+            self._owns_stream = True
+        else:
+            self.stream = target
+            self._owns_stream = False
+        
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="AsyncBatchedSink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def emit(self, event):
+        """
+        Queue the event for writing.
+        
+        Args:
+            event (dict): The event to write.
+        """
+        if self._closed:
+            return
+        self._queue.put(event)
+    
+    def flush(self):
+        """
+        Block until every queued event has been written and the stream flushed.
+        """
+        if not self._closed:
+            self._queue.join()
+    
+    def close(self):
+        """
+        Write any pending events, stop the background thread and close the
+        file if this sink opened it.
+        """
+        if self._closed:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._closed = True
+        # Drop the exit hook, so a closed sink is not kept alive until exit
+        atexit.unregister(self.close)
+        if self._owns_stream:
+            self.stream.close()
+    
+    def _run(self):
+        """
+        Background loop: collect events into batches and write each batch
+        with a single write and flush.
+        """
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not self._STOP and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                batch.append(item)
+            
+            events = [event for event in batch if event is not self._STOP]
+            try:
+                if events:
+                    self.stream.write("".join(self.formatter(event) for event in events))
+                    self.stream.flush()
+            except Exception as e:
+                print(f"Event sink write error: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            
+            if any(event is self._STOP for event in batch):
+                return
@@ -1,15 +1,138 @@
 # Interface for User Interaction
 
+import os
+import sys
+
+from agent.event_sink import NullSink, RingBufferSink
+from agent.renderer import TerminalRenderer, truncate_lines
+
+
+def format_event(event):
+    """
+    Format an event as the text shown on the terminal.
+    
+    Args:
+        event (dict): The event to format.
+    
+    Returns:
+        str: The formatted text, including trailing newlines.
+    """
+    event_type = event["type"]
+    content = event["content"]
+    
+    if event_type == "query":
+        return "\n" + "=" * 80 + f"\nUser Query: {content}\n" + "=" * 80 + "\n"
+    if event_type == "thinking":
+        return f"Thinking... {content}\n"
+    if event_type == "tool_check":
+        return f"Tool Check: Score = {content:.2f}\n"
+    if event_type == "tool_selection":
+        return (
+            "\n" + "-" * 40 + "\n"
+            f"Selected Tool: {content['name']} (Score: {content['score']:.2f})\n"
+            f"Description: {content['description']}\n"
+            + "-" * 40 + "\n"
+        )
+    if event_type == "tool_call":
+        param_str = ", ".join([f"{k}={v}" for k, v in content["parameters"].items()])
+        return f"Calling: {content['name']}({param_str})\n"
+    if event_type == "tool_result":
+        return _format_tool_result(content["name"], content["result"])
+    if event_type == "token":
+        return content
+    if event_type == "result":
+        return "\n" + "=" * 80 + "\nFinal Answer:\n" + f"{content}\n" + "=" * 80 + "\n"
+    return f"{content}\n"
+
+
+def _format_tool_result(tool_name, result):
+    """
+    Format the result of a tool call based on the tool type.
+    
+    Args:
+        tool_name (str): The name of the tool that was called.
+        result: The result of the tool call.
+    
+    Returns:
+        str: The formatted result.
+    """
+    text = f"\nResult from {tool_name}:\n\n"
+    
+    if tool_name in ["WebSearch", "NewsSearch"]:
+        # For search results, display with proper formatting
+        text += "-" * 70 + "\n" + f"{result}\n" + "-" * 70 + "\n"
+    elif tool_name == "WebContentFetcher":
+        # For web content, display a snippet
+        text += "-" * 70 + "\n"
+        head, truncated = truncate_lines(result, 10)
+        if truncated:
+            # Show first few lines with ellipsis
+            text += head + "\n...\n"
+            text += f"[Content truncated, total length: {len(result)} characters]\n"
+        else:
+            text += f"{result}\n"
+        text += "-" * 70 + "\n"
+    else:
+        # For other tools, display normally
+        text += f"{result}\n"
+    
+    return text
+
+
 class UserInterface:
     """
     Class for managing user interaction, displaying query, thinking process, tool calls, and results.
+    
+    Every display call is turned into an event and handed to the configured
+    sinks. By default the most recent events are kept in a bounded history
+    and the terminal output is drawn in rate-limited frames.
     """
     
-    def __init__(self):
+    def __init__(self, sinks=None, history_size=None):
         """
         Initialize the User Interface.
+        
+        Args:
+            sinks (list, optional): Output sinks receiving every event. Defaults to a
+                terminal renderer on stdout, or no output if DISPLAY_OUTPUT is False.
+            history_size (int, optional): Number of recent events kept in the history.
+                Defaults to the UI_HISTORY_SIZE environment variable, or 1000.
+        """
+        if history_size is None:
+            history_size = int(os.getenv("UI_HISTORY_SIZE", "1000"))
+        self.history = RingBufferSink(maxlen=history_size)
+        
+        if sinks is None:
+            if os.getenv("DISPLAY_OUTPUT", "True").lower() == "true":
+                refresh_rate = float(os.getenv("UI_REFRESH_RATE", "30"))
+                sinks = [TerminalRenderer(sys.stdout, formatter=format_event, refresh_rate=refresh_rate)]
+            else:
+                sinks = [NullSink()]
+        self.sinks = [self.history] + list(sinks)
+    
+    def emit(self, event):
+        """
+        Hand an event to every sink.
+        
+        Args:
+            event (dict): The event to emit.
         """
-        self.history = []
+        for sink in self.sinks:
+            sink.emit(event)
+    
+    def flush(self):
+        """
+        Wait until all sinks have processed the events emitted so far.
+        """
+        for sink in self.sinks:
+            sink.flush()
+    
+    def close(self):
+        """
+        Flush and close all sinks.
+        """
+        for sink in self.sinks:
+            sink.close()
     
     def display_query(self, query):
         """
@@ -18,10 +141,7 @@ class UserInterface:
         Args:
             query (str): The user's query.
         """
-        print("\n" + "=" * 80)
-        print(f"User Query: {query}")
-        print("=" * 80)
-        self.history.append({"type": "query", "content": query})
+        self.emit({"type": "query", "content": query})
     
     def display_thinking(self, message):
         """
@@ -30,8 +150,7 @@ class UserInterface:
         Args:
             message (str): The thinking message to display.
         """
-        print(f"Thinking... {message}")
-        self.history.append({"type": "thinking", "content": message})
+        self.emit({"type": "thinking", "content": message})
     
     def display_tool_check(self, score):
         """
@@ -40,8 +159,7 @@ class UserInterface:
         Args:
             score (float): The tool judge score.
         """
-        print(f"Tool Check: Score = {score:.2f}")
-        self.history.append({"type": "tool_check", "content": score})
+        self.emit({"type": "tool_check", "content": score})
     
     def display_tool_selection(self, tool_name, description, score):
         """
@@ -52,11 +170,7 @@ class UserInterface:
             description (str): The description of the selected tool.
             score (float): The similarity score.
         """
-        print("\n" + "-" * 40)
-        print(f"Selected Tool: {tool_name} (Score: {score:.2f})")
-        print(f"Description: {description}")
-        print("-" * 40)
-        self.history.append({"type": "tool_selection", "content": {"name": tool_name, "description": description, "score": score}})
+        self.emit({"type": "tool_selection", "content": {"name": tool_name, "description": description, "score": score}})
     
     def display_tool_call(self, tool_name, parameters):
         """
@@ -66,9 +180,7 @@ class UserInterface:
             tool_name (str): The name of the tool being called.
             parameters (dict): The parameters for the tool call.
         """
-        param_str = ", ".join([f"{k}={v}" for k, v in parameters.items()])
-        print(f"Calling: {tool_name}({param_str})")
-        self.history.append({"type": "tool_call", "content": {"name": tool_name, "parameters": parameters}})
+        self.emit({"type": "tool_call", "content": {"name": tool_name, "parameters": parameters}})
     
     def display_tool_result(self, tool_name, result):
         """
@@ -78,31 +190,7 @@ class UserInterface:
             tool_name (str): The name of the tool that was called.
             result: The result of the tool call.
         """
-        print(f"\nResult from {tool_name}:\n")
-        
-        # Format display based on tool type
-        if tool_name in ["WebSearch", "NewsSearch"]:
-            # For search results, display with proper formatting
-            print("-" * 70)
-            print(result)
-            print("-" * 70)
-        elif tool_name == "WebContentFetcher":
-            # For web content, display a snippet
-            print("-" * 70)
-            lines = result.split('\n')
-            if len(lines) > 10:
-                # Show first few lines with ellipsis
-                print('\n'.join(lines[:10]))
-                print("...")
-                print(f"[Content truncated, total length: {len(result)} characters]")
-            else:
-                print(result)
-            print("-" * 70)
-        else:
-            # For other tools, display normally
-            print(result)
-            
-        self.history.append({"type": "tool_result", "content": {"name": tool_name, "result": result}})
+        self.emit({"type": "tool_result", "content": {"name": tool_name, "result": result}})
     
     def display_token_generation(self, token):
         """
@@ -111,8 +199,7 @@ class UserInterface:
         Args:
             token (str): The generated token.
         """
-        print(token, end="", flush=True)
-        self.history.append({"type": "token", "content": token})
+        self.emit({"type": "token", "content": token})
     
     def display_result(self, result):
         """
@@ -121,17 +208,13 @@ class UserInterface:
         Args:
             result (str): The final result to display.
         """
-        print("\n" + "=" * 80)
-        print("Final Answer:")
-        print(result)
-        print("=" * 80)
-        self.history.append({"type": "result", "content": result})
+        self.emit({"type": "result", "content": result})
     
     def get_history(self):
         """
         Get the interaction history.
         
         Returns:
-            list: The interaction history.
+            list: The most recent events, oldest first.
         """
-        return self.history
+        return self.history.get_events()
@@ -0,0 +1,323 @@
+# Cold Log Archive
+
+import json
+import os
+import re
+import sqlite3
+import zlib
+
+from agent.blob_store import decode_blob, encode_blob
+from agent.log_writer import load_tool_results
+
+
+def copy_lengths(conn, path, column, start, end, tool_name=None):
+    """
+    Copy the lengths of a database's tool calls within a time window into a lengths table.
+    
+    The database is attached to conn for the copy, so the lengths never leave
+    SQLite. A call already copied from another database, e.g. a log archived
+    while it was also still in the hot database, is only kept once.
+    
+    Args:
+        conn (sqlite3.Connection): An autocommit connection opened with uri=True and
+            holding a table lengths (log_id, position, tool_name, length) keyed by
+            (log_id, position).
+        path (str): The database file, the hot database or an archive partition.
+        column (str): "response_length" or "result_length".
+        start (str): Start of the window, as a UTC timestamp string.
+        end (str): End of the window, as a UTC timestamp string.
+        tool_name (str, optional): Only copy this tool's calls. Defaults to None (all tools).
+    """
+    conn.execute("ATTACH DATABASE ? AS source", (f"file:{path}?mode=ro",))
+    try:
+        conn.execute(f"""
+            INSERT OR IGNORE INTO lengths (log_id, position, tool_name, length)
+            SELECT log_id, position, tool_name, {column} FROM source.tool_calls
+            WHERE timestamp >= ? AND timestamp <= ? AND {column} IS NOT NULL
+              AND (? IS NULL OR tool_name = ?)
+        """, (start, end, tool_name, tool_name))
+    finally:
+        conn.execute("DETACH DATABASE source")
+
+
+class LogArchive:
+    """
+    Class for the date-partitioned archive of old interaction logs.
+    
+    Each UTC day of archived logs is a separate SQLite file named
+    logs_YYYY-MM-DD.db, so queries only open the days they cover. In an
+    archive file the response and tools of a log are stored together as one
+    zlib-compressed JSON payload, the tool results it references are stored
+    compressed, and the file is vacuumed once its day is complete.
+    """
+    
+    FILE_PATTERN = re.compile(r"^logs_(\d{4}-\d{2}-\d{2})\.db$")
+    
+    def __init__(self, archive_dir):
+        """
+        Initialize the archive.
+        
+        Args:
+            archive_dir (str): Directory holding the partition files.
+        """
+        self.archive_dir = archive_dir
+    
+    def partition_path(self, day):
+        """
+        Get the file of a day's partition.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+        
+        Returns:
+            str: The partition path.
+        """
+        return os.path.join(self.archive_dir, f"logs_{day}.db")
+    
+    def partitions(self, start_day=None, end_day=None):
+        """
+        List the archived days, optionally only those within a range.
+        
+        Args:
+            start_day (str, optional): First day to include, as "YYYY-MM-DD". Defaults to None.
+            end_day (str, optional): Last day to include, as "YYYY-MM-DD". Defaults to None.
+        
+        Returns:
+            list: The days in chronological order.
+        """
+        if not os.path.isdir(self.archive_dir):
+            return []
+        days = []
+        for name in os.listdir(self.archive_dir):
+            match = self.FILE_PATTERN.match(name)
+            if not match:
+                continue
+            day = match.group(1)
+            if (start_day is None or day >= start_day) and (end_day is None or day <= end_day):
+                days.append(day)
+        return sorted(days)
+    
+    def open_partition(self, day):
+        """
+        Open a day's partition for writing, creating it if needed.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+        
+        Returns:
+            sqlite3.Connection: The partition connection.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        conn = sqlite3.connect(self.partition_path(day))
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY,
+                timestamp TIMESTAMP NOT NULL,
+                user_query TEXT,
+                payload BLOB
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tool_calls (
+                log_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
+                tool_name TEXT NOT NULL,
+                result_length INTEGER,
+                response_length INTEGER,
+                result_hash TEXT,
+                PRIMARY KEY (log_id, position)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                compressed INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_calls_timestamp ON tool_calls (timestamp, tool_name)")
+        conn.commit()
+        return conn
+    
+    def write_batch(self, conn, logs, tool_calls, blobs):
+        """
+        Write a batch of logs to a partition and commit it.
+        
+        Writing is idempotent, so a batch can be archived again if deleting it
+        from the hot database did not complete.
+        
+        Args:
+            conn (sqlite3.Connection): A connection from open_partition().
+            logs (list): (id, timestamp, user_query, agent_response, tools_used) rows.
+            tool_calls (list): (log_id, position, timestamp, tool_name, result_length,
+                response_length, result_hash) rows.
+            blobs (list): (hash, size, compressed, data) rows.
+        """
+        log_rows = []
+        for log_id, timestamp, user_query, agent_response, tools_json in logs:
+            payload = json.dumps({
+                "agent_response": agent_response,
+                "tools_used": json.loads(tools_json) if tools_json else None
+            })
+            log_rows.append((log_id, timestamp, user_query, zlib.compress(payload.encode("utf-8"), 9)))
+        
+        blob_rows = []
+        for blob_hash, size, compressed, data in blobs:
+            if not compressed:
+                size, compressed, data = encode_blob(decode_blob(compressed, data), 0)
+            blob_rows.append((blob_hash, size, compressed, data))
+        
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?)", log_rows)
+            conn.executemany("INSERT OR REPLACE INTO tool_calls VALUES (?, ?, ?, ?, ?, ?, ?)", tool_calls)
+            conn.executemany("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)", blob_rows)
+    
+    def finish_partition(self, conn):
+        """
+        Pack a completed partition and close it.
+        
+        Args:
+            conn (sqlite3.Connection): A connection from open_partition().
+        """
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    
+    def _open_read(self, day):
+        """
+        Open a day's partition read-only.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+        
+        Returns:
+            sqlite3.Connection: The partition connection.
+        """
+        return sqlite3.connect(f"file:{self.partition_path(day)}?mode=ro", uri=True)
+    
+    def read_logs(self, day, start, end, limit=None, resolve_results=False):
+        """
+        Read the logs of a partition within a time window.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+            start (str): Start of the window, as a UTC timestamp string.
+            end (str): End of the window, as a UTC timestamp string.
+            limit (int, optional): Maximum number of logs. Defaults to None (all).
+            resolve_results (bool, optional): Whether to load referenced tool results. Defaults to False.
+        
+        Returns:
+            list: Log dictionaries in time order, as returned by AgentDatabase.get_log().
+        """
+        conn = self._open_read(day)
+        try:
+            rows = conn.execute("""
+                SELECT id, timestamp, user_query, payload FROM logs
+                WHERE timestamp >= ? AND timestamp <= ?
+                ORDER BY timestamp, id
+                LIMIT ?
+            """, (start, end, -1 if limit is None else limit)).fetchall()
+            
+            return [self._log_from_row(conn, row, resolve_results) for row in rows]
+        finally:
+            conn.close()
+    
+    def read_log(self, log_id, resolve_results=False):
+        """
+        Find an archived log by ID.
+        
+        The partitions are searched from the newest day back.
+        
+        Args:
+            log_id (int): The ID of the log.
+            resolve_results (bool, optional): Whether to load referenced tool results. Defaults to False.
+        
+        Returns:
+            dict: The log, as returned by AgentDatabase.get_log(), or None if no partition holds it.
+        """
+        for day in reversed(self.partitions()):
+            conn = self._open_read(day)
+            try:
+                row = conn.execute(
+                    "SELECT id, timestamp, user_query, payload FROM logs WHERE id = ?", (log_id,)
+                ).fetchone()
+                if row:
+                    return self._log_from_row(conn, row, resolve_results)
+            finally:
+                conn.close()
+        return None
+    
+    def _log_from_row(self, conn, row, resolve_results):
+        """
+        Build a log dictionary from a partition's logs row.
+        
+        Args:
+            conn (sqlite3.Connection): The partition connection the row was read with.
+            row (tuple): The (id, timestamp, user_query, payload) row.
+            resolve_results (bool): Whether to load referenced tool results.
+        
+        Returns:
+            dict: The log data.
+        """
+        log_id, timestamp, user_query, payload = row
+        data = json.loads(zlib.decompress(payload).decode("utf-8"))
+        tools_used = data["tools_used"]
+        if resolve_results:
+            load_tool_results(conn, tools_used)
+        return {
+            "id": log_id,
+            "timestamp": timestamp,
+            "user_query": user_query,
+            "agent_response": data["agent_response"],
+            "tools_used": tools_used
+        }
+    
+    def tool_usage(self, day, start, end):
+        """
+        Count the tool calls of a partition per tool within a time window.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+            start (str): Start of the window, as a UTC timestamp string.
+            end (str): End of the window, as a UTC timestamp string.
+        
+        Returns:
+            dict: Mapping of tool name to number of calls.
+        """
+        conn = self._open_read(day)
+        try:
+            return dict(conn.execute("""
+                SELECT tool_name, COUNT(*) FROM tool_calls
+                WHERE timestamp >= ? AND timestamp <= ?
+                GROUP BY tool_name
+            """, (start, end)).fetchall())
+        finally:
+            conn.close()
+    
+    def interaction_counts(self, day, start, end, bucket_seconds):
+        """
+        Count the logs of a partition per time bucket within a time window.
+        
+        Args:
+            day (str): The day, as "YYYY-MM-DD".
+            start (str): Start of the window, as a UTC timestamp string.
+            end (str): End of the window, as a UTC timestamp string.
+            bucket_seconds (int): Bucket width in seconds.
+        
+        Returns:
+            dict: Mapping of bucket start, in seconds since the epoch, to number of logs.
+        """
+        conn = self._open_read(day)
+        try:
+            return dict(conn.execute("""
+                SELECT CAST(strftime('%s', timestamp) AS INTEGER) / ? * ? AS bucket, COUNT(*)
+                FROM logs
+                WHERE timestamp >= ? AND timestamp <= ?
+                GROUP BY bucket
+            """, (bucket_seconds, bucket_seconds, start, end)).fetchall())
+        finally:
+            conn.close()
@@ -0,0 +1,286 @@
+# Background Log Writer
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from agent.blob_store import DEFAULT_COMPRESS_THRESHOLD, load_blobs, store_blobs
+
+
+INSERT_LOG = "INSERT INTO logs (id, timestamp, user_query, agent_response, tools_used) VALUES (?, ?, ?, ?, ?)"
+INSERT_TOOL_CALL = (
+    "INSERT INTO tool_calls (log_id, position, timestamp, tool_name, result_length, response_length, result_hash) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def current_timestamp():
+    """
+    Get the current UTC time in the format SQLite's CURRENT_TIMESTAMP uses.
+    
+    Returns:
+        str: The timestamp, e.g. "2024-01-31 12:00:00".
+    """
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+def blob_compress_threshold():
+    """
+    Get the size from which stored tool results are compressed.
+    
+    Returns:
+        int: The threshold in bytes, from LOG_BLOB_COMPRESS_THRESHOLD.
+    """
+    return int(os.getenv("LOG_BLOB_COMPRESS_THRESHOLD", str(DEFAULT_COMPRESS_THRESHOLD)))
+
+
+def stored_results(tools_used):
+    """
+    Iterate over the tool results that are stored as blobs.
+    
+    Args:
+        tools_used (list): The tools used in an interaction, or None.
+    
+    Yields:
+        str: Each string result.
+    """
+    for tool in tools_used or []:
+        if isinstance(tool, dict) and isinstance(tool.get("result"), str):
+            yield tool["result"]
+
+
+def reference_results(tools_used, hashes):
+    """
+    Replace the string results of tools by references to their blobs.
+    
+    The given tools are not modified.
+    
+    Args:
+        tools_used (list): The tools used in an interaction, or None.
+        hashes (dict): Mapping of result text to blob hash, from store_blobs().
+    
+    Returns:
+        list: The tools with "result" replaced by "result_hash", or None.
+    """
+    if not tools_used:
+        return tools_used
+    referenced = []
+    for tool in tools_used:
+        if isinstance(tool, dict) and isinstance(tool.get("result"), str):
+            result = tool["result"]
+            tool = {key: value for key, value in tool.items() if key != "result"}
+            tool["result_hash"] = hashes[result]
+        referenced.append(tool)
+    return referenced
+
+
+def load_tool_results(conn, tools_used):
+    """
+    Load the results referenced by hash back into their tools, in place.
+    
+    Args:
+        conn (sqlite3.Connection): A connection to the database holding the blobs.
+        tools_used (list): The stored tools of an interaction, or None.
+    
+    Returns:
+        list: The same tools, with "result_hash" replaced by "result".
+    """
+    referenced = [
+        tool for tool in tools_used or []
+        if isinstance(tool, dict) and "result_hash" in tool
+    ]
+    if referenced:
+        texts = load_blobs(conn, (tool["result_hash"] for tool in referenced))
+        for tool in referenced:
+            tool["result"] = texts.get(tool.pop("result_hash"))
+    return tools_used
+
+
+def insert_logs(conn, records):
+    """
+    Insert interaction logs and their tool calls.
+    
+    Tool results are stored once each in the blobs table and referenced by
+    hash from tools_used. Log IDs are allocated up front so that the logs and
+    tool_calls tables can each be filled with a single executemany. The
+    caller must hold the writer connection.
+    
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+        records (list): The (timestamp, user_query, agent_response, tools_used) tuples.
+    
+    Returns:
+        int: The ID of the first inserted log.
+    """
+    if not conn.in_transaction:
+        # Take the write lock now so no other process can allocate the same IDs
+        conn.execute("BEGIN IMMEDIATE")
+    # Never reuse the IDs of logs that were archived away
+    first_id = conn.execute("""
+        SELECT MAX(
+            COALESCE((SELECT MAX(id) FROM logs), 0),
+            COALESCE((SELECT value FROM meta WHERE key = 'archived_log_id'), 0)
+        ) + 1
+    """).fetchone()[0]
+    hashes = store_blobs(
+        conn,
+        (result for record in records for result in stored_results(record[3])),
+        blob_compress_threshold()
+    )
+    
+    log_rows = []
+    call_rows = []
+    for log_id, (timestamp, user_query, agent_response, tools_used) in enumerate(records, first_id):
+        tools_json = json.dumps(reference_results(tools_used, hashes)) if tools_used else None
+        log_rows.append((log_id, timestamp, user_query, agent_response, tools_json))
+        
+        response_length = len(agent_response) if agent_response is not None else None
+        for position, tool in enumerate(tools_used or []):
+            if isinstance(tool, dict):
+                name = tool.get("name")
+                result = tool.get("result")
+            else:
+                name, result = tool, None
+            result_length = len(str(result)) if result is not None else None
+            result_hash = hashes.get(result) if isinstance(result, str) else None
+            call_rows.append((log_id, position, timestamp, str(name), result_length, response_length, result_hash))
+    
+    conn.executemany(INSERT_LOG, log_rows)
+    if call_rows:
+        conn.executemany(INSERT_TOOL_CALL, call_rows)
+    return first_id
+
+
+class LogWriter:
+    """
+    Class that writes interaction logs to SQLite from a background thread.
+    
+    Logs are queued by the request path and written in batches, one
+    transaction per batch on the database's single writer connection, when
+    either batch_size logs are pending or flush_interval seconds have passed
+    since the first pending log. The queue is bounded: when it is full,
+    submitting blocks until the writer catches up. Encoding the tools and
+    splitting them into tool_calls rows also happens on the writer thread.
+    """
+    
+    _STOP = object()
+    _FLUSH = object()
+    
+    def __init__(self, manager, batch_size=100, flush_interval=0.5, max_queue=10000):
+        """
+        Initialize the writer and start its background thread.
+        
+        Args:
+            manager (ConnectionManager): Connection manager of the database.
+            batch_size (int, optional): Maximum number of logs per transaction. Defaults to 100.
+            flush_interval (float, optional): Maximum seconds a log waits before its batch
+                is written. Defaults to 0.5.
+            max_queue (int, optional): Maximum number of pending logs. Defaults to 10000.
+        """
+        self.manager = manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def submit(self, user_query, agent_response, tools_used, timeout=None):
+        """
+        Queue a log for writing, timestamped now.
+        
+        Args:
+            user_query (str): The user's query.
+            agent_response (str): The agent's response.
+            tools_used (list): The tools used, or None. The list must not be modified afterwards.
+            timeout (float, optional): Seconds to wait for queue space before giving up.
+                Defaults to None (wait indefinitely).
+        
+        Returns:
+            bool: True if the log was queued, False if the writer is closed or the queue stayed full.
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put((current_timestamp(), user_query, agent_response, tools_used), timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+    
+    def pending(self):
+        """
+        Get the number of logs waiting to be written.
+        
+        Returns:
+            int: The approximate queue length.
+        """
+        return self._queue.qsize()
+    
+    def flush(self):
+        """
+        Block until every queued log has been written.
+        """
+        if not self._closed:
+            # The marker ends the batch being collected instead of waiting out its interval
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+    
+    def close(self):
+        """
+        Write all pending logs and stop the background thread.
+        """
+        if self._closed:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._closed = True
+    
+    def _write_batch(self, batch):
+        """
+        Write a batch of logs in a single transaction.
+        
+        Args:
+            batch (list): The (timestamp, user_query, agent_response, tools_used) tuples.
+        """
+        try:
+            with self.manager.writer() as conn:
+                insert_logs(conn, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.failed += len(batch)
+            print(f"Error writing {len(batch)} logs: {e}")
+    
+    def _run(self):
+        """
+        Background loop: collect logs into batches and write them.
+        """
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            items = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while item is not self._STOP and item is not self._FLUSH and len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                items.append(item)
+            
+            stop = any(i is self._STOP for i in items)
+            batch = [i for i in items if i is not self._STOP and i is not self._FLUSH]
+            if batch:
+                self._write_batch(batch)
+            for _ in items:
+                self._queue.task_done()
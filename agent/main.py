@@ -21,44 +21,53 @@ from dotenv import load_dotenv
 from agent.llm_loader import LLMLoader
 from agent.database import AgentDatabase
 from agent.tool_database import ToolDatabase
+from agent.tool_registry import ToolRegistry
+from agent.snapshot import AgentSnapshot
 from agent.interface import UserInterface
+from agent import tracing
 from agent.tools.tool_judge import ToolJudge
 from agent.tools.query_encoder import QueryEncoder
 from agent.tools.tool_encoder import ToolEncoder
 
-# Import tool implementations
-from agent.tools.tool_implementations import (
-    WeatherAPI,
-    CapitalAPI,
-    SearchAPI,
-    CalculatorAPI,
-    TranslateAPI
-)
 
-# Import web tools
-from agent.tools.web_tools import (
-    WebSearch,
-    NewsSearch,
-    WebContentFetcher
-)
-
-# Import project tools
-from agent.tools.project_tools import ProjectFileProcessor
+def _event(event_type, content):
+    """
+    Build an agent event.
+    
+    Args:
+        event_type (str): The type of the event.
+        content: The payload of the event.
+    
+    Returns:
+        dict: The event.
+    """
+    return {"type": event_type, "content": content}
 
-# Load environment variables
-load_dotenv()
 
 class CoToolsAgent:
     """
     Main agent class implementing the Chain-of-Tools approach.
     """
     
-    def __init__(self):
+    def __init__(self, interface=None):
         """
         Initialize the CoTools agent with necessary components.
+        
+        Args:
+            interface (UserInterface, optional): The interface receiving the agent's events.
+                Defaults to a UserInterface configured from the environment.
         """
+        # Start of the start-to-first-query time
+        self._created_at = time.perf_counter()
+        self.startup_stats = {"snapshot": None, "initialize_s": None, "first_query_s": None}
+        
         # Initialize the user interface
-        self.interface = UserInterface()
+        self.interface = interface if interface is not None else UserInterface()
+        
+        # Enable span tracing to a JSONL file if requested
+        trace_file = os.getenv("TRACE_FILE")
+        if trace_file and tracing.get_tracer() is None:
+            tracing.configure_tracing(tracing.JsonlExporter(trace_file))
         
         # Initialize the LLM
         model_path = os.getenv("MODEL_PATH", "models/frozen_llm")
@@ -73,22 +82,21 @@ class CoToolsAgent:
         # Initialize the database
         db_path = os.getenv("DATABASE_PATH", "database/agent_data.db")
         self.db = AgentDatabase(db_path)
-        self.tool_db = ToolDatabase(db_path, self.tool_encoder)
-        
-        # Initialize available tools
-        self.tools = {
-            "WeatherAPI": WeatherAPI(),
-            "CapitalAPI": CapitalAPI(),
-            "SearchAPI": SearchAPI(),
-            "CalculatorAPI": CalculatorAPI(),
-            "TranslateAPI": TranslateAPI(),
-            # Web tools
-            "WebSearch": WebSearch(),
-            "NewsSearch": NewsSearch(),
-            "WebContentFetcher": WebContentFetcher(),
-            # Project tools
-            "ProjectFileProcessor": ProjectFileProcessor()
-        }
+        
+        # Tools are imported and instantiated on first selection
+        self.tools = ToolRegistry()
+        self.tool_db = ToolDatabase(db_path, self.tool_encoder, db=self.db, registry=self.tools)
+        
+        # Snapshot of the derived startup state, restored instead of rebuilt on later starts
+        self.snapshot = None
+        if db_path != ":memory:" and os.getenv("SNAPSHOT_ENABLED", "True").lower() == "true":
+            snapshot_dir = os.getenv("SNAPSHOT_DIR", os.path.join(os.path.dirname(db_path), "snapshots"))
+            self.snapshot = AgentSnapshot(snapshot_dir, db_path)
+            # Keep the snapshot current when the catalog is reloaded, e.g. after ingestion
+            self.tool_db.on_reload = self.save_snapshot
+        
+        # Simulated token and tool latency, disabled for benchmarks and load tests
+        self.simulate_latency = os.getenv("SIMULATE_LATENCY", "True").lower() == "true"
         
         # Tracking for the current interaction
         self.current_query = ""
@@ -110,18 +118,48 @@ class CoToolsAgent:
         # Initialize the database - continue even with errors for demo
         try:
             self.db.initialize_database()
+            if os.getenv("ASYNC_LOGGING", "True").lower() == "true":
+                self.db.enable_async_logging(
+                    batch_size=int(os.getenv("LOG_BATCH_SIZE", "100")),
+                    flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "0.5")),
+                    max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+                )
         except Exception as e:
             print(f"Database warning: {e}. Continuing with limited functionality.")
         
         # Initialize tool database - continue even with errors for demo
         try:
-            self.tool_db.initialize()
+            with tracing.span("snapshot.load") as snapshot_span:
+                restored = self.snapshot is not None and self.snapshot.load(self)
+                snapshot_span.set_attribute("restored", restored)
+            if restored:
+                self.startup_stats["snapshot"] = "restored"
+                print(f"Restored the tool index and judge from snapshot {self.snapshot.path}")
+            else:
+                self.tool_db.initialize()
+                self.save_snapshot()
         except Exception as e:
             print(f"Tool database warning: {e}. Continuing with limited functionality.")
         
+        self.startup_stats["initialize_s"] = time.perf_counter() - self._created_at
         print("CoTools Agent initialized successfully.")
         return True
     
+    def save_snapshot(self):
+        """
+        Save the agent's derived startup state for later starts, if snapshots are enabled.
+        
+        Returns:
+            bool: True if a snapshot was saved, False otherwise.
+        """
+        if self.snapshot is None:
+            return False
+        with tracing.span("snapshot.save"):
+            saved = self.snapshot.save(self)
+        if saved:
+            self.startup_stats["snapshot"] = "saved"
+        return saved
+    
     def process_query(self, query):
         """
         Process a user query using the Chain-of-Tools approach.
@@ -132,20 +170,48 @@ class CoToolsAgent:
         Returns:
             str: The final answer.
         """
+        final_answer = ""
+        for event in self.process_query_stream(query):
+            self.interface.emit(event)
+            if event["type"] == "result":
+                final_answer = event["content"]
+        
+        # Let the output sinks catch up before handing the answer back
+        self.interface.flush()
+        
+        return final_answer
+    
+    def process_query_stream(self, query):
+        """
+        Process a user query, yielding events as soon as they are produced.
+        
+        Each event is a dict with a "type" and a "content" key. The types are
+        "query", "thinking", "tool_check" (judge score), "tool_selection",
+        "tool_call", "tool_result", "token" and finally "result", whose
+        content is the final answer.
+        
+        Args:
+            query (str): The user's query.
+        
+        Yields:
+            dict: The next event of the interaction.
+        """
         # Reset tracking for this interaction
         self.current_query = query
         self.current_answer = ""
         self.tools_used = []
         
-        # Display the query
-        self.interface.display_query(query)
-        
-        # Prepare the initial input
-        self.interface.display_thinking("Preparing initial input...")
-        input_sequence = self._prepare_initial_input(query)
-        
-        # Start the CoT reasoning loop
-        return self._cot_reasoning_loop(input_sequence)
+        with tracing.span("process_query", query_length=len(query)):
+            # Emit the query
+            yield _event("query", query)
+            
+            # Prepare the initial input
+            yield _event("thinking", "Preparing initial input...")
+            input_sequence = self._prepare_initial_input(query)
+            yield _event("thinking", "Initial prompt prepared with Chain of Thought structure.")
+            
+            # Run the CoT reasoning loop
+            yield from self._cot_reasoning_loop(input_sequence)
     
     def _prepare_initial_input(self, query):
         """
@@ -164,7 +230,6 @@ class CoToolsAgent:
             "I'll break this down to determine what we need to know:\n"
         )
         
-        self.interface.display_thinking("Initial prompt prepared with Chain of Thought structure.")
         return cot_prompt
     
     def _cot_reasoning_loop(self, input_sequence):
@@ -174,8 +239,8 @@ class CoToolsAgent:
         Args:
             input_sequence (str): The current input sequence.
         
-        Returns:
-            str: The final answer.
+        Yields:
+            dict: The events of each reasoning step, ending with the final answer.
         """
         # For demonstration purposes, we'll use a simulated reasoning process
         # In a real implementation, this would involve generating tokens one by one
@@ -186,52 +251,62 @@ class CoToolsAgent:
         while current_step < max_steps:
             current_step += 1
             
-            # Generate the next candidate token and hidden state
-            self.interface.display_thinking(f"Step {current_step}: Generating candidate token...")
-            hidden_state = self.llm.compute_hidden_state(input_sequence)
-            
-            # Check if a tool is needed using the Tool Judge
-            self.interface.display_thinking("Checking if a tool is needed at this step...")
-            score = self.tool_judge.calculate_score(hidden_state)
-            self.interface.display_tool_check(score)
-            
-            if self.tool_judge.check_tool_needed(hidden_state):
-                # Tool is needed, proceed to tool retrieval and calling
-                self.interface.display_thinking("Decision: Tool required. Preparing tool retrieval...")
-                tool_result = self._retrieve_and_call_tool(input_sequence, current_step)
-                
-                # Integrate the tool result into the answer fragment
-                input_sequence += f"\nUsing a tool, I found: {tool_result}\n"
-                self.current_answer += f"\nUsing a tool, I found: {tool_result}\n"
-            else:
-                # No tool needed, generate the next token
-                self.interface.display_thinking("Decision: No tool needed. Generating next token...")
-                next_token, _ = self.llm.generate_token(input_sequence)
+            with tracing.span("reasoning_step", step=current_step) as step_span:
+                # Generate the next candidate token and hidden state
+                yield _event("thinking", f"Step {current_step}: Generating candidate token...")
+                with tracing.span("llm.compute_hidden_state", input_length=len(input_sequence)):
+                    hidden_state = self.llm.compute_hidden_state(input_sequence)
                 
-                # For demonstration purposes, we'll generate a longer fragment
-                if current_step == 1:
-                    next_fragment = "First, I need to understand what information we're looking for. "
-                elif current_step == 2:
-                    next_fragment = "Based on the query, we need to find: (1) the weather in a destination city yesterday, and (2) the capital of that country."
-                elif current_step == 3:
-                    # This will trigger a tool need in the next step
-                    next_fragment = "Let's determine what the destination city is from the context."
-                elif current_step == 5:
-                    next_fragment = "Now that we have the weather information, let's find the capital of the country."
-                elif current_step == 7:
-                    next_fragment = "To summarize the information we've found:"
-                elif current_step == 8:
-                    next_fragment = "Therefore, the answer is: The weather in Paris yesterday was cloudy and 65\u00b0F, and Paris is the capital of France."
-                else:
-                    next_fragment = next_token
+                # Check if a tool is needed using the Tool Judge
+                yield _event("thinking", "Checking if a tool is needed at this step...")
+                with tracing.span("tool_judge.calculate_score") as judge_span:
+                    score = self.tool_judge.calculate_score(hidden_state)
+                    judge_span.set_attribute("score", score)
+                yield _event("tool_check", score)
                 
-                # Display token-by-token generation (simulated)
-                for token in next_fragment.split():
-                    self.interface.display_token_generation(token + " ")
-                    time.sleep(0.1)  # Simulate token generation time
+                with tracing.span("tool_judge.check_tool_needed") as judge_span:
+                    tool_needed = self.tool_judge.check_tool_needed(hidden_state)
+                    judge_span.set_attribute("tool_needed", tool_needed)
+                step_span.set_attribute("tool_needed", tool_needed)
                 
-                input_sequence += next_fragment
-                self.current_answer += next_fragment
+                if tool_needed:
+                    # Tool is needed, proceed to tool retrieval and calling
+                    yield _event("thinking", "Decision: Tool required. Preparing tool retrieval...")
+                    tool_result = yield from self._retrieve_and_call_tool(input_sequence, current_step)
+                    
+                    # Integrate the tool result into the answer fragment
+                    input_sequence += f"\nUsing a tool, I found: {tool_result}\n"
+                    self.current_answer += f"\nUsing a tool, I found: {tool_result}\n"
+                else:
+                    # No tool needed, generate the next token
+                    yield _event("thinking", "Decision: No tool needed. Generating next token...")
+                    next_token, _ = self.llm.generate_token(input_sequence)
+                    
+                    # For demonstration purposes, we'll generate a longer fragment
+                    if current_step == 1:
+                        next_fragment = "First, I need to understand what information we're looking for. "
+                    elif current_step == 2:
+                        next_fragment = "Based on the query, we need to find: (1) the weather in a destination city yesterday, and (2) the capital of that country."
+                    elif current_step == 3:
+                        # This will trigger a tool need in the next step
+                        next_fragment = "Let's determine what the destination city is from the context."
+                    elif current_step == 5:
+                        next_fragment = "Now that we have the weather information, let's find the capital of the country."
+                    elif current_step == 7:
+                        next_fragment = "To summarize the information we've found:"
+                    elif current_step == 8:
+                        next_fragment = "Therefore, the answer is: The weather in Paris yesterday was cloudy and 65\u00b0F, and Paris is the capital of France."
+                    else:
+                        next_fragment = next_token
+                    
+                    # Stream token-by-token generation (simulated)
+                    for token in next_fragment.split():
+                        yield _event("token", token + " ")
+                        if self.simulate_latency:
+                            time.sleep(0.1)  # Simulate token generation time
+                    
+                    input_sequence += next_fragment
+                    self.current_answer += next_fragment
             
             # Check if we've reached the end of the reasoning process
             if "Therefore, the answer is:" in input_sequence and current_step >= 8:
@@ -239,16 +314,19 @@ class CoToolsAgent:
         
         # Finalize the response
         final_answer = self.current_answer.strip()
-        self.interface.display_result(final_answer)
         
         # Log the interaction
-        self.db.log_interaction(
-            self.current_query,
-            final_answer,
-            self.tools_used
-        )
+        with tracing.span("db.log_interaction", tools_used=len(self.tools_used)):
+            self.db.log_interaction(
+                self.current_query,
+                final_answer,
+                self.tools_used
+            )
         
-        return final_answer
+        if self.startup_stats["first_query_s"] is None:
+            self.startup_stats["first_query_s"] = time.perf_counter() - self._created_at
+        
+        yield _event("result", final_answer)
     
     def _retrieve_and_call_tool(self, input_sequence, current_step):
         """
@@ -258,20 +336,27 @@ class CoToolsAgent:
             input_sequence (str): The current input sequence.
             current_step (int): The current reasoning step.
         
+        Yields:
+            dict: The events of the tool retrieval and call.
+        
         Returns:
             str: The result of the tool call.
         """
-        self.interface.display_thinking("Preparing retrieval input...")
+        yield _event("thinking", "Preparing retrieval input...")
         
         # Construct a retrieval prompt from the current context
         retrieval_prompt = f"Based on the context: '{input_sequence}', what tool is needed?"
         
-        self.interface.display_thinking("Computing query vector...")
-        query_vector = self.query_encoder.encode(retrieval_prompt)
+        yield _event("thinking", "Computing query vector...")
+        with tracing.span("query_encoder.encode", prompt_length=len(retrieval_prompt)):
+            query_vector = self.query_encoder.encode(retrieval_prompt)
         
         # Find the most similar tool
-        self.interface.display_thinking("Calculating tool similarities...")
-        tool_id, score = self.tool_db.find_similar_tool(query_vector)
+        yield _event("thinking", "Calculating tool similarities...")
+        with tracing.span("tool_db.find_similar_tool") as retrieval_span:
+            tool_id, score = self.tool_db.find_similar_tool(query_vector)
+            retrieval_span.set_attribute("tool_id", tool_id)
+            retrieval_span.set_attribute("score", score)
         
         # Get the tool information
         tool_info = self.tool_db.get_tool(tool_id)
@@ -326,19 +411,23 @@ class CoToolsAgent:
             parameters = {"query": "weather in Paris"}
             result = "Found information about weather in Paris"
         
-        # Display the selected tool
-        self.interface.display_tool_selection(tool_name, tool_description, score)
+        # Emit the selected tool
+        yield _event("tool_selection", {"name": tool_name, "description": tool_description, "score": score})
         
-        # Display the tool call with parameters
-        self.interface.display_tool_call(tool_name, parameters)
+        # Emit the tool call with parameters
+        yield _event("tool_call", {"name": tool_name, "parameters": parameters})
         
-        # Execute the tool call
-        # In a real implementation, this would use the actual tool implementation
-        self.interface.display_thinking(f"Executing {tool_name}...")
-        time.sleep(0.5)  # Simulate tool execution time
+        # Execute the tool call, loading the tool on its first selection
+        # In a real implementation, this would call the tool's registered method
+        yield _event("thinking", f"Executing {tool_name}...")
+        with tracing.span("tool.execute", tool=tool_name, step=current_step, score=score) as execute_span:
+            execute_span.set_attribute("loaded", self.tools.is_loaded(tool_name))
+            self.tools.get(tool_name)
+            if self.simulate_latency:
+                time.sleep(0.5)  # Simulate tool execution time
         
-        # Display the tool result
-        self.interface.display_tool_result(tool_name, result)
+        # Emit the tool result
+        yield _event("tool_result", {"name": tool_name, "result": result})
         
         # Track the tool usage
         self.tools_used.append({
@@ -354,6 +443,9 @@ def main():
     """
     Main function to run the CoTools Agent demonstration.
     """
+    # Load environment variables
+    load_dotenv()
+    
     # Initialize the agent
     agent = CoToolsAgent()
     if not agent.initialize():
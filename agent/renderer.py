@@ -0,0 +1,140 @@
+# Terminal Renderer for Agent Output
+
+import sys
+import threading
+import time
+
+from agent.event_sink import EventSink
+
+
+def truncate_lines(text, max_lines):
+    """
+    Return the first lines of a text, scanning only as far as needed.
+    
+    Unlike text.split('\\n'), this stops after locating the newline that ends
+    the last kept line, so the cost does not depend on the size of the text.
+    
+    Args:
+        text (str): The text to truncate.
+        max_lines (int): The maximum number of lines to keep.
+    
+    Returns:
+        tuple: (head, truncated) where head is the kept text and truncated is
+            True if anything was cut off.
+    """
+    position = -1
+    for _ in range(max_lines):
+        position = text.find("\n", position + 1)
+        if position == -1:
+            return text, False
+    return text[:position], True
+
+
+class TerminalRenderer(EventSink):
+    """
+    Sink that renders events to a terminal at a fixed refresh rate.
+    
+    Output is accumulated and drawn in frames by a background thread, so a
+    burst of tokens costs one write and one flush per frame instead of one
+    per token. When the stream is not a TTY, the renderer degrades to plain
+    buffered writes that are only flushed on demand.
+    """
+    
+    def __init__(self, stream=None, formatter=str, refresh_rate=30.0):
+        """
+        Initialize the renderer.
+        
+        Args:
+            stream (optional): The text stream to render to. Defaults to sys.stdout.
+            formatter (callable, optional): Turns an event into the text to write. Defaults to str.
+            refresh_rate (float, optional): Frames per second when rendering to a TTY. Defaults to 30.
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.formatter = formatter
+        self.frame_interval = 1.0 / refresh_rate if refresh_rate > 0 else 0.0
+        self.is_tty = self._stream_is_tty(self.stream)
+        
+        self._pending = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._wakeup = threading.Event()
+        self._thread = None
+        if self.is_tty and self.frame_interval > 0:
+            self._thread = threading.Thread(target=self._frame_loop, name="TerminalRenderer", daemon=True)
+            self._thread.start()
+    
+    @staticmethod
+    def _stream_is_tty(stream):
+        """
+        Check whether a stream is attached to a terminal.
+        
+        Args:
+            stream: The stream to check.
+        
+        Returns:
+            bool: True if the stream is a TTY, False otherwise.
+        """
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+    
+    def emit(self, event):
+        """
+        Queue the formatted event for the next frame.
+        
+        Args:
+            event (dict): The event to render.
+        """
+        text = self.formatter(event)
+        with self._lock:
+            if self._thread is None:
+                # Not a TTY: rely on the stream's own buffering
+                self.stream.write(text)
+            else:
+                self._pending.append(text)
+                self._wakeup.set()
+    
+    def flush(self):
+        """
+        Draw any pending output immediately and flush the stream.
+        """
+        with self._lock:
+            self._draw()
+            try:
+                self.stream.flush()
+            except ValueError:
+                pass
+    
+    def close(self):
+        """
+        Stop the frame thread and draw any remaining output.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+    
+    def _draw(self):
+        """
+        Write the pending output as a single frame. The caller holds the lock.
+        """
+        if self._pending:
+            frame = "".join(self._pending)
+            self._pending = []
+            self.stream.write(frame)
+    
+    def _frame_loop(self):
+        """
+        Background loop drawing at most one frame per refresh interval.
+        """
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed:
+                return
+            self.flush()
+            time.sleep(self.frame_interval)
@@ -0,0 +1,368 @@
+# Asyncio HTTP Front End for the Agent
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from agent.event_sink import NullSink
+from agent.interface import UserInterface
+
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+_END = object()
+
+
+def create_headless_agent():
+    """
+    Create and initialize an agent that does not write to the terminal.
+    
+    Returns:
+        CoToolsAgent: The initialized agent, or None if initialization failed.
+    """
+    from agent.main import CoToolsAgent
+    
+    agent = CoToolsAgent(interface=UserInterface(sinks=[NullSink()]))
+    if not agent.initialize():
+        return None
+    return agent
+
+
+class AgentWorker:
+    """
+    An agent bound to its own thread.
+    
+    The agent is created and used on a single dedicated thread, so its
+    per-interaction state and database connections are never shared.
+    """
+    
+    def __init__(self, agent_factory):
+        """
+        Initialize the worker thread and create its agent on it.
+        
+        Args:
+            agent_factory (callable): Returns an initialized agent, or None on failure.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AgentWorker")
+        self.agent = self.executor.submit(agent_factory).result()
+        if self.agent is None:
+            raise RuntimeError("Failed to initialize the agent.")
+    
+    def stream(self, query, loop, events, cancelled):
+        """
+        Run a query on the worker thread, forwarding events to an asyncio queue.
+        
+        Args:
+            query (str): The user's query.
+            loop (asyncio.AbstractEventLoop): The loop owning the events queue.
+            events (asyncio.Queue): The queue receiving the events.
+            cancelled (threading.Event): Set when the client has gone away.
+        
+        Returns:
+            concurrent.futures.Future: Completes when the query has finished.
+        """
+        return self.executor.submit(self._run, query, loop, events, cancelled)
+    
+    def _run(self, query, loop, events, cancelled):
+        """
+        Iterate the agent's event stream and hand each event to the loop.
+        """
+        stream = self.agent.process_query_stream(query)
+        try:
+            for event in stream:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(events.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(events.put_nowait, {"type": "error", "content": str(e)})
+        finally:
+            stream.close()
+            loop.call_soon_threadsafe(events.put_nowait, _END)
+    
+    def shutdown(self):
+        """
+        Stop the worker thread.
+        """
+        self.executor.shutdown(wait=True)
+
+
+class AgentServer:
+    """
+    Minimal HTTP/1.1 server built on asyncio streams.
+    
+    Endpoints:
+        GET /health: Server status and load as JSON.
+        POST /query: Body {"query": "..."}; also GET /query?q=...
+            Events are streamed back as Server-Sent Events when the client
+            sends "Accept: text/event-stream", and as chunked
+            newline-delimited JSON otherwise.
+    
+    At most max_concurrency queries run at once, one per agent worker.
+    Up to max_queue further requests wait for a free worker; beyond that
+    requests are rejected with 503.
+    """
+    
+    def __init__(self, host="127.0.0.1", port=8000, max_concurrency=4, max_queue=64,
+                 agent_factory=create_headless_agent, max_body_size=65536):
+        """
+        Initialize the server.
+        
+        Args:
+            host (str, optional): Address to bind. Defaults to "127.0.0.1".
+            port (int, optional): Port to bind, 0 for any free port. Defaults to 8000.
+            max_concurrency (int, optional): Number of agent workers. Defaults to 4.
+            max_queue (int, optional): Number of requests allowed to wait for a worker. Defaults to 64.
+            agent_factory (callable, optional): Creates an initialized agent for each worker.
+            max_body_size (int, optional): Largest accepted request body in bytes. Defaults to 65536.
+        """
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.agent_factory = agent_factory
+        self.max_body_size = max_body_size
+        
+        self.workers = []
+        self._idle = None
+        self._server = None
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+    
+    async def start(self):
+        """
+        Create the agent workers and start listening.
+        
+        Returns:
+            int: The port the server is listening on.
+        """
+        loop = asyncio.get_running_loop()
+        self._idle = asyncio.Queue()
+        for _ in range(self.max_concurrency):
+            worker = await loop.run_in_executor(None, AgentWorker, self.agent_factory)
+            self.workers.append(worker)
+            self._idle.put_nowait(worker)
+        
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+    
+    async def serve_forever(self):
+        """
+        Start the server and serve requests until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        print(f"Serving Chain-of-Tools agent on http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self):
+        """
+        Stop listening and shut down the agent workers.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            await loop.run_in_executor(None, worker.shutdown)
+        self.workers = []
+    
+    async def _handle_connection(self, reader, writer):
+        """
+        Read one request from the connection and dispatch it.
+        """
+        try:
+            request = await self._read_request(reader)
+            if request is None:
+                return
+            method, path, query_params, headers, body = request
+            
+            if path == "/health":
+                await self._send_json(writer, 200, self.health())
+            elif path == "/query":
+                if method == "GET":
+                    query = query_params.get("q", [""])[0]
+                elif method == "POST":
+                    try:
+                        query = json.loads(body or b"{}").get("query", "")
+                    except (ValueError, AttributeError):
+                        await self._send_json(writer, 400, {"error": "Body must be a JSON object."})
+                        return
+                else:
+                    await self._send_json(writer, 405, {"error": "Use GET or POST."})
+                    return
+                
+                if not query:
+                    await self._send_json(writer, 400, {"error": "Missing query."})
+                    return
+                sse = "text/event-stream" in headers.get("accept", "")
+                await self._stream_query(writer, query, sse)
+            else:
+                await self._send_json(writer, 404, {"error": f"Unknown path {path}."})
+        except ValueError as e:
+            await self._send_json(writer, 413 if "too large" in str(e) else 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def _read_request(self, reader):
+        """
+        Parse the request line, headers and body.
+        
+        Returns:
+            tuple: (method, path, query_params, headers, body), or None if the
+                client closed the connection without sending a request.
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line.")
+        method, target, _ = parts
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        length = int(headers.get("content-length", "0") or 0)
+        if length > self.max_body_size:
+            raise ValueError("Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        
+        url = urlsplit(target)
+        return method.upper(), url.path, parse_qs(url.query), headers, body
+    
+    def health(self):
+        """
+        Describe the server status and load.
+        
+        Returns:
+            dict: The health report.
+        """
+        return {
+            "status": "ok" if self.workers else "starting",
+            "workers": len(self.workers),
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+    
+    async def _send_json(self, writer, status, payload):
+        """
+        Send a complete JSON response.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    
+    async def _acquire_worker(self):
+        """
+        Wait for an idle worker, or return None if the wait queue is full.
+        """
+        if self._idle.empty() and self.queued >= self.max_queue:
+            return None
+        self.queued += 1
+        try:
+            return await self._idle.get()
+        finally:
+            self.queued -= 1
+    
+    async def _stream_query(self, writer, query, sse):
+        """
+        Run a query on an agent worker and stream its events to the client.
+        """
+        worker = await self._acquire_worker()
+        if worker is None:
+            self.rejected += 1
+            await self._send_json(writer, 503, {"error": "Server busy, try again later."})
+            return
+        
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        cancelled = threading.Event()
+        self.active += 1
+        try:
+            content_type = "text/event-stream" if sse else "application/x-ndjson"
+            head = (
+                "HTTP/1.1 200 OK\r\n"
+                f"Content-Type: {content_type}\r\n"
+                "Cache-Control: no-cache\r\n"
+                "Transfer-Encoding: chunked\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1"))
+            
+            done = worker.stream(query, loop, events, cancelled)
+            try:
+                while True:
+                    event = await events.get()
+                    if event is _END:
+                        break
+                    data = json.dumps(event, default=str)
+                    if sse:
+                        chunk = f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8")
+                    else:
+                        chunk = (data + "\n").encode("utf-8")
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            finally:
+                # Stop the agent early if the client went away, and only
+                # return the worker once its thread is idle again
+                cancelled.set()
+                await asyncio.wrap_future(done)
+            self.completed += 1
+        finally:
+            self.active -= 1
+            self._idle.put_nowait(worker)
+
+
+def serve(host="127.0.0.1", port=8000, max_concurrency=4, max_queue=64):
+    """
+    Run the HTTP front end until interrupted.
+    
+    Args:
+        host (str, optional): Address to bind. Defaults to "127.0.0.1".
+        port (int, optional): Port to bind. Defaults to 8000.
+        max_concurrency (int, optional): Number of queries processed at once. Defaults to 4.
+        max_queue (int, optional): Number of requests allowed to wait. Defaults to 64.
+    """
+    server = AgentServer(host, port, max_concurrency, max_queue)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
@@ -0,0 +1,189 @@
+# Warm-Start Snapshots
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+
+# Bump when the layout of a snapshot changes
+SNAPSHOT_FORMAT = 1
+
+# Sources whose code shapes the snapshotted state, relative to the agent package
+SOURCE_FILES = (
+    "snapshot.py",
+    "tool_database.py",
+    "tool_registry.py",
+    os.path.join("tools", "tool_encoder.py"),
+    os.path.join("tools", "tool_judge.py"),
+)
+
+
+def source_hashes():
+    """
+    Hash the sources the snapshotted state is derived with.
+    
+    Returns:
+        dict: Mapping of source file to the hex SHA-256 digest of its content.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    hashes = {}
+    for name in SOURCE_FILES:
+        with open(os.path.join(package_dir, name), "rb") as f:
+            hashes[name.replace(os.sep, "/")] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+def _json_hash(value):
+    """
+    Hash a JSON-serializable value independently of dictionary order.
+    
+    Args:
+        value: The value.
+    
+    Returns:
+        str: The hex SHA-256 digest of its canonical JSON.
+    """
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class AgentSnapshot:
+    """
+    Class for saving and restoring the derived startup state of an agent.
+    
+    A snapshot holds the compiled tool judge matcher, the tool catalog with
+    its vector matrix and row IDs, and the tool registry metadata. It lives
+    in a directory per snapshot format and database under cache_dir, and is
+    only restored when the format, the hashes of the sources that build the
+    state, the tool catalog version of the database, the registry, the
+    judge keywords and the embedding dimension all still match; otherwise
+    the agent initializes normally and saves a new snapshot. The matrix is
+    memory-mapped copy-on-write, so restoring does not read it up front and
+    changes to the index never reach the file.
+    """
+    
+    def __init__(self, cache_dir, db_path):
+        """
+        Initialize the snapshot location.
+        
+        Args:
+            cache_dir (str): Directory holding the snapshots.
+            db_path (str): Path of the database the snapshotted state comes from.
+        """
+        self.db_path = os.path.abspath(db_path)
+        db_key = hashlib.sha256(self.db_path.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"v{SNAPSHOT_FORMAT}", db_key)
+    
+    def _manifest(self, agent, catalog_version):
+        """
+        Describe the state of an agent that a snapshot must match.
+        
+        Args:
+            agent (CoToolsAgent): The agent.
+            catalog_version (int): Tool catalog version of the agent's database.
+        
+        Returns:
+            dict: The manifest, without the saving details.
+        """
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "sources": source_hashes(),
+            "db_path": self.db_path,
+            "tool_catalog_version": catalog_version,
+            "registry": _json_hash(agent.tools.metadata()),
+            "judge_keywords": _json_hash(agent.tool_judge.tool_keywords),
+            "embedding_dim": agent.tool_encoder.embedding_dim
+        }
+    
+    def load(self, agent):
+        """
+        Restore a matching snapshot into an agent.
+        
+        The agent's database must be initialized.
+        
+        Args:
+            agent (CoToolsAgent): The agent.
+        
+        Returns:
+            bool: True if the snapshot was restored, False if there is none or it is stale.
+        """
+        try:
+            with open(os.path.join(self.path, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        catalog_version = agent.db.get_tool_catalog_version()
+        if catalog_version is None:
+            return False
+        expected = self._manifest(agent, catalog_version)
+        if any(manifest.get(key) != value for key, value in expected.items()):
+            return False
+        
+        try:
+            with open(os.path.join(self.path, "tools.json"), encoding="utf-8") as f:
+                tools = json.load(f)
+            with open(os.path.join(self.path, "judge.json"), encoding="utf-8") as f:
+                judge_state = json.load(f)
+            matrix = np.load(os.path.join(self.path, "matrix.npy"), mmap_mode="c")
+            row_ids = np.load(os.path.join(self.path, "row_ids.npy"), mmap_mode="c")
+        except (OSError, ValueError) as e:
+            print(f"Snapshot warning: {e}. Rebuilding the snapshot.")
+            return False
+        
+        agent.tool_judge.load_compiled(judge_state)
+        agent.tool_db.restore_index(tools, matrix, row_ids)
+        return True
+    
+    def save(self, agent):
+        """
+        Save the derived state of an initialized agent, replacing any older snapshot.
+        
+        The snapshot is written to a temporary directory first, so a
+        half-written snapshot is never loaded.
+        
+        Args:
+            agent (CoToolsAgent): The agent.
+        
+        Returns:
+            bool: True if the snapshot was saved, False otherwise.
+        """
+        catalog_version = agent.db.get_tool_catalog_version()
+        if catalog_version is None:
+            return False
+        
+        manifest = self._manifest(agent, catalog_version)
+        manifest["created_at"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        tools, matrix, row_ids = agent.tool_db.export_index()
+        manifest["tools"] = len(tools)
+        
+        parent = os.path.dirname(self.path)
+        try:
+            os.makedirs(parent, exist_ok=True)
+            tmp_path = tempfile.mkdtemp(prefix=".snapshot-", dir=parent)
+            try:
+                np.save(os.path.join(tmp_path, "matrix.npy"), np.ascontiguousarray(matrix, dtype=np.float32))
+                np.save(os.path.join(tmp_path, "row_ids.npy"), np.asarray(row_ids, dtype=np.int64))
+                with open(os.path.join(tmp_path, "tools.json"), "w", encoding="utf-8") as f:
+                    json.dump(tools, f)
+                with open(os.path.join(tmp_path, "judge.json"), "w", encoding="utf-8") as f:
+                    json.dump(agent.tool_judge.compile(), f)
+                with open(os.path.join(tmp_path, "registry.json"), "w", encoding="utf-8") as f:
+                    json.dump(agent.tools.metadata(), f, indent=2)
+                with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                
+                if os.path.exists(self.path):
+                    shutil.rmtree(self.path)
+                os.rename(tmp_path, self.path)
+            except BaseException:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                raise
+            return True
+        except OSError as e:
+            print(f"Snapshot warning: {e}. Continuing without a snapshot.")
+            return False
@@ -1,32 +1,59 @@
 # Tool Database Module
 
-import json
 import os
+import json
 import numpy as np
 from agent.database import AgentDatabase
+from agent.tool_registry import ToolRegistry
 
 class ToolDatabase:
     """
     Class for managing the tool database, including tool descriptions and vectors.
     """
     
-    def __init__(self, db_path, tool_encoder=None):
+    def __init__(self, db_path, tool_encoder=None, db=None, registry=None):
         """
         Initialize the tool database with the given path and tool encoder.
         
         Args:
             db_path (str): Path to the database file.
             tool_encoder: Tool encoder instance for computing tool vectors.
+            db (AgentDatabase, optional): Existing database handle to share. Defaults to None.
+            registry (ToolRegistry, optional): Registry whose tools are added to the catalog.
+                Defaults to None (the built-in tools).
         """
-        self.db = AgentDatabase(db_path)
+        self.db = db if db is not None else AgentDatabase(db_path)
+        self.registry = registry if registry is not None else ToolRegistry()
+        # Called after every reload, e.g. to rebuild a snapshot of the index
+        self.on_reload = None
         self.tool_encoder = tool_encoder
+        self._clear()
+    
+    def _clear(self):
+        """
+        Empty the in-memory catalog and vector index.
+        """
         self.tools = {}
-        self.tool_vectors = {}
+        
+        # Vector index: decoded vectors are rows of one matrix, vectors not
+        # scored yet are kept as their stored JSON text until first needed
+        self._pending_vectors = {}
+        self._matrix = None
+        self._row_ids = np.empty(0, dtype=np.int64)
+        self._rows = {}
+        self._num_rows = 0
+        self._category_rows = {}
     
-    def initialize(self):
+    def initialize(self, chunk_size=1000):
         """
         Initialize the tool database by loading tools from the database.
         
+        Tools are streamed in chunks straight into the index; their vectors
+        are only decoded when they are first scored.
+        
+        Args:
+            chunk_size (int, optional): Number of tools read per chunk. Defaults to 1000.
+        
         Returns:
             bool: True if initialization successful, False otherwise.
         """
@@ -35,126 +62,116 @@ class ToolDatabase:
             self.db.initialize_database()
             
             # Load tools from the database
-            tools = self.db.get_all_tools()
-            for tool in tools:
-                self.tools[tool["id"]] = {
-                    "name": tool["name"],
-                    "description": tool["description"]
-                }
-                if tool["vector_data"]:
-                    self.tool_vectors[tool["id"]] = tool["vector_data"]
+            for rows in self.db.iter_tools(chunk_size):
+                self.index_tools(rows)
             
-            # If there are no tools in the database, add some sample tools
-            if not self.tools:
-                self._add_sample_tools()
+            # Make sure every registered tool can be retrieved
+            self._add_registry_tools()
             
             return True
         except Exception as e:
             print(f"Tool database initialization warning: {e}. Using default tools.")
-            # Add sample tools in memory even if database fails
-            self._add_sample_tools_in_memory()
+            # Add the registered tools in memory even if database fails
+            self._add_registry_tools_in_memory()
             return True
     
-    def _add_sample_tools(self):
-        """
-        Add sample tools to the database for demonstration purposes.
-        """
-        sample_tools = [
-            {
-                "name": "WeatherAPI",
-                "description": "Get current weather information for a location."
-            },
-            {
-                "name": "CapitalAPI",
-                "description": "Find the capital city of a country."
-            },
-            {
-                "name": "SearchAPI",
-                "description": "Search for information on the web."
-            },
-            {
-                "name": "CalculatorAPI",
-                "description": "Perform mathematical calculations."
-            },
-            {
-                "name": "TranslateAPI",
-                "description": "Translate text from one language to another."
-            }
+    def reload(self, chunk_size=1000):
+        """
+        Drop the in-memory catalog and index and stream them from the database again.
+        
+        Args:
+            chunk_size (int, optional): Number of tools read per chunk. Defaults to 1000.
+        """
+        self._clear()
+        for rows in self.db.iter_tools(chunk_size):
+            self.index_tools(rows)
+        if self.on_reload is not None:
+            self.on_reload()
+    
+    def export_index(self):
+        """
+        Get the catalog and vector index as plain arrays, decoding every pending vector.
+        
+        Returns:
+            tuple: (tools, matrix, row_ids) with the (id, name, description, category)
+                rows of the catalog, the float32 vector matrix and the tool ID of each
+                matrix row.
+        """
+        self._get_rows()
+        tools = [
+            (tool_id, tool["name"], tool["description"], tool["category"])
+            for tool_id, tool in self.tools.items()
         ]
+        if self._matrix is None:
+            return tools, np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+        return tools, self._matrix[:self._num_rows], self._row_ids[:self._num_rows]
+    
+    def restore_index(self, tools, matrix, row_ids):
+        """
+        Replace the catalog and vector index with ones from export_index().
+        
+        The arrays are used as they are, so they can be memory-mapped; they
+        are only copied once tools are added to the index.
+        
+        Args:
+            tools (iterable): (id, name, description, category) rows.
+            matrix (numpy.ndarray): The float32 vector matrix.
+            row_ids (numpy.ndarray): The tool ID of each matrix row.
         
-        for tool in sample_tools:
+        Raises:
+            ValueError: If the vectors' dimension is not the tool encoder's.
+        """
+        self._clear()
+        for tool_id, name, description, category in tools:
+            self.tools[tool_id] = {
+                "name": name,
+                "description": description,
+                "category": category
+            }
+        if len(row_ids):
+            dimension = self._dimension()
+            if dimension is not None and matrix.shape[1] != dimension:
+                raise ValueError(f"Index vectors have {matrix.shape[1]} dimensions, expected {dimension}")
+            self._matrix = matrix
+            self._row_ids = row_ids
+            self._rows = {tool_id: row for row, tool_id in enumerate(row_ids.tolist())}
+            self._num_rows = len(row_ids)
+    
+    def _add_registry_tools(self):
+        """
+        Add the registered tools that are missing from the database.
+        
+        Only the registry's metadata is used; no tool module is imported.
+        """
+        known = {tool["name"] for tool in self.tools.values()}
+        for tool in self.registry.metadata():
+            if tool["name"] in known:
+                continue
             vector_data = None
             if self.tool_encoder:
                 vector_data = self.tool_encoder.encode(tool["description"])
             
-            tool_id = self.db.add_tool(tool["name"], tool["description"], vector_data)
+            tool_id = self.db.add_tool(tool["name"], tool["description"], vector_data, tool["category"])
             if tool_id != -1:
-                self.tools[tool_id] = {
-                    "name": tool["name"],
-                    "description": tool["description"]
-                }
-                if vector_data:
-                    self.tool_vectors[tool_id] = vector_data
-    
-    def _add_sample_tools_in_memory(self):
-        """
-        Add sample tools to memory for demonstration purposes when database fails.
-        """
-        sample_tools = [
-            {
-                "name": "WeatherAPI",
-                "description": "Get current weather information for a location."
-            },
-            {
-                "name": "CapitalAPI",
-                "description": "Find the capital city of a country."
-            },
-            {
-                "name": "SearchAPI",
-                "description": "Search for information on the web."
-            },
-            {
-                "name": "CalculatorAPI",
-                "description": "Perform mathematical calculations."
-            },
-            {
-                "name": "TranslateAPI",
-                "description": "Translate text from one language to another."
-            },
-            {
-                "name": "WebSearch",
-                "description": "Search the web for information."
-            },
-            {
-                "name": "NewsSearch",
-                "description": "Search for news articles with date filtering."
-            },
-            {
-                "name": "WebContentFetcher",
-                "description": "Fetch content from a URL."
-            },
-            {
-                "name": "ProjectFileProcessor",
-                "description": "Process and analyze project management files."
-            }
-        ]
-        
-        for i, tool in enumerate(sample_tools):
-            self.tools[i+1] = {
-                "name": tool["name"],
-                "description": tool["description"]
-            }
+                self.index_tools([(tool_id, tool["name"], tool["description"], tool["category"], vector_data)])
+    
+    def _add_registry_tools_in_memory(self):
+        """
+        Add the registered tools to memory when the database fails.
+        """
+        dimension = self._dimension() or 768
+        for i, tool in enumerate(self.registry.metadata()):
             # Generate random vector for demo purposes
             if self.tool_encoder:
                 try:
                     vector = self.tool_encoder.encode(tool["description"])
-                    self.tool_vectors[i+1] = vector
                 except:
                     # If encoding fails, use random vector
-                    self.tool_vectors[i+1] = np.random.randn(768).tolist()
+                    vector = np.random.randn(dimension).tolist()
             else:
                 # If no encoder, use random vector
-                self.tool_vectors[i+1] = np.random.randn(768).tolist()
+                vector = np.random.randn(dimension).tolist()
+            self.index_tools([(i+1, tool["name"], tool["description"], tool["category"], vector)])
     
     def get_tool(self, tool_id):
         """
@@ -178,7 +195,182 @@ class ToolDatabase:
         Returns:
             list: The tool vector, or None if the tool or vector was not found.
         """
-        return self.tool_vectors.get(tool_id)
+        self._decode_vectors([tool_id])
+        row = self._rows.get(tool_id)
+        if row is None:
+            return None
+        return self._matrix[row].tolist()
+    
+    def index_tools(self, rows):
+        """
+        Add tools to the in-memory catalog and vector index.
+        
+        Vectors given as JSON text are kept undecoded until the tool is first
+        scored. A tool that is already indexed is replaced. Vectors whose
+        dimension differs from the index's are handled by _add_vectors().
+        
+        Args:
+            rows (iterable): (id, name, description, category, vector) tuples, where
+                vector is a list, a numpy array, the stored JSON text, or None.
+        """
+        decoded_ids = []
+        decoded = []
+        for tool_id, name, description, category, vector in rows:
+            self.tools[tool_id] = {
+                "name": name,
+                "description": description,
+                "category": category
+            }
+            self._pending_vectors.pop(tool_id, None)
+            if vector is None or len(vector) == 0:
+                continue
+            if isinstance(vector, str):
+                self._pending_vectors[tool_id] = vector
+            else:
+                decoded_ids.append(tool_id)
+                decoded.append(vector)
+        
+        if decoded:
+            self._add_vectors(decoded_ids, decoded)
+        self._category_rows = {}
+    
+    def _dimension(self):
+        """
+        Get the dimension a vector must have to be indexed.
+        
+        Returns:
+            int: The tool encoder's dimension, else that of the indexed vectors,
+                or None if there is neither.
+        """
+        if self.tool_encoder is not None:
+            return self.tool_encoder.embedding_dim
+        if self._matrix is not None:
+            return self._matrix.shape[1]
+        return None
+    
+    def _add_vectors(self, tool_ids, vectors):
+        """
+        Index decoded vectors, fixing those whose dimension does not match the index.
+        
+        A catalog can hold vectors of another dimension, e.g. after
+        EMBEDDING_DIM changed. With a tool encoder they are re-encoded from
+        the tool's description, in memory only; without one the tools are
+        left out of the index.
+        
+        Args:
+            tool_ids (list): The tool IDs.
+            vectors (list): One vector (list or numpy array) per tool ID.
+        """
+        dimension = self._dimension() or len(vectors[0])
+        mismatched = [i for i, vector in enumerate(vectors) if len(vector) != dimension]
+        if mismatched:
+            if self.tool_encoder is not None:
+                print(f"Tool vector warning: re-encoding {len(mismatched)} tool vectors "
+                      f"whose dimension is not {dimension}.")
+                vectors = list(vectors)
+                for i in mismatched:
+                    vectors[i] = self.tool_encoder.encode(self.tools[tool_ids[i]]["description"])
+            else:
+                print(f"Tool vector warning: skipping {len(mismatched)} tool vectors "
+                      f"whose dimension is not {dimension}.")
+                skipped = set(mismatched)
+                tool_ids = [tool_id for i, tool_id in enumerate(tool_ids) if i not in skipped]
+                vectors = [vector for i, vector in enumerate(vectors) if i not in skipped]
+                if not tool_ids:
+                    return
+        self._store_vectors(tool_ids, np.asarray(vectors, dtype=np.float32))
+    
+    def _store_vectors(self, tool_ids, vectors):
+        """
+        Write decoded vectors into the index matrix, growing it as needed.
+        
+        Args:
+            tool_ids (list): The tool IDs.
+            vectors (numpy.ndarray): One row per tool ID.
+        """
+        if self._matrix is None:
+            self._matrix = np.empty((max(len(tool_ids), 16), vectors.shape[1]), dtype=np.float32)
+            self._row_ids = np.empty(len(self._matrix), dtype=np.int64)
+        
+        new_ids = [tool_id for tool_id in tool_ids if tool_id not in self._rows]
+        needed = self._num_rows + len(new_ids)
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix))
+            matrix = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+            matrix[:self._num_rows] = self._matrix[:self._num_rows]
+            row_ids = np.empty(capacity, dtype=np.int64)
+            row_ids[:self._num_rows] = self._row_ids[:self._num_rows]
+            self._matrix, self._row_ids = matrix, row_ids
+        
+        for tool_id in new_ids:
+            self._rows[tool_id] = self._num_rows
+            self._row_ids[self._num_rows] = tool_id
+            self._num_rows += 1
+        rows = [self._rows[tool_id] for tool_id in tool_ids]
+        self._matrix[rows] = vectors
+    
+    def _decode_vectors(self, tool_ids):
+        """
+        Decode the pending vectors of the given tools into the index matrix.
+        
+        Args:
+            tool_ids (iterable): The tool IDs.
+        """
+        decode_ids = [tool_id for tool_id in tool_ids if tool_id in self._pending_vectors]
+        if decode_ids:
+            vectors = [json.loads(self._pending_vectors.pop(tool_id)) for tool_id in decode_ids]
+            self._add_vectors(decode_ids, vectors)
+    
+    def _get_rows(self, category=None):
+        """
+        Get the index rows of the tools that can be scored, decoding their vectors first.
+        
+        Args:
+            category (str, optional): Only include tools of this category. Defaults to None (all).
+        
+        Returns:
+            numpy.ndarray: The row numbers, or None for all rows.
+        """
+        if category is None:
+            if self._pending_vectors:
+                self._decode_vectors(list(self._pending_vectors))
+            return None
+        
+        rows = self._category_rows.get(category)
+        if rows is None:
+            tool_ids = [tool_id for tool_id, tool in self.tools.items() if tool["category"] == category]
+            self._decode_vectors(tool_ids)
+            rows = np.array(sorted(self._rows[tool_id] for tool_id in tool_ids if tool_id in self._rows),
+                            dtype=np.int64)
+            self._category_rows[category] = rows
+        return rows
+    
+    def _score(self, query_vector, category=None):
+        """
+        Score the query vector against every tool that can be scored.
+        
+        Args:
+            query_vector (list): The query vector.
+            category (str, optional): Only score tools of this category. Defaults to None (all).
+        
+        Returns:
+            tuple: (tool_ids, scores) numpy arrays.
+        
+        Raises:
+            ValueError: If the query vector's dimension is not the tool vectors'.
+        """
+        rows = self._get_rows(category)
+        if self._matrix is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape != (self._matrix.shape[1],):
+            raise ValueError(
+                f"Query vector has {query.size} dimensions but the tool vectors have {self._matrix.shape[1]}"
+            )
+        if rows is None:
+            return self._row_ids[:self._num_rows], self._matrix[:self._num_rows] @ query
+        return self._row_ids[rows], self._matrix[rows] @ query
     
     def compute_tool_vectors(self):
         """
@@ -190,54 +382,53 @@ class ToolDatabase:
         if not self.tool_encoder:
             return False
         
+        vectors = {}
         for tool_id, tool in self.tools.items():
-            vector = self.tool_encoder.encode(tool["description"])
-            self.tool_vectors[tool_id] = vector
-            
-            # Update the vector in the database
-            self.db.cursor.execute(
-                "UPDATE tools SET vector_data = ? WHERE id = ?",
-                (json.dumps(vector), tool_id)
-            )
+            vectors[tool_id] = self.tool_encoder.encode(tool["description"])
+        self._pending_vectors = {}
+        self._store_vectors(list(vectors), np.asarray(list(vectors.values()), dtype=np.float32))
+        self._category_rows = {}
         
-        self.db.conn.commit()
-        return True
+        # Update the vectors in the database in a single transaction
+        return self.db.update_tool_vectors(vectors)
     
-    def find_similar_tool(self, query_vector):
+    def find_similar_tool(self, query_vector, category=None):
         """
         Find the most similar tool to the given query vector.
         
         Args:
             query_vector (list): The query vector to find similar tools for.
+            category (str, optional): Only consider tools of this category. Defaults to None (all).
         
         Returns:
             tuple: (tool_id, score) of the most similar tool, or (None, 0) if no tools are found.
         """
-        if not self.tool_vectors:
+        tool_ids, scores = self._score(query_vector, category)
+        if len(scores) == 0:
             return None, 0
         
-        max_score = -1
-        max_tool_id = None
-        
-        for tool_id, tool_vector in self.tool_vectors.items():
-            # Calculate dot product similarity
-            score = self._dot_product(query_vector, tool_vector)
-            
-            if score > max_score:
-                max_score = score
-                max_tool_id = tool_id
-        
-        return max_tool_id, max_score
+        best = int(np.argmax(scores))
+        return int(tool_ids[best]), float(scores[best])
     
-    def _dot_product(self, vec1, vec2):
+    def find_similar_tools(self, query_vector, k=5, category=None):
         """
-        Calculate the dot product of two vectors.
+        Find the k most similar tools to the given query vector.
         
         Args:
-            vec1 (list): First vector.
-            vec2 (list): Second vector.
+            query_vector (list): The query vector to find similar tools for.
+            k (int, optional): Number of tools to return. Defaults to 5.
+            category (str, optional): Only consider tools of this category. Defaults to None (all).
         
         Returns:
-            float: Dot product of the two vectors.
+            list: (tool_id, score) tuples, most similar first.
         """
-        return sum(a * b for a, b in zip(vec1, vec2))
+        tool_ids, scores = self._score(query_vector, category)
+        if len(scores) == 0 or k <= 0:
+            return []
+        
+        if k < len(scores):
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(tool_ids[i]), float(scores[i])) for i in top]
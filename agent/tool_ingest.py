@@ -0,0 +1,195 @@
+# Bulk Tool Catalog Ingestion
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from agent.tools.tool_encoder import ToolEncoder
+
+
+# Encoder of the current worker process, created once by _init_worker
+_worker_encoder = None
+
+
+def read_tool_catalog(path, file_format=None):
+    """
+    Stream the tools of a JSONL or CSV catalog file.
+    
+    Each JSONL line or CSV row needs a "name" and a "description" and may
+    have a "category". Rows without a name or description are skipped.
+    
+    Args:
+        path (str): Path to the catalog file.
+        file_format (str, optional): "jsonl" or "csv". Defaults to None (from the file extension).
+    
+    Yields:
+        dict: The tool, with "name", "description" and "category".
+    """
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if file_format not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown catalog format: {file_format}")
+    
+    with open(path, encoding="utf-8", newline="") as f:
+        if file_format == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            name = row.get("name")
+            description = row.get("description")
+            if not name or not description:
+                continue
+            yield {
+                "name": name,
+                "description": description,
+                "category": row.get("category") or None
+            }
+
+
+def _init_worker(embedding_dim):
+    """
+    Create the encoder of a worker process.
+    
+    Args:
+        embedding_dim (int): Dimension of the embedding vectors.
+    """
+    global _worker_encoder
+    # Forked workers inherit the parent's random state; reseed so their vectors differ
+    np.random.seed()
+    _worker_encoder = ToolEncoder(embedding_dim)
+
+
+def _encode_batch(descriptions):
+    """
+    Encode a batch of descriptions in a worker process.
+    
+    Vectors are returned as JSON text, ready to be stored, so the parent
+    process does not have to serialize them. Nine significant digits keep
+    every value exact at the float32 precision the retrieval index uses,
+    at half the size of full double precision.
+    
+    Args:
+        descriptions (list): The tool descriptions.
+    
+    Returns:
+        list: The JSON-encoded vectors.
+    """
+    vectors = _worker_encoder.batch_encode(descriptions)
+    if not vectors:
+        return []
+    template = "[" + ",".join(["%.9g"] * len(vectors[0])) + "]"
+    return [template % tuple(vector) for vector in vectors]
+
+
+def _batches(tools, batch_size):
+    """
+    Group a stream of tools into lists.
+    
+    Args:
+        tools (iterable): The tools.
+        batch_size (int): Number of tools per list.
+    
+    Yields:
+        list: The next batch of tools.
+    """
+    batch = []
+    for tool in tools:
+        batch.append(tool)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ingest_tools(db, tools, batch_size=1000, workers=None, transaction_size=20000,
+                 embedding_dim=768, tool_db=None, progress=None):
+    """
+    Encode a stream of tools and add them to the database.
+    
+    Descriptions are encoded in batches by a pool of worker processes. At
+    most two batches per worker are in flight and each transaction holds at
+    most transaction_size tools, so memory stays bounded however large the
+    catalog is. Tools are appended in catalog order.
+    
+    Args:
+        db (AgentDatabase): The database to add the tools to.
+        tools (iterable): Tool dictionaries with "name", "description" and "category",
+            e.g. from read_tool_catalog().
+        batch_size (int, optional): Number of descriptions per encoding batch. Defaults to 1000.
+        workers (int, optional): Number of encoding processes, 0 to encode in this
+            process. Defaults to None (one per CPU).
+        transaction_size (int, optional): Number of tools written per transaction. Defaults to 20000.
+        embedding_dim (int, optional): Dimension of the embedding vectors. Defaults to 768.
+        tool_db (ToolDatabase, optional): Tool index to reload once all tools are written.
+            Defaults to None.
+        progress (callable, optional): Called with the number of tools written so far
+            after each transaction. Defaults to None.
+    
+    Returns:
+        int: The number of tools added, or -1 if writing failed.
+    
+    Raises:
+        ValueError: If the database already holds tool vectors of another dimension.
+    """
+    existing_dim = db.get_tool_vector_dimension()
+    if existing_dim is not None and existing_dim != embedding_dim:
+        raise ValueError(
+            f"The tool catalog holds {existing_dim}-dimensional vectors; "
+            f"cannot add {embedding_dim}-dimensional ones"
+        )
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    pending_rows = []
+    written = 0
+    
+    def write_rows():
+        nonlocal written
+        if db.add_tools(pending_rows) == -1:
+            return False
+        written += len(pending_rows)
+        pending_rows.clear()
+        if progress:
+            progress(written)
+        return True
+    
+    def collect(batch, vectors):
+        for tool, vector_json in zip(batch, vectors):
+            pending_rows.append((tool["name"], tool["description"], vector_json, tool["category"]))
+        return len(pending_rows) < transaction_size or write_rows()
+    
+    if workers == 0:
+        _init_worker(embedding_dim)
+        for batch in _batches(tools, batch_size):
+            if not collect(batch, _encode_batch([tool["description"] for tool in batch])):
+                return -1
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(embedding_dim,)) as pool:
+            in_flight = deque()
+            for batch in _batches(tools, batch_size):
+                in_flight.append((batch, pool.submit(_encode_batch, [tool["description"] for tool in batch])))
+                if len(in_flight) >= 2 * workers:
+                    done_batch, future = in_flight.popleft()
+                    if not collect(done_batch, future.result()):
+                        pool.shutdown(cancel_futures=True)
+                        return -1
+            while in_flight:
+                done_batch, future = in_flight.popleft()
+                if not collect(done_batch, future.result()):
+                    pool.shutdown(cancel_futures=True)
+                    return -1
+    
+    if pending_rows and not write_rows():
+        return -1
+    
+    # Rebuild the in-memory index once, not per tool
+    if tool_db is not None:
+        tool_db.reload()
+    return written
@@ -0,0 +1,205 @@
+# Lazy Tool Registry
+
+import importlib
+import threading
+
+
+# Declarative catalog of the built-in tools. Each entry names the class
+# implementing the tool as "module:Class" and the method the agent calls;
+# the module is not imported until the tool is first selected.
+TOOL_REGISTRY = {
+    "WeatherAPI": {
+        "target": "agent.tools.tool_implementations:WeatherAPI",
+        "method": "get_weather",
+        "description": "Get current weather information for a location.",
+        "category": "basic",
+        "parameters": ["location", "date"]
+    },
+    "CapitalAPI": {
+        "target": "agent.tools.tool_implementations:CapitalAPI",
+        "method": "get_capital",
+        "description": "Find the capital city of a country.",
+        "category": "basic",
+        "parameters": ["country"]
+    },
+    "SearchAPI": {
+        "target": "agent.tools.tool_implementations:SearchAPI",
+        "method": "search",
+        "description": "Search for information on the web.",
+        "category": "basic",
+        "parameters": ["query"]
+    },
+    "CalculatorAPI": {
+        "target": "agent.tools.tool_implementations:CalculatorAPI",
+        "method": "calculate",
+        "description": "Perform mathematical calculations.",
+        "category": "basic",
+        "parameters": ["expression"]
+    },
+    "TranslateAPI": {
+        "target": "agent.tools.tool_implementations:TranslateAPI",
+        "method": "translate",
+        "description": "Translate text from one language to another.",
+        "category": "basic",
+        "parameters": ["text", "source_lang", "target_lang"]
+    },
+    "WebSearch": {
+        "target": "agent.tools.web_tools:WebSearch",
+        "method": "search",
+        "description": "Search the web for information.",
+        "category": "web",
+        "parameters": ["query", "num_results"]
+    },
+    "NewsSearch": {
+        "target": "agent.tools.web_tools:NewsSearch",
+        "method": "search",
+        "description": "Search for news articles with date filtering.",
+        "category": "web",
+        "parameters": ["query", "start_date", "end_date", "num_results"]
+    },
+    "WebContentFetcher": {
+        "target": "agent.tools.web_tools:WebContentFetcher",
+        "method": "fetch_content",
+        "description": "Fetch content from a URL.",
+        "category": "web",
+        "parameters": ["url"]
+    },
+    "ProjectFileProcessor": {
+        "target": "agent.tools.project_tools:ProjectFileProcessor",
+        "method": "extract_tasks",
+        "description": "Process and analyze project management files.",
+        "category": "project",
+        "parameters": ["file_path"]
+    }
+}
+
+
+class ToolRegistry:
+    """
+    Class mapping tool names to their implementations, loaded on demand.
+    
+    Listing the tools and their metadata never imports a tool module. A
+    tool's module is imported and its class instantiated the first time the
+    tool is requested, and the instance is reused afterwards.
+    """
+    
+    def __init__(self, entries=None):
+        """
+        Initialize the registry.
+        
+        Args:
+            entries (dict, optional): Mapping of tool name to entry, in the format of
+                TOOL_REGISTRY. Defaults to None (the built-in tools).
+        """
+        self._entries = dict(TOOL_REGISTRY if entries is None else entries)
+        self._instances = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name, target, method, description, category=None, parameters=None):
+        """
+        Add a tool to the registry, replacing any tool of the same name.
+        
+        Args:
+            name (str): The name of the tool.
+            target (str): The implementing class, as "module:Class".
+            method (str): The name of the method to call.
+            description (str): The description the tool is retrieved by.
+            category (str, optional): The category of the tool. Defaults to None.
+            parameters (list, optional): The parameter names of the method. Defaults to None.
+        """
+        if ":" not in target:
+            raise ValueError(f"Tool target must be 'module:Class', got {target!r}")
+        with self._lock:
+            self._entries[name] = {
+                "target": target,
+                "method": method,
+                "description": description,
+                "category": category,
+                "parameters": list(parameters or [])
+            }
+            self._instances.pop(name, None)
+    
+    def names(self):
+        """
+        Get the names of the registered tools.
+        
+        Returns:
+            list: The tool names, in registration order.
+        """
+        return list(self._entries)
+    
+    def metadata(self, name=None):
+        """
+        Get the metadata of one or all tools without loading them.
+        
+        Args:
+            name (str, optional): The tool to describe. Defaults to None (all tools).
+        
+        Returns:
+            dict or list: The tool's entry with its "name" added, or a list of all
+                entries. None if the named tool is not registered.
+        """
+        if name is not None:
+            entry = self._entries.get(name)
+            return dict(entry, name=name) if entry is not None else None
+        return [dict(entry, name=tool_name) for tool_name, entry in self._entries.items()]
+    
+    def is_loaded(self, name):
+        """
+        Check whether a tool has been instantiated.
+        
+        Args:
+            name (str): The name of the tool.
+        
+        Returns:
+            bool: True if the tool's instance exists.
+        """
+        return name in self._instances
+    
+    def __contains__(self, name):
+        return name in self._entries
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, name):
+        """
+        Get the instance of a tool, importing and instantiating it on first use.
+        
+        Args:
+            name (str): The name of the tool.
+        
+        Returns:
+            object: The tool instance, or None if the tool is not registered.
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                entry = self._entries.get(name)
+                if entry is None:
+                    return None
+                module_name, class_name = entry["target"].split(":", 1)
+                module = importlib.import_module(module_name)
+                instance = getattr(module, class_name)()
+                self._instances[name] = instance
+            return instance
+    
+    def call(self, name, **parameters):
+        """
+        Call a tool's method, loading the tool if needed.
+        
+        Args:
+            name (str): The name of the tool.
+            **parameters: The arguments of the tool's method.
+        
+        Returns:
+            The result of the method.
+        """
+        instance = self.get(name)
+        if instance is None:
+            raise KeyError(f"Unknown tool: {name}")
+        return getattr(instance, self._entries[name]["method"])(**parameters)
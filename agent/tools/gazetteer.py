@@ -0,0 +1,307 @@
+# Offline Gazetteer
+
+import csv
+import os
+import re
+import threading
+import unicodedata
+
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv")
+
+
+def normalize_name(text):
+    """
+    Normalize a place name for lookup.
+    
+    Accents, case, punctuation and a leading "the" are dropped, "&" becomes
+    "and" and "st" becomes "saint", so "U.S.", "the Bahamas", "Côte d'Ivoire"
+    and "St. Lucia" match "us", "bahamas", "cote divoire" and "saint lucia".
+    
+    Args:
+        text (str): The name.
+    
+    Returns:
+        str: The normalized name.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    text = text.replace("&", " and ")
+    text = re.sub(r"[.'’]", "", text)
+    words = re.sub(r"[^a-z0-9]+", " ", text).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    return " ".join("saint" if word == "st" else word for word in words)
+
+
+def edit_distance(a, b):
+    """
+    Compute the Levenshtein distance between two strings.
+    
+    Uses Myers' bit-parallel algorithm, which keeps a column of the
+    distance matrix as bits of an integer and advances it one character of
+    the longer string at a time.
+    
+    Args:
+        a (str): The first string.
+        b (str): The second string.
+    
+    Returns:
+        int: The minimum number of single-character insertions, deletions and substitutions.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    
+    positions = {}
+    for i, char in enumerate(b):
+        positions[char] = positions.get(char, 0) | (1 << i)
+    mask = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+    plus = mask
+    minus = 0
+    score = len(b)
+    for char in a:
+        eq = positions.get(char, 0)
+        xv = eq | minus
+        xh = (((eq & plus) + plus) ^ plus) | eq
+        horizontal_plus = minus | ~(xh | plus)
+        horizontal_minus = plus & xh
+        if horizontal_plus & last:
+            score += 1
+        elif horizontal_minus & last:
+            score -= 1
+        horizontal_plus = (horizontal_plus << 1) | 1
+        horizontal_minus <<= 1
+        plus = (horizontal_minus | ~(xv | horizontal_plus)) & mask
+        minus = horizontal_plus & xv
+    return score
+
+
+class BKTree:
+    """
+    Class for a Burkhard-Keller tree of strings under edit distance.
+    
+    Each child hangs off its parent by its distance to the parent, so by the
+    triangle inequality a search within distance k of a query only descends
+    into children whose edge lies within k of the parent's distance to the
+    query, which skips most of the tree for small k.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty tree.
+        """
+        # Nodes are [term, {distance: child node}]
+        self._root = None
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def add(self, term):
+        """
+        Add a term to the tree.
+        
+        Args:
+            term (str): The term.
+        """
+        if self._root is None:
+            self._root = [term, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(term, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [term, {}]
+                self._size += 1
+                return
+            node = child
+    
+    def search(self, query, max_distance):
+        """
+        Find the terms within a distance of the query.
+        
+        Args:
+            query (str): The query.
+            max_distance (int): Maximum edit distance.
+        
+        Returns:
+            list: (distance, term) tuples, closest first.
+        """
+        if self._root is None:
+            return []
+        matches = []
+        stack = [self._root]
+        while stack:
+            term, children = stack.pop()
+            distance = edit_distance(query, term)
+            if distance <= max_distance:
+                matches.append((distance, term))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        matches.sort()
+        return matches
+
+
+class Gazetteer:
+    """
+    Class for looking up countries, regions and other places offline.
+    
+    Every name and alias is indexed under its normalized form, so exact
+    lookups are a single dictionary access. Names that are not found are
+    looked up approximately, within a small edit distance, in a BK-tree of
+    the indexed names.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty gazetteer.
+        """
+        self.entries = []
+        self._index = {}
+        self._tree = BKTree()
+    
+    @classmethod
+    def load(cls, path=None):
+        """
+        Load a gazetteer from a CSV file.
+        
+        The file has the columns name, type, capital and aliases, where
+        aliases are separated by "|". When a name is ambiguous the place
+        listed first wins.
+        
+        Args:
+            path (str, optional): The file. Defaults to None (GAZETTEER_PATH or the bundled file).
+        
+        Returns:
+            Gazetteer: The loaded gazetteer.
+        """
+        path = path or os.getenv("GAZETTEER_PATH") or DEFAULT_GAZETTEER_PATH
+        gazetteer = cls()
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+                gazetteer.add(row["name"], row.get("type") or None, row.get("capital") or None, aliases)
+        return gazetteer
+    
+    def add(self, name, place_type=None, capital=None, aliases=()):
+        """
+        Add a place.
+        
+        Args:
+            name (str): The name of the place.
+            place_type (str, optional): E.g. "country" or "region". Defaults to None.
+            capital (str, optional): The capital. Defaults to None.
+            aliases (iterable, optional): Other names of the place. Defaults to ().
+        
+        Returns:
+            dict: The entry.
+        """
+        entry = {"name": name, "type": place_type, "capital": capital, "aliases": list(aliases)}
+        position = len(self.entries)
+        self.entries.append(entry)
+        for key in [name, *entry["aliases"]]:
+            key = normalize_name(key)
+            if key and key not in self._index:
+                self._index[key] = position
+                self._tree.add(key)
+        return entry
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    @staticmethod
+    def default_max_distance(key):
+        """
+        Get the edit distance tolerated when looking up a normalized name.
+        
+        Short names tolerate fewer edits, so abbreviations do not match
+        unrelated places.
+        
+        Args:
+            key (str): The normalized name.
+        
+        Returns:
+            int: The maximum distance.
+        """
+        if len(key) < 4:
+            return 0
+        return 1 if len(key) < 6 else 2
+    
+    def lookup(self, name, max_distance=None):
+        """
+        Look up a place by name, tolerating small misspellings.
+        
+        Args:
+            name (str): The name.
+            max_distance (int, optional): Maximum edit distance of approximate matches.
+                Defaults to None (by name length, see default_max_distance()).
+        
+        Returns:
+            dict: The entry with the matched normalized "match" name and its
+                "distance" added, or None if nothing is close enough.
+        """
+        key = normalize_name(name)
+        position = self._index.get(key)
+        distance = 0
+        if position is None:
+            if max_distance is None:
+                max_distance = self.default_max_distance(key)
+            if not key or max_distance <= 0:
+                return None
+            matches = self._tree.search(key, max_distance)
+            if not matches:
+                return None
+            # Closest first, then the place listed first
+            distance, key = min(matches, key=lambda match: (match[0], self._index[match[1]]))
+            position = self._index[key]
+        return dict(self.entries[position], match=key, distance=distance)
+    
+    def lookup_many(self, names, max_distance=None):
+        """
+        Look up several places, each distinct name only once.
+        
+        Args:
+            names (iterable): The names.
+            max_distance (int, optional): Maximum edit distance of approximate matches.
+                Defaults to None (by name length).
+        
+        Returns:
+            list: The entry or None for each name, in order.
+        """
+        found = {}
+        results = []
+        for name in names:
+            key = normalize_name(name)
+            if key not in found:
+                found[key] = self.lookup(name, max_distance)
+            results.append(found[key])
+        return results
+
+
+_default_gazetteer = None
+_default_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """
+    Get the shared gazetteer, loading it on first use.
+    
+    Returns:
+        Gazetteer: The gazetteer from GAZETTEER_PATH or the bundled file.
+    """
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        with _default_lock:
+            if _default_gazetteer is None:
+                _default_gazetteer = Gazetteer.load()
+    return _default_gazetteer
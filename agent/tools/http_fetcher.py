@@ -0,0 +1,417 @@
+# Pooled HTTP Fetching
+
+import hashlib
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+
+DEFAULT_USER_AGENT = "CoToolsAgent/1.0"
+
+# Errors of a kept-alive connection the server closed in the meantime
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class HTTPCache:
+    """
+    Class for a disk cache of HTTP responses validated with ETag and Last-Modified.
+    
+    Every URL has a metadata file and a body file named by the hash of the
+    URL. Only responses with a validator are stored, and a cached response
+    is only served after the server confirmed it with 304 Not Modified.
+    """
+    
+    def __init__(self, cache_dir):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir (str): The cache directory, created if needed.
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, url):
+        """
+        Get the path of a URL's cache files, without extension.
+        
+        Args:
+            url (str): The URL.
+        
+        Returns:
+            str: The path.
+        """
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+    
+    def get(self, url):
+        """
+        Get the cached metadata of a URL.
+        
+        Args:
+            url (str): The URL.
+        
+        Returns:
+            dict: "url", "status", "headers" and "stored_at", or None if not cached.
+        """
+        try:
+            with open(self._path(url) + ".json", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+    
+    def body(self, url):
+        """
+        Read the cached body of a URL.
+        
+        Args:
+            url (str): The URL.
+        
+        Returns:
+            bytes: The body, or None if it is missing.
+        """
+        try:
+            with open(self._path(url) + ".body", "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def validators(self, url):
+        """
+        Get the conditional request headers for a cached URL.
+        
+        Args:
+            url (str): The URL.
+        
+        Returns:
+            dict: If-None-Match and If-Modified-Since headers, empty if not cached.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry["headers"].get("etag"):
+            headers["If-None-Match"] = entry["headers"]["etag"]
+        if entry["headers"].get("last-modified"):
+            headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        return headers
+    
+    def put(self, url, status, headers, body):
+        """
+        Store a response, if it can be validated later.
+        
+        The files are written under temporary names and renamed, so readers
+        never see a partial entry.
+        
+        Args:
+            url (str): The URL.
+            status (int): The status code.
+            headers (dict): The response headers, with lowercase names.
+            body (bytes): The complete body.
+        
+        Returns:
+            bool: True if the response was stored.
+        """
+        if not (headers.get("etag") or headers.get("last-modified")):
+            return False
+        if "no-store" in headers.get("cache-control", "").lower():
+            return False
+        path = self._path(url)
+        entry = {"url": url, "status": status, "headers": headers, "stored_at": time.time()}
+        for suffix, data in ((".body", body), (".json", json.dumps(entry).encode("utf-8"))):
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path + suffix)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return True
+
+
+class _HostPool:
+    """
+    Idle keep-alive connections to one host, and a limit on concurrent requests to it.
+    """
+    
+    def __init__(self, max_connections):
+        self.idle = deque()
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+
+
+class HTTPFetcher:
+    """
+    Class for fetching URLs over pooled keep-alive connections.
+    
+    Connections are kept open per host (scheme, host and port) and reused
+    by later requests, and at most max_per_host requests run against a
+    host at a time, whatever the number of workers. The timeout applies to
+    connecting, to each read and to a request as a whole, so a slow server
+    cannot stall a worker. A body is read in chunks and cut off at
+    max_body_bytes. With a cache directory, responses carrying an ETag or
+    Last-Modified header are kept on disk and later requests for them are
+    conditional, so an unchanged page costs a 304 response instead of its
+    body.
+    """
+    
+    def __init__(self, max_workers=16, max_per_host=4, timeout=10.0, max_body_bytes=2 * 1024 * 1024,
+                 max_redirects=5, cache_dir=None, user_agent=DEFAULT_USER_AGENT):
+        """
+        Initialize the fetcher.
+        
+        Args:
+            max_workers (int, optional): Number of concurrent fetches in fetch_many(). Defaults to 16.
+            max_per_host (int, optional): Number of concurrent requests per host. Defaults to 4.
+            timeout (float, optional): Seconds allowed for connecting, for each read and
+                for a whole request and its response. Defaults to 10.0.
+            max_body_bytes (int, optional): Bytes read of a body at most. Defaults to 2 MB.
+            max_redirects (int, optional): Number of redirects followed. Defaults to 5.
+            cache_dir (str, optional): Directory of the response cache. Defaults to None (no cache).
+            user_agent (str, optional): The User-Agent header. Defaults to DEFAULT_USER_AGENT.
+        """
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.max_redirects = max_redirects
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        self.user_agent = user_agent
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0, "reused": 0, "not_modified": 0}
+        self._stats_lock = threading.Lock()
+    
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+    
+    def _pool(self, key):
+        """
+        Get the pool of a host.
+        
+        Args:
+            key (tuple): (scheme, host, port).
+        
+        Returns:
+            _HostPool: The pool.
+        """
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.setdefault(key, _HostPool(self.max_per_host))
+        return pool
+    
+    def _connect(self, key):
+        """
+        Open a connection to a host.
+        
+        Args:
+            key (tuple): (scheme, host, port).
+        
+        Returns:
+            http.client.HTTPConnection: The connection.
+        """
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self._count("connections")
+        return connection_class(host, port, timeout=self.timeout)
+    
+    def _request(self, pool, key, path, headers, deadline):
+        """
+        Send a GET request over a pooled connection and read the response.
+        
+        A request on a reused connection the server has closed meanwhile is
+        retried once on a new connection.
+        
+        Args:
+            pool (_HostPool): The host's pool, whose slot the caller holds.
+            key (tuple): (scheme, host, port).
+            path (str): The path and query.
+            headers (dict): The request headers.
+            deadline (float): time.monotonic() by which the response must be read.
+        
+        Returns:
+            tuple: (status, headers with lowercase names, body, truncated).
+        """
+        with pool.lock:
+            connection = pool.idle.pop() if pool.idle else None
+        reused = connection is not None
+        if connection is None:
+            connection = self._connect(key)
+        
+        try:
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                connection.close()
+                reused = False
+                connection = self._connect(key)
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            if reused:
+                self._count("reused")
+            
+            chunks = []
+            size = 0
+            truncated = False
+            while True:
+                if time.monotonic() > deadline:
+                    raise socket.timeout("Request deadline exceeded")
+                chunk = response.read1(min(65536, self.max_body_bytes - size + 1))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_body_bytes:
+                    truncated = True
+                    break
+            # read1() leaves a fully read response open, which would block the next request
+            response.close()
+            body = b"".join(chunks)[:self.max_body_bytes]
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+        except BaseException:
+            connection.close()
+            raise
+        
+        # A connection can only be reused once its response was read to the end
+        if truncated or response.will_close:
+            connection.close()
+        else:
+            with pool.lock:
+                pool.idle.append(connection)
+        return response.status, response_headers, body, truncated
+    
+    def fetch(self, url, headers=None):
+        """
+        Fetch a URL, following redirects.
+        
+        Args:
+            url (str): The http or https URL.
+            headers (dict, optional): Extra request headers. Defaults to None.
+        
+        Returns:
+            dict: "url" (after redirects), "status", "headers", "body" (bytes),
+                "truncated", "from_cache" and "error" (None on success).
+        """
+        result = {"url": url, "status": None, "headers": {}, "body": b"",
+                  "truncated": False, "from_cache": False, "error": None}
+        try:
+            for _ in range(self.max_redirects + 1):
+                parts = urlsplit(url)
+                if parts.scheme not in ("http", "https") or not parts.hostname:
+                    result["error"] = f"Unsupported URL: {url}"
+                    return result
+                key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+                path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+                request_headers = {
+                    "User-Agent": self.user_agent,
+                    "Accept-Encoding": "identity",
+                    "Connection": "keep-alive",
+                    **(self.cache.validators(url) if self.cache else {}),
+                    **(headers or {})
+                }
+                
+                pool = self._pool(key)
+                # Every slot holder finishes within the timeout, so waiting for one cannot hang
+                pool.slots.acquire()
+                try:
+                    self._count("requests")
+                    status, response_headers, body, truncated = self._request(
+                        pool, key, path, request_headers, time.monotonic() + self.timeout
+                    )
+                finally:
+                    pool.slots.release()
+                
+                if status in (301, 302, 303, 307, 308) and response_headers.get("location"):
+                    url = urljoin(url, response_headers["location"])
+                    result["url"] = url
+                    continue
+                
+                if status == 304 and self.cache:
+                    cached = self.cache.get(url)
+                    cached_body = self.cache.body(url) if cached else None
+                    if cached_body is not None:
+                        self._count("not_modified")
+                        result.update(status=cached["status"], headers=cached["headers"],
+                                      body=cached_body, from_cache=True)
+                        return result
+                
+                result.update(status=status, headers=response_headers, body=body, truncated=truncated)
+                if self.cache and status == 200 and not truncated:
+                    self.cache.put(url, status, response_headers, body)
+                return result
+            result["error"] = f"Too many redirects (more than {self.max_redirects})"
+        except (OSError, http.client.HTTPException) as e:
+            result["error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        return result
+    
+    def fetch_many(self, urls, headers=None):
+        """
+        Fetch several URLs concurrently, each distinct URL once.
+        
+        Args:
+            urls (list): The URLs.
+            headers (dict, optional): Extra request headers. Defaults to None.
+        
+        Returns:
+            list: The result of each URL (see fetch()), in order.
+        """
+        distinct = list(dict.fromkeys(urls))
+        if len(distinct) <= 1:
+            results = {url: self.fetch(url, headers) for url in distinct}
+        else:
+            with ThreadPoolExecutor(min(self.max_workers, len(distinct))) as executor:
+                results = dict(zip(distinct, executor.map(lambda url: self.fetch(url, headers), distinct)))
+        return [results[url] for url in urls]
+    
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        with self._pools_lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            with pool.lock:
+                while pool.idle:
+                    pool.idle.pop().close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """
+    Get the shared fetcher, creating it on first use.
+    
+    Returns:
+        HTTPFetcher: The fetcher configured by the WEB_FETCH_* variables, or None
+            if WEB_FETCH_ENABLED is not set.
+    """
+    global _fetcher
+    if os.getenv("WEB_FETCH_ENABLED", "False").lower() != "true":
+        return None
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = HTTPFetcher(
+                    max_workers=int(os.getenv("WEB_FETCH_MAX_WORKERS", "16")),
+                    max_per_host=int(os.getenv("WEB_FETCH_MAX_PER_HOST", "4")),
+                    timeout=float(os.getenv("WEB_FETCH_TIMEOUT", "10")),
+                    max_body_bytes=int(os.getenv("WEB_FETCH_MAX_BYTES", str(2 * 1024 * 1024))),
+                    cache_dir=os.getenv("WEB_FETCH_CACHE_DIR") or None
+                )
+    return _fetcher
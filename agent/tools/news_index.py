@@ -0,0 +1,256 @@
+# Date-Partitioned News Index
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from datetime import date as date_type, datetime
+
+from agent.tools.search_index import IndexWriter, SearchIndex, tokenize
+
+
+PARTITION_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Days after which the score of an article is halved
+DEFAULT_HALF_LIFE_DAYS = 30
+
+
+def parse_day(value):
+    """
+    Normalize a date to a "YYYY-MM-DD" partition name.
+    
+    Args:
+        value: A date, a datetime or an ISO date or datetime string, whose
+            month and day may be unpadded, e.g. "2024-3-5".
+    
+    Returns:
+        str: The day, zero-padded.
+    
+    Raises:
+        ValueError: If the value is not a valid date.
+    """
+    if isinstance(value, (datetime, date_type)):
+        return value.strftime("%Y-%m-%d")
+    day = re.split(r"[T ]", str(value).strip(), maxsplit=1)[0]
+    return datetime.strptime(day, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+class NewsIndex:
+    """
+    Class for searching news articles by publication date.
+    
+    Articles are stored in one partition per publication day, a directory
+    named YYYY-MM-DD under news_dir holding the day's articles.jsonl and a
+    BM25 search index of them (see agent.tools.search_index). Adding
+    articles only rewrites the partitions of their days.
+    
+    A query first drops the partitions outside its date range, so its cost
+    shrinks with the range. The remaining partitions are searched newest
+    first and scores are weighted by recency, halving every half_life_days
+    before the newest day searched. As every article of a partition has the
+    same weight, each partition only has to beat the weighted k-th score
+    found so far: partitions whose best possible score cannot are skipped,
+    most of them without opening their index, and the others search with
+    it as their minimum score.
+    """
+    
+    def __init__(self, news_dir, half_life_days=None):
+        """
+        Open a news directory.
+        
+        Args:
+            news_dir (str): The directory of the partitions, created if needed.
+            half_life_days (float, optional): Recency half-life, 0 to disable
+                weighting. Defaults to None (NEWS_HALF_LIFE_DAYS or 30).
+        """
+        self.news_dir = news_dir
+        if half_life_days is None:
+            half_life_days = float(os.getenv("NEWS_HALF_LIFE_DAYS", DEFAULT_HALF_LIFE_DAYS))
+        self.half_life_days = half_life_days
+        os.makedirs(news_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._partitions = None
+        self._listed_at = None
+        self._indexes = {}
+        self._metas = {}
+    
+    def partitions(self):
+        """
+        List the partitions, re-reading the directory when it changed.
+        
+        Returns:
+            list: The days with a partition, oldest first.
+        """
+        listed_at = os.stat(self.news_dir).st_mtime_ns
+        if self._partitions is None or listed_at != self._listed_at:
+            names = sorted(
+                name for name in os.listdir(self.news_dir)
+                if PARTITION_PATTERN.match(name)
+                and os.path.exists(os.path.join(self.news_dir, name, "index", "meta.json"))
+            )
+            self._partitions, self._listed_at = names, listed_at
+        return self._partitions
+    
+    def partition(self, day):
+        """
+        Open the index of a partition, reopening it when it was rewritten.
+        
+        Args:
+            day (str): The day, "YYYY-MM-DD".
+        
+        Returns:
+            SearchIndex: The partition's index.
+        """
+        path = os.path.join(self.news_dir, day, "index")
+        inode = os.stat(path).st_ino
+        with self._lock:
+            cached = self._indexes.get(day)
+            if cached is None or cached[0] != inode:
+                cached = (inode, SearchIndex(path))
+                self._indexes[day] = cached
+            return cached[1]
+    
+    def score_bound(self, day, term_count):
+        """
+        Bound the score of a partition's articles without opening its index.
+        
+        A term scores at most its idf for a single document times k1 + 1,
+        so the bound only needs the partition's document count.
+        
+        Args:
+            day (str): The day, "YYYY-MM-DD".
+            term_count (int): Number of distinct query terms.
+        
+        Returns:
+            float: The upper bound.
+        """
+        path = os.path.join(self.news_dir, day, "index")
+        inode = os.stat(path).st_ino
+        cached = self._metas.get(day)
+        if cached is None or cached[0] != inode:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                cached = (inode, json.load(f))
+            self._metas[day] = cached
+        meta = cached[1]
+        return term_count * math.log(1 + 2 * meta["documents"]) * (meta["k1"] + 1)
+    
+    def add_articles(self, articles):
+        """
+        Add articles, reindexing only the partitions of their days.
+        
+        Args:
+            articles (iterable): Article dictionaries with "text", "date" and
+                optional "title", "url" and other fields. Articles without a
+                text or a date are skipped.
+        
+        Returns:
+            list: The days whose partitions were written.
+        """
+        by_day = {}
+        for article in articles:
+            if not article.get("text") or not article.get("date"):
+                continue
+            article = dict(article, date=parse_day(article["date"]))
+            by_day.setdefault(article["date"], []).append(article)
+        
+        for day, day_articles in sorted(by_day.items()):
+            partition_dir = os.path.join(self.news_dir, day)
+            os.makedirs(partition_dir, exist_ok=True)
+            articles_path = os.path.join(partition_dir, "articles.jsonl")
+            with open(articles_path, "a", encoding="utf-8") as f:
+                for article in day_articles:
+                    f.write(json.dumps(article, ensure_ascii=False) + "\n")
+            
+            writer = IndexWriter()
+            with open(articles_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        writer.add(**json.loads(line))
+            writer.write(os.path.join(partition_dir, "index"))
+        
+        # A new partition's index is written after its directory appeared
+        self._partitions = None
+        return sorted(by_day)
+    
+    def weight(self, day, reference_day):
+        """
+        Get the recency weight of a partition.
+        
+        Args:
+            day (str): The partition's day.
+            reference_day (str): The newest day searched, of weight 1.
+        
+        Returns:
+            float: The weight.
+        """
+        if not self.half_life_days:
+            return 1.0
+        age = (datetime.strptime(reference_day, "%Y-%m-%d") - datetime.strptime(day, "%Y-%m-%d")).days
+        return 0.5 ** (max(age, 0) / self.half_life_days)
+    
+    def search(self, query, start_date=None, end_date=None, k=10):
+        """
+        Search the articles published within a date range.
+        
+        Args:
+            query (str): The query.
+            start_date (str, optional): The first day, "YYYY-MM-DD". Defaults to None.
+            end_date (str, optional): The last day, inclusive. Defaults to None.
+            k (int, optional): Number of results. Defaults to 10.
+        
+        Returns:
+            list: Article dictionaries with their stored fields and "score", best first.
+        """
+        start = parse_day(start_date) if start_date else None
+        end = parse_day(end_date) if end_date else None
+        days = [day for day in self.partitions() if (start is None or day >= start) and (end is None or day <= end)]
+        if not days or k <= 0:
+            return []
+        
+        # Min-heap of (weighted score, day, document ID) holding the best k
+        best = []
+        reference_day = days[-1]
+        term_count = len(set(tokenize(query)))
+        for day in reversed(days):
+            weight = self.weight(day, reference_day)
+            floor = best[0][0] if len(best) >= k else 0.0
+            if floor and self.score_bound(day, term_count) * weight <= floor:
+                continue
+            index = self.partition(day)
+            if floor and index.max_score(query) * weight <= floor:
+                continue
+            for doc_id, score in index.top_k(query, k, min_score=floor / weight):
+                entry = (score * weight, day, doc_id)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry[0] > best[0][0]:
+                    heapq.heapreplace(best, entry)
+        
+        results = []
+        for score, day, doc_id in sorted(best, reverse=True):
+            results.append(dict(self.partition(day).document(doc_id), score=score))
+        return results
+
+
+_news_index = None
+_news_lock = threading.Lock()
+
+
+def get_news_index():
+    """
+    Get the shared news index, opening it on first use.
+    
+    Returns:
+        NewsIndex: The index in NEWS_INDEX_DIR, or None if it is not configured.
+    """
+    global _news_index
+    news_dir = os.getenv("NEWS_INDEX_DIR")
+    if not news_dir:
+        return None
+    if _news_index is None or _news_index.news_dir != news_dir:
+        with _news_lock:
+            if _news_index is None or _news_index.news_dir != news_dir:
+                _news_index = NewsIndex(news_dir)
+    return _news_index
@@ -0,0 +1,372 @@
+# Offline Phrase-Table Translation
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_PHRASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "phrases")
+
+# Language names accepted in place of their codes
+LANGUAGE_CODES = {
+    "english": "en",
+    "french": "fr",
+    "spanish": "es",
+    "german": "de",
+    "italian": "it",
+    "portuguese": "pt"
+}
+
+TOKEN_PATTERN = re.compile(r"\w+(?:['’-]\w+)*|[^\w\s]", re.UNICODE)
+
+# Language codes accepted in table file names, e.g. "en" or "fil"
+LANGUAGE_CODE_PATTERN = re.compile(r"^[a-z]{2,3}$")
+
+# Punctuation written without a space before or after it
+NO_SPACE_BEFORE = set(".,;:!?)]}%")
+NO_SPACE_AFTER = set("([{¿¡")
+
+# Punctuation after which a capitalized token starts a sentence
+SENTENCE_END = set(".!?")
+
+
+def language_code(language):
+    """
+    Normalize a language name or code.
+    
+    Args:
+        language (str): E.g. "fr", "FR" or "French".
+    
+    Returns:
+        str: The lowercase language code.
+    """
+    language = language.strip().lower()
+    return LANGUAGE_CODES.get(language, language)
+
+
+def split_tokens(text):
+    """
+    Split text into word and punctuation tokens, keeping their case.
+    
+    Args:
+        text (str): The text.
+    
+    Returns:
+        list: The tokens.
+    """
+    return TOKEN_PATTERN.findall(text)
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word and punctuation tokens, for matching phrases.
+    
+    Args:
+        text (str): The text.
+    
+    Returns:
+        list: The tokens.
+    """
+    return [token.lower().replace("’", "'") for token in split_tokens(text)]
+
+
+def detokenize(tokens):
+    """
+    Join tokens into text, attaching punctuation to its neighbours.
+    
+    Args:
+        tokens (list): The tokens.
+    
+    Returns:
+        str: The text.
+    """
+    text = ""
+    for token in tokens:
+        if text and token[0] not in NO_SPACE_BEFORE and text[-1] not in NO_SPACE_AFTER and text[-1] != "'":
+            text += " "
+        text += token
+    return text
+
+
+class PhraseTable:
+    """
+    Class for translating with the phrases of one language pair.
+    
+    Source phrases are stored in a trie over their tokens. Text is
+    segmented greedily from left to right, taking at every position the
+    longest phrase the trie matches, so "good morning" is translated as one
+    phrase rather than word by word. Phrases are matched regardless of
+    case; tokens no phrase covers, such as names, are copied unchanged.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty table.
+        """
+        # Trie nodes are dicts of token to child node; a node's translation is under None
+        self._root = {}
+        self.size = 0
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Load a table from a tab-separated file of source and target phrases.
+        
+        Blank lines and lines starting with "#" are skipped. When a source
+        phrase is listed twice the first translation wins.
+        
+        Args:
+            path (str): The file.
+        
+        Returns:
+            PhraseTable: The loaded table.
+        """
+        table = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.strip() or line.startswith("#"):
+                    continue
+                source, _, target = line.partition("\t")
+                if target:
+                    table.add(source, target.strip())
+        return table
+    
+    def add(self, source, target):
+        """
+        Add a phrase, keeping any existing translation of it.
+        
+        Args:
+            source (str): The source phrase.
+            target (str): Its translation.
+        """
+        tokens = tokenize(source)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if None not in node:
+            node[None] = split_tokens(target)
+            self.size += 1
+    
+    def __len__(self):
+        return self.size
+    
+    def segment(self, tokens):
+        """
+        Segment tokens into the longest phrases of the table.
+        
+        Args:
+            tokens (list): The source tokens.
+        
+        Returns:
+            list: (source tokens, target tokens) pairs covering the tokens in
+                order; target tokens are None for tokens without a phrase.
+        """
+        segments = []
+        position = 0
+        while position < len(tokens):
+            node = self._root
+            match_end = None
+            match = None
+            end = position
+            while end < len(tokens):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                end += 1
+                if None in node:
+                    match_end, match = end, node[None]
+            if match_end is None:
+                segments.append((tokens[position:position + 1], None))
+                position += 1
+            else:
+                segments.append((tokens[position:match_end], match))
+                position = match_end
+        return segments
+    
+    def translate(self, text):
+        """
+        Translate text.
+        
+        Args:
+            text (str): The text.
+        
+        Returns:
+            str: The translation. Translated phrases that start a sentence
+                with a capital are capitalized.
+        """
+        surface = split_tokens(text)
+        target = []
+        position = 0
+        for source, translation in self.segment(tokenize(text)):
+            original = surface[position:position + len(source)]
+            if translation is None:
+                target.extend(original)
+            else:
+                translation = list(translation)
+                starts_sentence = position == 0 or surface[position - 1] in SENTENCE_END
+                if translation and starts_sentence and original[0][:1].isupper():
+                    translation[0] = translation[0][:1].upper() + translation[0][1:]
+                target.extend(translation)
+            position += len(source)
+        return detokenize(target)
+
+
+class Translator:
+    """
+    Class for translating between the language pairs of a phrase directory.
+    
+    The directory holds one table per pair, named <source>-<target>.tsv,
+    e.g. fr-en.tsv. Tables are loaded the first time their pair is used,
+    and only the most recently used max_pairs tables are kept. Translations
+    are memoized, so repeated sentences are only segmented once.
+    """
+    
+    def __init__(self, phrase_dir=None, max_pairs=None, cache_size=10000):
+        """
+        Initialize the translator.
+        
+        Args:
+            phrase_dir (str, optional): The phrase directory. Defaults to None
+                (TRANSLATION_DATA_DIR or the bundled tables).
+            max_pairs (int, optional): Number of tables kept loaded. Defaults to None
+                (TRANSLATION_MAX_PAIRS or 8).
+            cache_size (int, optional): Number of memoized translations. Defaults to 10000.
+        """
+        self.phrase_dir = phrase_dir or os.getenv("TRANSLATION_DATA_DIR") or DEFAULT_PHRASE_DIR
+        self.max_pairs = max(1, max_pairs or int(os.getenv("TRANSLATION_MAX_PAIRS", "8")))
+        self.cache_size = cache_size
+        self._tables = OrderedDict()
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"loads": 0, "evictions": 0, "hits": 0, "misses": 0}
+    
+    def pairs(self):
+        """
+        List the language pairs of the phrase directory.
+        
+        Returns:
+            list: (source, target) code tuples.
+        """
+        try:
+            names = sorted(os.listdir(self.phrase_dir))
+        except OSError:
+            return []
+        pairs = [tuple(name[:-4].split("-", 1)) for name in names if name.endswith(".tsv") and "-" in name]
+        return [pair for pair in pairs if all(LANGUAGE_CODE_PATTERN.match(code) for code in pair)]
+    
+    def table(self, source_lang, target_lang):
+        """
+        Get the table of a language pair, loading it if needed.
+        
+        Args:
+            source_lang (str): The source language.
+            target_lang (str): The target language.
+        
+        Returns:
+            PhraseTable: The table, or None if the pair has no table or a
+                language is neither a known name nor a valid code.
+        """
+        pair = (language_code(source_lang), language_code(target_lang))
+        # Codes become part of a file name, so nothing else may reach the path
+        if not all(LANGUAGE_CODE_PATTERN.match(code) for code in pair):
+            return None
+        with self._lock:
+            table = self._tables.get(pair)
+            if table is not None:
+                self._tables.move_to_end(pair)
+                return table
+        
+        path = os.path.join(self.phrase_dir, f"{pair[0]}-{pair[1]}.tsv")
+        if not os.path.exists(path):
+            return None
+        table = PhraseTable.load(path)
+        with self._lock:
+            self._tables[pair] = table
+            self._tables.move_to_end(pair)
+            self.stats["loads"] += 1
+            while len(self._tables) > self.max_pairs:
+                self._tables.popitem(last=False)
+                self.stats["evictions"] += 1
+        return table
+    
+    def translate_many(self, texts, source_lang, target_lang):
+        """
+        Translate a batch of texts of one language pair.
+        
+        The pair's table is looked up once for the batch and every distinct
+        text is translated only once.
+        
+        Args:
+            texts (list): The texts.
+            source_lang (str): The source language.
+            target_lang (str): The target language.
+        
+        Returns:
+            list: The translation of each text, in order, or None if the pair has no table.
+        """
+        pair = (language_code(source_lang), language_code(target_lang))
+        if pair[0] == pair[1]:
+            return list(texts)
+        table = self.table(*pair)
+        if table is None:
+            return None
+        
+        results = []
+        translated = {}
+        for text in texts:
+            result = translated.get(text)
+            if result is None:
+                key = (pair, text)
+                with self._lock:
+                    result = self._memo.get(key)
+                    if result is not None:
+                        self._memo.move_to_end(key)
+                        self.stats["hits"] += 1
+                if result is None:
+                    result = table.translate(text)
+                    with self._lock:
+                        self.stats["misses"] += 1
+                        self._memo[key] = result
+                        if len(self._memo) > self.cache_size:
+                            self._memo.popitem(last=False)
+                translated[text] = result
+            results.append(result)
+        return results
+    
+    def translate(self, text, source_lang, target_lang):
+        """
+        Translate a text.
+        
+        Args:
+            text (str): The text.
+            source_lang (str): The source language.
+            target_lang (str): The target language.
+        
+        Returns:
+            str: The translation, or None if the pair has no table.
+        """
+        results = self.translate_many([text], source_lang, target_lang)
+        return results[0] if results is not None else None
+
+
+_translator = None
+_translator_lock = threading.Lock()
+
+
+def get_translator():
+    """
+    Get the shared translator, creating it on first use.
+    
+    Returns:
+        Translator: The translator for TRANSLATION_DATA_DIR or the bundled tables.
+    """
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                _translator = Translator()
+    return _translator
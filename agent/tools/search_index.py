@@ -0,0 +1,673 @@
+# Offline BM25 Search Index
+
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+
+# Bump when the layout of an index changes
+INDEX_FORMAT = 2
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its of on or she "
+    "that the their them they this to was were which who will with you your".split()
+)
+
+SNIPPET_LENGTH = 200
+
+
+def tokenize(text):
+    """
+    Split text into lowercase terms, dropping stopwords.
+    
+    Args:
+        text (str): The text.
+    
+    Returns:
+        list: The terms.
+    """
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if term not in STOPWORDS]
+
+
+def encode_varints(values):
+    """
+    Encode non-negative integers as variable-length bytes.
+    
+    Each value is written 7 bits at a time, least significant first, with
+    the high bit set on every byte but the last.
+    
+    Args:
+        values (numpy.ndarray): The values.
+    
+    Returns:
+        tuple: (bytes as a uint8 array, number of bytes of each value).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    
+    starts = np.cumsum(sizes) - sizes
+    byte_index = np.arange(int(sizes.sum())) - np.repeat(starts, sizes)
+    repeated = np.repeat(values, sizes)
+    data = (repeated >> (np.uint64(7) * byte_index.astype(np.uint64))) & np.uint64(0x7F)
+    data |= np.where(byte_index < np.repeat(sizes, sizes) - 1, 0x80, 0).astype(np.uint64)
+    return data.astype(np.uint8), sizes
+
+
+def decode_varints(data):
+    """
+    Decode variable-length bytes written by encode_varints().
+    
+    Args:
+        data (numpy.ndarray): The bytes as a uint8 array.
+    
+    Returns:
+        numpy.ndarray: The values as int64.
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) == len(data):
+        # Every value fits in one byte
+        return data.astype(np.int64)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = 7 * (np.arange(len(data)) - np.repeat(starts, ends - starts + 1))
+    parts = (data & 0x7F).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts)
+
+
+def _snippet(text):
+    """
+    Get the beginning of a text, with whitespace collapsed.
+    
+    Args:
+        text (str): The text.
+    
+    Returns:
+        str: At most SNIPPET_LENGTH characters, cut at a word boundary.
+    """
+    text = " ".join(text.split())
+    if len(text) <= SNIPPET_LENGTH:
+        return text
+    return text[:SNIPPET_LENGTH].rsplit(" ", 1)[0] + "..."
+
+
+class IndexWriter:
+    """
+    Class for building a BM25 search index.
+    
+    Documents are tokenized as they are added and their postings collected
+    in compact arrays; write() then sorts them by term and encodes each
+    term's posting list in blocks of block_size postings. A block holds the
+    gaps between its document IDs followed by their term frequencies, all
+    varint-encoded, and the index keeps the last document ID and the byte
+    offset of every block, so a query can decode only the blocks that may
+    contain the documents it still considers. The best BM25 score of every
+    block and of every term is stored for block-max and MaxScore pruning.
+    """
+    
+    def __init__(self, k1=1.2, b=0.75, block_size=128):
+        """
+        Initialize an empty index.
+        
+        Args:
+            k1 (float, optional): BM25 term frequency saturation. Defaults to 1.2.
+            b (float, optional): BM25 length normalization. Defaults to 0.75.
+            block_size (int, optional): Number of postings per block. Defaults to 128.
+        """
+        self.k1 = k1
+        self.b = b
+        self.block_size = block_size
+        self._terms = {}
+        self._term_ids = array("I")
+        self._doc_ids = array("I")
+        self._frequencies = array("I")
+        self._lengths = array("I")
+        self._documents = []
+    
+    def __len__(self):
+        return len(self._lengths)
+    
+    def add(self, text, title=None, url=None, **fields):
+        """
+        Add a document.
+        
+        Args:
+            text (str): The text of the document.
+            title (str, optional): The title, also indexed. Defaults to None.
+            url (str, optional): The URL. Defaults to None.
+            **fields: Other JSON-serializable fields returned with the document.
+        
+        Returns:
+            int: The document ID.
+        """
+        doc_id = len(self._lengths)
+        terms = tokenize(f"{title or ''} {text}")
+        for term, frequency in Counter(terms).items():
+            term_id = self._terms.get(term)
+            if term_id is None:
+                term_id = self._terms[term] = len(self._terms)
+            self._term_ids.append(term_id)
+            self._doc_ids.append(doc_id)
+            self._frequencies.append(frequency)
+        self._lengths.append(len(terms))
+        self._documents.append(json.dumps(
+            {"title": title or "", "url": url or "", "snippet": _snippet(text), **fields},
+            ensure_ascii=False
+        ))
+        return doc_id
+    
+    def write(self, index_dir):
+        """
+        Write the index, replacing any index in the directory.
+        
+        The index is written to a temporary directory first, so a
+        half-written index is never opened.
+        
+        Args:
+            index_dir (str): The index directory.
+        """
+        count = len(self._lengths)
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float64)
+        average_length = float(lengths.mean()) if count else 0.0
+        norms = (self.k1 * (1 - self.b + self.b * lengths / max(average_length, 1e-9))).astype(np.float32)
+        
+        # Postings sorted by term; document IDs stay in order within a term
+        term_count = len(self._terms)
+        term_ids = np.frombuffer(self._term_ids, dtype=np.uint32)
+        df = np.bincount(term_ids, minlength=term_count)
+        order = np.argsort(term_ids, kind="stable")
+        doc_ids = np.frombuffer(self._doc_ids, dtype=np.uint32)[order]
+        frequencies = np.frombuffer(self._frequencies, dtype=np.uint32)[order]
+        del order
+        postings = len(doc_ids)
+        
+        # Posting list blocks
+        term_starts = np.cumsum(df) - df
+        term_blocks = -(-df // self.block_size)
+        first_blocks = np.cumsum(term_blocks) - term_blocks
+        block_count = int(term_blocks.sum())
+        block_of_posting = (np.arange(postings) - np.repeat(term_starts, df)) // self.block_size
+        block_of_posting += np.repeat(first_blocks, df)
+        block_sizes = np.bincount(block_of_posting, minlength=block_count)
+        block_starts = np.cumsum(block_sizes) - block_sizes
+        block_last = doc_ids[block_starts + block_sizes - 1].astype(np.int64)
+        
+        # Gaps from the previous posting of the same term, or from 0
+        gaps = doc_ids.copy()
+        gaps[1:] -= doc_ids[:-1]
+        gaps[term_starts[df > 0]] = doc_ids[term_starts[df > 0]]
+        
+        # Every block is its gaps followed by its frequencies
+        gap_positions = np.arange(postings) + block_starts[block_of_posting]
+        values = np.empty(2 * postings, dtype=np.uint32)
+        values[gap_positions] = gaps
+        values[gap_positions + block_sizes[block_of_posting]] = frequencies
+        del gaps, gap_positions, block_of_posting
+        chunks = []
+        sizes = np.empty(len(values), dtype=np.uint8)
+        for start in range(0, len(values), 1 << 20):
+            chunk, sizes[start:start + (1 << 20)] = encode_varints(values[start:start + (1 << 20)])
+            chunks.append(chunk)
+        data = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.uint8)
+        del values, chunks
+        block_offsets = np.zeros(block_count + 1, dtype=np.int64)
+        if block_count:
+            block_offsets[1:] = np.cumsum(np.add.reduceat(sizes, 2 * block_starts, dtype=np.int64))
+        
+        # BM25 idf and the best score of every block and term, raised by a
+        # margin for float32 rounding so they stay upper bounds of the
+        # scores computed at query time
+        idf = np.log(1 + (count - df + 0.5) / (df + 0.5))
+        block_max = np.zeros(block_count, dtype=np.float32)
+        upper_bounds = np.zeros(term_count)
+        if postings:
+            scores = frequencies * np.float32(self.k1 + 1) / (frequencies + norms[doc_ids])
+            scores *= np.repeat(idf.astype(np.float32), df)
+            block_max = np.maximum.reduceat(scores, block_starts) * np.float32(1 + 1e-5)
+            upper_bounds = np.maximum.reduceat(block_max, first_blocks).astype(np.float64)
+            del scores
+        
+        # The lexicon: terms in ID order, with their blocks and scores
+        terms = sorted(self._terms, key=self._terms.get)
+        term_postings = np.stack([first_blocks, term_blocks, df], axis=1).astype(np.int64)
+        term_scores = np.stack([idf, upper_bounds], axis=1) if term_count else np.empty((0, 2))
+        
+        meta = {
+            "format": INDEX_FORMAT,
+            "documents": count,
+            "terms": term_count,
+            "average_length": average_length,
+            "k1": self.k1,
+            "b": self.b,
+            "block_size": self.block_size
+        }
+        
+        parent = os.path.dirname(os.path.abspath(index_dir))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=".index-", dir=parent)
+        try:
+            data.tofile(os.path.join(tmp_path, "postings.bin"))
+            np.save(os.path.join(tmp_path, "block_last.npy"), block_last.astype(np.int64))
+            np.save(os.path.join(tmp_path, "block_offsets.npy"), block_offsets)
+            np.save(os.path.join(tmp_path, "block_max.npy"), block_max)
+            np.save(os.path.join(tmp_path, "doc_norms.npy"), norms)
+            
+            doc_offsets = [0]
+            with open(os.path.join(tmp_path, "docs.jsonl"), "wb") as f:
+                for document in self._documents:
+                    line = document.encode("utf-8") + b"\n"
+                    f.write(line)
+                    doc_offsets.append(doc_offsets[-1] + len(line))
+            np.save(os.path.join(tmp_path, "doc_offsets.npy"), np.asarray(doc_offsets, dtype=np.int64))
+            
+            with open(os.path.join(tmp_path, "terms.json"), "w", encoding="utf-8") as f:
+                json.dump(terms, f, ensure_ascii=False)
+            np.save(os.path.join(tmp_path, "term_postings.npy"), term_postings)
+            np.save(os.path.join(tmp_path, "term_scores.npy"), term_scores)
+            with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+            
+            if os.path.exists(index_dir):
+                shutil.rmtree(index_dir)
+            os.rename(tmp_path, index_dir)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+
+def html_to_text(markup):
+    """
+    Extract the title and the visible text of an HTML page.
+    
+    Args:
+        markup (str): The HTML.
+    
+    Returns:
+        tuple: (title or None, text).
+    """
+    title = re.search(r"<title[^>]*>(.*?)</title>", markup, re.IGNORECASE | re.DOTALL)
+    body = re.sub(r"<(script|style|title)[^>]*>.*?</\1>", " ", markup, flags=re.IGNORECASE | re.DOTALL)
+    text = html.unescape(re.sub(r"<[^>]+>", " ", body))
+    return (html.unescape(title.group(1).strip()) if title else None), text
+
+
+def read_documents(source_dir):
+    """
+    Stream the documents of a directory tree.
+    
+    Text and Markdown files are one document each, titled by their first
+    line; HTML files are titled by their <title> and stripped of tags; each
+    line of a JSONL file is a document with "text" and optional "title",
+    "url" and other fields.
+    
+    Args:
+        source_dir (str): The directory.
+    
+    Yields:
+        dict: The document, with "text", "title", "url" and any other fields.
+    """
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            extension = os.path.splitext(name)[1].lower()
+            url = "file://" + os.path.abspath(path)
+            if extension == ".jsonl":
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            document = json.loads(line)
+                            if document.get("text"):
+                                yield document
+            elif extension in (".txt", ".md"):
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+                lines = [line.strip("# \t") for line in text.splitlines() if line.strip()]
+                yield {"text": text, "title": lines[0] if lines else name, "url": url}
+            elif extension in (".html", ".htm"):
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    markup = f.read()
+                title, text = html_to_text(markup)
+                yield {"text": text, "title": title or name, "url": url}
+
+
+def build_index(source_dir, index_dir, **options):
+    """
+    Index the documents of a directory tree (see read_documents()).
+    
+    Args:
+        source_dir (str): The document directory.
+        index_dir (str): The index directory.
+        **options: BM25 and block options of IndexWriter.
+    
+    Returns:
+        int: The number of documents indexed.
+    """
+    writer = IndexWriter(**options)
+    for document in read_documents(source_dir):
+        writer.add(**document)
+    writer.write(index_dir)
+    return len(writer)
+
+
+class SearchIndex:
+    """
+    Class for querying a BM25 search index written by IndexWriter.
+    
+    The posting blocks, block tables and document norms are memory-mapped,
+    so opening an index reads only its terms and their statistics. Queries are evaluated term
+    at a time, in order of decreasing BM25 upper bound, with MaxScore
+    pruning: once the k-th best score so far is at least the sum of the
+    upper bounds of the terms left, no document that has not matched yet
+    can enter the top k, so the remaining terms only decode the blocks
+    that may hold the remaining candidates, and candidates that can no
+    longer reach the k-th score are dropped. Before that, blocks whose
+    best score cannot lift any of their documents to the k-th score are
+    skipped.
+    """
+    
+    def __init__(self, index_dir):
+        """
+        Open an index.
+        
+        Args:
+            index_dir (str): The index directory.
+        """
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported search index format: {self.meta.get('format')}")
+        with open(os.path.join(index_dir, "terms.json"), encoding="utf-8") as f:
+            terms = json.load(f)
+        self.terms = dict(zip(terms, range(len(terms))))
+        self.term_postings = np.load(os.path.join(index_dir, "term_postings.npy"))
+        self.term_scores = np.load(os.path.join(index_dir, "term_scores.npy"))
+        
+        postings_path = os.path.join(index_dir, "postings.bin")
+        if os.path.getsize(postings_path):
+            self.postings = np.memmap(postings_path, dtype=np.uint8, mode="r").view(np.ndarray)
+        else:
+            self.postings = np.empty(0, dtype=np.uint8)
+        self.block_last = np.load(os.path.join(index_dir, "block_last.npy"), mmap_mode="r").view(np.ndarray)
+        self.block_offsets = np.load(os.path.join(index_dir, "block_offsets.npy"), mmap_mode="r").view(np.ndarray)
+        self.block_max = np.load(os.path.join(index_dir, "block_max.npy"), mmap_mode="r").view(np.ndarray)
+        self.doc_norms = np.load(os.path.join(index_dir, "doc_norms.npy"), mmap_mode="r").view(np.ndarray)
+        self.doc_offsets = np.load(os.path.join(index_dir, "doc_offsets.npy"), mmap_mode="r").view(np.ndarray)
+        self.k1 = self.meta["k1"]
+        self.block_size = self.meta["block_size"]
+    
+    def __len__(self):
+        return self.meta["documents"]
+    
+    def _decode_blocks(self, entry, blocks):
+        """
+        Decode blocks of a term's posting list.
+        
+        Args:
+            entry (list): The term's entry (see _entries()).
+            blocks (numpy.ndarray): Sorted positions of the blocks within the term.
+        
+        Returns:
+            tuple: (document IDs, term frequencies) of the blocks' postings.
+        """
+        first_block, block_count, df = entry[0], entry[1], entry[2]
+        size = self.block_size
+        absolute = first_block + blocks
+        starts = self.block_offsets[absolute]
+        stops = self.block_offsets[absolute + 1]
+        if blocks[-1] - blocks[0] + 1 == len(blocks):
+            data = self.postings[starts[0]:stops[-1]]
+        else:
+            # Gather the byte ranges of the blocks
+            lengths = stops - starts
+            offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+            data = self.postings[offsets + np.arange(len(offsets))]
+        values = decode_varints(data)
+        
+        # Every block is [gaps..., frequencies...], all full but possibly
+        # the term's last one; document IDs restart from the previous
+        # block's last ID in every block
+        bases = np.where(blocks > 0, self.block_last[np.maximum(absolute - 1, 0)], 0)
+        tail = df - size * (block_count - 1)
+        full = len(blocks) - int(blocks[-1] == block_count - 1 and tail < size)
+        head = values[:2 * size * full].reshape(full, 2, size)
+        doc_ids = (np.cumsum(head[:, 0], axis=1) + bases[:full, None]).ravel()
+        frequencies = head[:, 1].ravel()
+        if full < len(blocks):
+            rest = values[2 * size * full:]
+            doc_ids = np.concatenate([doc_ids, np.cumsum(rest[:tail]) + bases[-1]])
+            frequencies = np.concatenate([frequencies, rest[tail:]])
+        return doc_ids, frequencies
+    
+    def _score(self, entry, doc_ids, frequencies):
+        """
+        Compute the BM25 scores of a term's postings.
+        
+        Args:
+            entry (list): The term's entry (see _entries()).
+            doc_ids (numpy.ndarray): The document IDs.
+            frequencies (numpy.ndarray): The term frequencies.
+        
+        Returns:
+            numpy.ndarray: The scores.
+        """
+        return entry[3] * frequencies * (self.k1 + 1) / (frequencies + self.doc_norms[doc_ids])
+    
+    @staticmethod
+    def _candidates(accumulator, touched, minimum):
+        """
+        Find the documents whose accumulated score reaches a minimum.
+        
+        Args:
+            accumulator (numpy.ndarray): The dense scores.
+            touched (list): Arrays of the document IDs scored so far.
+            minimum (float): The minimum score, above 0.
+        
+        Returns:
+            numpy.ndarray: The sorted document IDs.
+        """
+        # Few scored documents are cheaper to collect than to scan for
+        if sum(len(doc_ids) for doc_ids in touched) < len(accumulator) // 4:
+            doc_ids = np.concatenate(touched)
+            doc_ids = np.sort(doc_ids[accumulator[doc_ids] >= minimum])
+            if not len(doc_ids):
+                return doc_ids
+            return doc_ids[np.concatenate([[True], doc_ids[1:] != doc_ids[:-1]])]
+        return np.flatnonzero(accumulator >= minimum)
+    
+    def _entries(self, query):
+        """
+        Look up the distinct terms of a query.
+        
+        Args:
+            query (str): The query.
+        
+        Returns:
+            list: [first block, block count, document frequency, idf, best score]
+                of each term in the index.
+        """
+        entries = []
+        for term in dict.fromkeys(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is not None:
+                entries.append([*self.term_postings[term_id].tolist(), *self.term_scores[term_id].tolist()])
+        return entries
+    
+    def max_score(self, query):
+        """
+        Get an upper bound of the score of any document for a query.
+        
+        Args:
+            query (str): The query.
+        
+        Returns:
+            float: The sum of the best scores of the query's terms.
+        """
+        return sum(entry[4] for entry in self._entries(query))
+    
+    def top_k(self, query, k=10, min_score=0.0):
+        """
+        Find the best-scoring documents of a query.
+        
+        Args:
+            query (str): The query.
+            k (int, optional): Number of documents to return. Defaults to 10.
+            min_score (float, optional): Score a document must reach, which lets a
+                caller merging several indexes prune with its own k-th score.
+                Defaults to 0.0.
+        
+        Returns:
+            list: (document ID, score) tuples, best first.
+        """
+        entries = self._entries(query)
+        if not entries or k <= 0:
+            return []
+        entries.sort(key=lambda entry: -entry[4])
+        remaining = np.cumsum([entry[4] for entry in entries][::-1])[::-1]
+        remaining = np.append(remaining[1:], 0.0)
+        
+        # Scores are accumulated densely until MaxScore pruning starts, then
+        # only for the remaining candidates
+        accumulator = None
+        touched = []
+        threshold = min_score
+        candidates = None
+        probe = max(4, 2 * -(-k // self.block_size))
+        
+        def accumulate(entry, blocks):
+            nonlocal threshold
+            doc_ids, frequencies = self._decode_blocks(entry, blocks)
+            accumulator[doc_ids] += self._score(entry, doc_ids, frequencies)
+            touched.append(doc_ids)
+            # The k-th best score among these documents bounds the k-th
+            # best score overall from below
+            if len(doc_ids) >= k:
+                current = accumulator[doc_ids]
+                threshold = max(threshold, float(np.partition(current, len(current) - k)[len(current) - k]))
+        
+        for entry, rest in zip(entries, remaining):
+            if candidates is None:
+                if accumulator is None:
+                    accumulator = np.zeros(len(self))
+                
+                # Block-max pruning: a block is skipped when no document in
+                # its range can reach the threshold, even with the best
+                # score of the block and of every remaining term. The most
+                # promising blocks are scored first to raise the threshold.
+                potential = self.block_max[entry[0]:entry[0] + entry[1]] + rest
+                if touched:
+                    term_last = self.block_last[entry[0]:entry[0] + entry[1]]
+                    potential += np.maximum.reduceat(accumulator, np.concatenate([[0], term_last[:-1] + 1]))
+                if entry[1] > probe:
+                    first = np.sort(np.argpartition(-potential, probe - 1)[:probe])
+                    accumulate(entry, first)
+                    others = np.flatnonzero(potential >= threshold)
+                    others = others[~np.isin(others, first)]
+                    if len(others):
+                        accumulate(entry, others)
+                else:
+                    accumulate(entry, np.arange(entry[1]))
+                
+                if rest > threshold or threshold <= 0:
+                    continue
+                # Many candidates are cheaper to keep scoring densely
+                found = self._candidates(accumulator, touched, threshold - rest)
+                if len(found) > len(self) // 16:
+                    continue
+                candidates, scores = found, accumulator[found]
+                accumulator = touched = None
+                if not len(candidates):
+                    break
+            else:
+                # Only the blocks that may hold a candidate
+                term_last = self.block_last[entry[0]:entry[0] + entry[1]]
+                blocks = np.searchsorted(term_last, candidates)
+                blocks = blocks[np.concatenate([[True], blocks[1:] != blocks[:-1]]) & (blocks < entry[1])]
+                if len(blocks):
+                    doc_ids, frequencies = self._decode_blocks(entry, blocks)
+                    positions = np.searchsorted(doc_ids, candidates)
+                    positions[positions == len(doc_ids)] = 0
+                    found = doc_ids[positions] == candidates
+                    scores[found] += self._score(entry, doc_ids[positions[found]], frequencies[positions[found]])
+                if len(scores) >= k:
+                    threshold = max(threshold, float(np.partition(scores, len(scores) - k)[len(scores) - k]))
+                keep = scores + rest >= threshold
+                candidates, scores = candidates[keep], scores[keep]
+                if not len(candidates):
+                    break
+        
+        if candidates is None:
+            candidates = self._candidates(accumulator, touched, max(threshold, 1e-300))
+            scores = accumulator[candidates]
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((candidates, -scores))
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+    
+    def document(self, doc_id):
+        """
+        Read the stored fields of a document.
+        
+        Args:
+            doc_id (int): The document ID.
+        
+        Returns:
+            dict: The document's "title", "url", "snippet" and other fields.
+        """
+        with open(os.path.join(self.index_dir, "docs.jsonl"), "rb") as f:
+            f.seek(int(self.doc_offsets[doc_id]))
+            return json.loads(f.readline())
+    
+    def search(self, query, k=10):
+        """
+        Search the index.
+        
+        Args:
+            query (str): The query.
+            k (int, optional): Number of results. Defaults to 10.
+        
+        Returns:
+            list: Result dictionaries with the document's fields and its "score", best first.
+        """
+        return [dict(self.document(doc_id), score=score) for doc_id, score in self.top_k(query, k)]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    Get the shared search index, opening it on first use.
+    
+    Returns:
+        SearchIndex: The index in SEARCH_INDEX_DIR, or None if it is not configured.
+    """
+    global _index
+    index_dir = os.getenv("SEARCH_INDEX_DIR")
+    if not index_dir:
+        return None
+    if _index is None or _index.index_dir != index_dir:
+        with _index_lock:
+            if _index is None or _index.index_dir != index_dir:
+                _index = SearchIndex(index_dir)
+    return _index
@@ -46,7 +46,12 @@ class ToolEncoder:
         Returns:
             list: List of encoded tool vectors.
         """
-        return [self.encode(desc) for desc in descriptions]
+        # For demonstration purposes, all random vectors are generated and normalized at once
+        vectors = np.random.randn(len(descriptions), self.embedding_dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        
+        return vectors.tolist()
     
     def encode_tools(self, tools):
         """
@@ -1,10 +1,74 @@
 # Tool implementations for the AI Agent
 
+import ast
+import math
+import operator
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import numpy as np
+
+from agent.tools.gazetteer import get_gazetteer
+from agent.tools.phrase_table import get_translator
+from agent.tools.search_index import get_search_index
+from agent.tools.weather_store import get_weather_store
+
 class WeatherAPI:
     """
     Tool for getting weather information for a location.
+    
+    When WEATHER_DATA_DIR points to an offline weather store (see
+    agent.tools.weather_store), answers are computed from its observations;
+    otherwise simulated weather is returned.
     """
     
+    @staticmethod
+    def _day_range(date):
+        """
+        Resolve a date to a UTC day.
+        
+        Args:
+            date (str): None, "today", "yesterday" or "YYYY-MM-DD".
+        
+        Returns:
+            tuple: (start, end, label) with the day's epoch-second bounds, or None
+                if the date is not understood.
+        """
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        if not date or date == "yesterday":
+            day, label = today - timedelta(days=1), "yesterday"
+        elif date == "today":
+            day, label = today, "today"
+        else:
+            try:
+                day = datetime.strptime(date.strip(), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                return None
+            label = f"on {date.strip()}"
+        return int(day.timestamp()), int((day + timedelta(days=1)).timestamp()), label
+    
+    @staticmethod
+    def _describe(store, result, position):
+        """
+        Format the statistics of one location.
+        
+        Args:
+            store (WeatherStore): The store the statistics come from.
+            result (dict): The result of WeatherStore.aggregate().
+            position (int): The location's position in the result.
+        
+        Returns:
+            str: E.g. "temperature 12.3°C (min 8.1°C, max 15.0°C)".
+        """
+        parts = []
+        for variable, stats in result.items():
+            unit = store.units.get(variable, "")
+            parts.append(
+                f"{variable} {stats['mean'][position]:.1f}{unit} "
+                f"(min {stats['min'][position]:.1f}{unit}, max {stats['max'][position]:.1f}{unit})"
+            )
+        return ", ".join(parts)
+    
     @staticmethod
     def get_weather(location, date=None):
         """
@@ -12,38 +76,74 @@ class WeatherAPI:
         
         Args:
             location (str): The location to get weather for.
-            date (str, optional): The date to get weather for. Defaults to None (current date).
+            date (str, optional): The date to get weather for: "today", "yesterday"
+                or "YYYY-MM-DD". Defaults to None (yesterday).
         
         Returns:
             str: The weather information.
         """
-        # In a real implementation, this would call an actual weather API
-        if not date or date == "yesterday":
-            return f"Weather in {location} yesterday: Cloudy, 65°F"
-        elif date == "today":
-            return f"Weather in {location} today: Sunny, 72°F"
-        else:
+        store = get_weather_store()
+        if store is None:
+            # Simulated weather when no offline store is configured
+            if not date or date == "yesterday":
+                return f"Weather in {location} yesterday: Cloudy, 65°F"
+            elif date == "today":
+                return f"Weather in {location} today: Sunny, 72°F"
+            else:
+                return f"Weather in {location} on {date}: Data not available"
+        
+        day = WeatherAPI._day_range(date)
+        if day is None:
             return f"Weather in {location} on {date}: Data not available"
+        start, end, label = day
+        result = store.aggregate([location], start, end, stats=("mean", "min", "max", "count"))
+        counts = [stats.pop("count")[0] for stats in result.values()]
+        if not any(counts):
+            return f"Weather in {location} {label}: Data not available"
+        return f"Weather in {location} {label}: {WeatherAPI._describe(store, result, 0)}"
+    
+    @staticmethod
+    def get_weather_range(locations, start_date, end_date, variables=None):
+        """
+        Summarize the weather of several locations over a range of days.
+        
+        Requires an offline weather store (WEATHER_DATA_DIR). All locations
+        are aggregated in one vectorized pass.
+        
+        Args:
+            locations (list): The locations.
+            start_date (str): The first day, "YYYY-MM-DD".
+            end_date (str): The last day, "YYYY-MM-DD", inclusive.
+            variables (list, optional): The variables to summarize. Defaults to None (all).
+        
+        Returns:
+            list: The weather summary of each location, in order.
+        """
+        store = get_weather_store()
+        first = WeatherAPI._day_range(start_date)
+        last = WeatherAPI._day_range(end_date)
+        period = f"from {start_date} to {end_date}"
+        if store is None or first is None or last is None:
+            return [f"Weather in {location} {period}: Data not available" for location in locations]
+        
+        result = store.aggregate(locations, first[0], last[1], variables=variables,
+                                 stats=("mean", "min", "max", "count"))
+        counts = np.sum([stats.pop("count") for stats in result.values()], axis=0)
+        return [
+            f"Weather in {location} {period}: {WeatherAPI._describe(store, result, i)}"
+            if counts[i] else f"Weather in {location} {period}: Data not available"
+            for i, location in enumerate(locations)
+        ]
 
 
 class CapitalAPI:
     """
     Tool for finding the capital city of a country.
-    """
     
-    # Sample data for demonstration
-    CAPITALS = {
-        "france": "Paris",
-        "germany": "Berlin",
-        "italy": "Rome",
-        "spain": "Madrid",
-        "united kingdom": "London",
-        "usa": "Washington D.C.",
-        "canada": "Ottawa",
-        "japan": "Tokyo",
-        "china": "Beijing",
-        "australia": "Canberra"
-    }
+    Countries and regions are looked up in the offline gazetteer, by name
+    or alias and tolerating small misspellings, so "U.S.", "United States"
+    and "Untied States" all find the same country.
+    """
     
     @staticmethod
     def get_capital(country):
@@ -56,16 +156,34 @@ class CapitalAPI:
         Returns:
             str: The capital city.
         """
-        country = country.lower()
-        if country in CapitalAPI.CAPITALS:
-            return f"The capital of {country.title()} is {CapitalAPI.CAPITALS[country]}"
-        else:
-            return f"Capital information for {country.title()} not found"
+        return CapitalAPI.get_capitals([country])[0]
+    
+    @staticmethod
+    def get_capitals(countries):
+        """
+        Get the capital cities of several countries in one lookup.
+        
+        Args:
+            countries (list): The countries to get the capitals of.
+        
+        Returns:
+            list: The capital city of each country, in order.
+        """
+        results = []
+        for country, entry in zip(countries, get_gazetteer().lookup_many(countries)):
+            if entry is not None and entry["capital"]:
+                results.append(f"The capital of {entry['name']} is {entry['capital']}")
+            else:
+                results.append(f"Capital information for {country.title()} not found")
+        return results
 
 
 class SearchAPI:
     """
     Tool for searching for information on the web.
+    
+    Answers from the search index in SEARCH_INDEX_DIR when it is set (see
+    agent.tools.search_index), and with a simulated answer otherwise.
     """
     
     @staticmethod
@@ -79,38 +197,489 @@ class SearchAPI:
         Returns:
             str: The search results.
         """
-        # In a real implementation, this would call an actual search API
-        return f"Search results for '{query}': Found relevant information about {query}."
+        index = get_search_index()
+        if index is None:
+            # Simulated answer when no search index is configured
+            return f"Search results for '{query}': Found relevant information about {query}."
+        results = index.search(query, 3)
+        if not results:
+            return f"Search results for '{query}': No results found."
+        return f"Search results for '{query}': " + " | ".join(
+            f"{result['title']}: {result['snippet']}" for result in results
+        )
+
+
+# Size in bits of the largest integer a calculation may produce
+MAX_INTEGER_BITS = 1_000_000
+
+
+def _check_integer_size(bits):
+    """
+    Refuse an integer result estimated to exceed MAX_INTEGER_BITS.
+    
+    Args:
+        bits (int): The estimated size of the result in bits.
+    """
+    if bits > MAX_INTEGER_BITS:
+        raise ValueError(f"Result too large: about {bits} bits (at most {MAX_INTEGER_BITS})")
+
+
+def _safe_pow(base, exponent):
+    """
+    Raise to a power, refusing integer powers too large to compute quickly.
+    
+    Args:
+        base: The base, a number or array.
+        exponent: The exponent, a number or array.
+    
+    Returns:
+        The power.
+    """
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        _check_integer_size(math.ceil(exponent * math.log2(abs(base))))
+    return operator.pow(base, exponent)
+
+
+def _safe_mul(left, right):
+    """
+    Multiply, refusing integer products too large to compute quickly.
+    
+    Args:
+        left: A number or array.
+        right: A number or array.
+    
+    Returns:
+        The product.
+    """
+    if isinstance(left, int) and isinstance(right, int):
+        _check_integer_size(abs(left).bit_length() + abs(right).bit_length())
+    return operator.mul(left, right)
+
+
+class _GuardIntegerGrowth(ast.NodeTransformer):
+    """
+    Rewrite every ** and * of a parsed expression into calls to the size-checked functions.
+    """
+    
+    FUNCTIONS = {ast.Pow: "_pow", ast.Mult: "_mul"}
+    
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        name = self.FUNCTIONS.get(type(node.op))
+        if name is not None:
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                node
+            )
+        return node
 
 
 class CalculatorAPI:
     """
     Tool for performing mathematical calculations.
+    
+    Expressions are restricted to numbers, variables, the arithmetic
+    operators + - * / // % ** and the functions and constants in FUNCTIONS
+    and CONSTANTS. Each distinct expression is parsed and checked once and
+    its compiled form is cached by its text with whitespace collapsed. Functions
+    are NumPy ufuncs, so the same compiled expression evaluates single
+    numbers and, in evaluate_batch(), whole arrays of variable values.
     """
     
+    FUNCTIONS = {
+        "abs": np.abs,
+        "sqrt": np.sqrt,
+        "exp": np.exp,
+        "log": np.log,
+        "log10": np.log10,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "floor": np.floor,
+        "ceil": np.ceil,
+        "round": np.round,
+        "min": np.minimum,
+        "max": np.maximum
+    }
+    
+    # (minimum, maximum) argument counts of the functions that are not ufuncs
+    # of a fixed number of inputs
+    ARGUMENT_COUNTS = {
+        "round": (1, 2),
+        "fv": (2, 5),
+        "pv": (2, 5),
+        "pmt": (3, 5)
+    }
+    
+    CONSTANTS = {
+        "pi": np.pi,
+        "e": np.e
+    }
+    
+    _ALLOWED_NODES = (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call,
+        ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub
+    )
+    
     @staticmethod
-    def calculate(expression):
+    @lru_cache(maxsize=1024)
+    def _compile_expression(normalized):
+        """
+        Parse, check and compile an expression.
+        
+        Args:
+            normalized (str): The expression with its whitespace collapsed.
+        
+        Returns:
+            tuple: (code, variables) with the compiled expression and the
+                sorted names of the variables it needs.
+        
+        Raises:
+            ValueError: If the expression is not valid restricted arithmetic.
+        """
+        try:
+            tree = ast.parse(normalized, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression: {e.msg}") from None
+        
+        # A function name that is not called is a variable, so "pv * (1 + rate)"
+        # can use a variable pv
+        callees = [node.func for node in ast.walk(tree) if isinstance(node, ast.Call)]
+        called = {callee.id for callee in callees if isinstance(callee, ast.Name)}
+        variables = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, CalculatorAPI._ALLOWED_NODES):
+                raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+            if isinstance(node, ast.Constant):
+                if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                    raise ValueError(f"Unsupported constant: {node.value!r}")
+            elif isinstance(node, ast.Call):
+                if (not isinstance(node.func, ast.Name) or node.func.id not in CalculatorAPI.FUNCTIONS
+                        or node.keywords):
+                    raise ValueError("Only calls of the supported functions are allowed")
+                function = CalculatorAPI.FUNCTIONS[node.func.id]
+                if node.func.id in CalculatorAPI.ARGUMENT_COUNTS:
+                    low, high = CalculatorAPI.ARGUMENT_COUNTS[node.func.id]
+                else:
+                    low = high = function.nin
+                if not low <= len(node.args) <= high:
+                    expected = f"{low}" if low == high else f"{low} to {high}"
+                    raise ValueError(
+                        f"{node.func.id}() takes {expected} argument{'' if high == 1 else 's'} "
+                        f"({len(node.args)} given)"
+                    )
+            elif isinstance(node, ast.Name):
+                if node.id.startswith("_"):
+                    raise ValueError(f"Invalid name: {node.id}")
+                if not any(node is callee for callee in callees) and node.id not in CalculatorAPI.CONSTANTS:
+                    variables.add(node.id)
+        
+        conflicts = sorted(variables & called)
+        if conflicts:
+            raise ValueError(f"Names used both as a function and as a variable: {', '.join(conflicts)}")
+        
+        tree = ast.fix_missing_locations(_GuardIntegerGrowth().visit(tree))
+        return compile(tree, "<expression>", "eval"), tuple(sorted(variables))
+    
+    @staticmethod
+    def _evaluate(expression, variables):
+        """
+        Evaluate an expression with the given variable values.
+        
+        Args:
+            expression (str): The expression.
+            variables (dict): Mapping of variable name to number or array.
+        
+        Returns:
+            The result, a number or array.
+        """
+        code, names = CalculatorAPI._compile_expression(" ".join(expression.split()))
+        missing = [name for name in names if name not in variables]
+        if missing:
+            raise ValueError(f"Missing variables: {', '.join(missing)}")
+        
+        namespace = {"__builtins__": {}, "_pow": _safe_pow, "_mul": _safe_mul}
+        namespace.update(CalculatorAPI.FUNCTIONS)
+        namespace.update(CalculatorAPI.CONSTANTS)
+        namespace.update((name, variables[name]) for name in names)
+        return eval(code, namespace)
+    
+    @staticmethod
+    def evaluate(expression, variables=None):
+        """
+        Evaluate an expression to a number.
+        
+        Args:
+            expression (str): The expression, e.g. "principal * (1 + rate) ** years".
+            variables (dict, optional): Mapping of variable name to number. Defaults to None.
+        
+        Returns:
+            int or float: The result.
+        
+        Raises:
+            ValueError: If the expression is invalid or a variable is missing.
+            ArithmeticError: If the calculation fails, e.g. on division by zero.
+        """
+        result = CalculatorAPI._evaluate(expression, variables or {})
+        if isinstance(result, np.ndarray) and result.ndim == 0:
+            result = result[()]
+        if isinstance(result, np.generic):
+            result = result.item()
+        return result
+    
+    @staticmethod
+    def evaluate_batch(expression, bindings):
+        """
+        Evaluate an expression over arrays of variable values in one vectorized call.
+        
+        The values of the variables are broadcast against each other, so
+        scalars and arrays can be mixed.
+        
+        Args:
+            expression (str): The expression.
+            bindings (dict or list): Mapping of variable name to array of values,
+                or a list of variable dictionaries, one per evaluation.
+        
+        Returns:
+            numpy.ndarray: The results, in the broadcast shape of the values.
+        
+        Raises:
+            ValueError: If the expression is invalid, a variable is missing or
+                the values do not broadcast.
+        """
+        if isinstance(bindings, (list, tuple)):
+            names = {name for binding in bindings for name in binding}
+            bindings = {name: [binding[name] for binding in bindings] for name in names}
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, values in bindings.items()}
+        shape = np.broadcast_shapes(*(array.shape for array in arrays.values())) if arrays else ()
+        
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            result = CalculatorAPI._evaluate(expression, arrays)
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), shape).copy()
+    
+    @staticmethod
+    def calculate(expression, variables=None):
         """
         Perform a mathematical calculation.
         
         Args:
             expression (str): The mathematical expression to evaluate.
+            variables (dict, optional): Mapping of variable name to number. Defaults to None.
         
         Returns:
             str: The calculation result.
         """
         try:
-            # Warning: eval can be dangerous in production code
-            # This is just for demonstration purposes
-            result = eval(expression)
+            result = CalculatorAPI.evaluate(expression, variables)
             return f"Calculation result: {expression} = {result}"
         except Exception as e:
             return f"Error calculating {expression}: {str(e)}"
+    
+    # Financial functions. Inputs may be numbers or arrays, which are
+    # broadcast against each other, so thousands of scenarios are computed
+    # in one call; numbers in give a float out. Signs follow the usual
+    # cash-flow convention: money paid out is negative, money received is
+    # positive. when is 0 for payments at the end of each period and 1 for
+    # payments at the beginning.
+    
+    @staticmethod
+    def future_value(rate, nper, pmt=0.0, pv=0.0, when=0):
+        """
+        Compute the value of an investment after a number of periods.
+        
+        Args:
+            rate: Interest rate per period.
+            nper: Number of periods.
+            pmt (optional): Payment per period. Defaults to 0.
+            pv (optional): Present value. Defaults to 0.
+            when (optional): 0 for payments at period end, 1 at period start. Defaults to 0.
+        
+        Returns:
+            float or numpy.ndarray: The future value.
+        """
+        rate, nper, pmt, pv, when = _financial_arrays(rate, nper, pmt, pv, when)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (1 + rate) ** nper
+            fv = -(pv * growth + pmt * (1 + rate * when) / rate * (growth - 1))
+            fv = np.where(rate == 0, -(pv + pmt * nper), fv)
+        return _financial_result(fv)
+    
+    @staticmethod
+    def present_value(rate, nper, pmt=0.0, fv=0.0, when=0):
+        """
+        Compute the present value of a series of payments and a final value.
+        
+        Args:
+            rate: Interest rate per period.
+            nper: Number of periods.
+            pmt (optional): Payment per period. Defaults to 0.
+            fv (optional): Future value. Defaults to 0.
+            when (optional): 0 for payments at period end, 1 at period start. Defaults to 0.
+        
+        Returns:
+            float or numpy.ndarray: The present value.
+        """
+        rate, nper, pmt, fv, when = _financial_arrays(rate, nper, pmt, fv, when)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (1 + rate) ** nper
+            pv = -(fv + pmt * (1 + rate * when) / rate * (growth - 1)) / growth
+            pv = np.where(rate == 0, -(fv + pmt * nper), pv)
+        return _financial_result(pv)
+    
+    @staticmethod
+    def payment(rate, nper, pv, fv=0.0, when=0):
+        """
+        Compute the payment per period that pays off a present value.
+        
+        Args:
+            rate: Interest rate per period.
+            nper: Number of periods.
+            pv: Present value, e.g. the loan amount.
+            fv (optional): Future value left after the last payment. Defaults to 0.
+            when (optional): 0 for payments at period end, 1 at period start. Defaults to 0.
+        
+        Returns:
+            float or numpy.ndarray: The payment per period.
+        """
+        rate, nper, pv, fv, when = _financial_arrays(rate, nper, pv, fv, when)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (1 + rate) ** nper
+            pmt = -(fv + pv * growth) * rate / ((1 + rate * when) * (growth - 1))
+            pmt = np.where(rate == 0, -(fv + pv) / nper, pmt)
+        return _financial_result(pmt)
+    
+    @staticmethod
+    def net_present_value(rate, cashflows):
+        """
+        Compute the net present value of cash flows, the first one at time 0.
+        
+        Args:
+            rate: Discount rate per period, a number or an array of rates.
+            cashflows: The cash flows, one row per scenario for several scenarios.
+                Rows are paired with the rates after broadcasting.
+        
+        Returns:
+            float or numpy.ndarray: The net present value per scenario.
+        """
+        rate = np.asarray(rate, dtype=np.float64)
+        cashflows = np.asarray(cashflows, dtype=np.float64)
+        periods = np.arange(cashflows.shape[-1])
+        discount = (1 + rate[..., np.newaxis]) ** periods
+        return _financial_result((cashflows / discount).sum(axis=-1))
+    
+    @staticmethod
+    def internal_rate_of_return(cashflows, guess=0.1, tolerance=1e-12, max_iterations=100):
+        """
+        Compute the rate at which the net present value of cash flows is zero.
+        
+        All scenarios are solved together by Newton's method; a scenario whose
+        iteration does not converge gets NaN.
+        
+        Args:
+            cashflows: The cash flows, the first one at time 0, one row per scenario.
+            guess (float, optional): Starting rate. Defaults to 0.1.
+            tolerance (float, optional): Convergence threshold on the rate step. Defaults to 1e-12.
+            max_iterations (int, optional): Maximum Newton steps. Defaults to 100.
+        
+        Returns:
+            float or numpy.ndarray: The internal rate of return per scenario.
+        """
+        cashflows = np.asarray(cashflows, dtype=np.float64)
+        periods = np.arange(cashflows.shape[-1])
+        rate = np.full(cashflows.shape[:-1], guess, dtype=np.float64)
+        active = np.ones(rate.shape, dtype=bool)
+        
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for _ in range(max_iterations):
+                discount = (1 + rate[..., np.newaxis]) ** -periods
+                npv = (cashflows * discount).sum(axis=-1)
+                slope = (-periods * cashflows * discount / (1 + rate[..., np.newaxis])).sum(axis=-1)
+                step = np.where(active, npv / slope, 0.0)
+                rate = rate - step
+                active &= ~(np.abs(step) < tolerance)
+                if not active.any():
+                    break
+        
+        rate = np.where(active | ~np.isfinite(rate) | (rate <= -1), np.nan, rate)
+        return _financial_result(rate)
+    
+    @staticmethod
+    def amortization_schedule(rate, nper, pv):
+        """
+        Compute the period-by-period schedule of a loan repaid in equal payments.
+        
+        Args:
+            rate: Interest rate per period, a number or an array of rates.
+            nper (int): Number of periods, shared by all loans.
+            pv: Loan amount, a number or an array broadcast with rate.
+        
+        Returns:
+            dict: Arrays with a last axis of length nper: "period" (1 to nper),
+                "payment", "interest" and "principal" paid in each period, and the
+                "balance" left after it.
+        """
+        rate = np.asarray(rate, dtype=np.float64)[..., np.newaxis]
+        pv = np.asarray(pv, dtype=np.float64)[..., np.newaxis]
+        periods = np.arange(nper + 1)
+        payment = -np.asarray(CalculatorAPI.payment(rate, nper, pv))
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (1 + rate) ** periods
+            balance = pv * growth - payment * (growth - 1) / rate
+            balance = np.where(rate == 0, pv - payment * periods, balance)
+        interest = balance[..., :-1] * rate
+        payment = np.broadcast_to(payment, interest.shape)
+        return {
+            "period": periods[1:],
+            "payment": payment.copy(),
+            "interest": interest,
+            "principal": payment - interest,
+            "balance": balance[..., 1:]
+        }
+
+
+# The financial functions with scalar arguments can also be used in expressions
+CalculatorAPI.FUNCTIONS.update({
+    "fv": CalculatorAPI.future_value,
+    "pv": CalculatorAPI.present_value,
+    "pmt": CalculatorAPI.payment
+})
+
+
+def _financial_arrays(*values):
+    """
+    Convert the arguments of a financial function to float arrays.
+    
+    Args:
+        *values: Numbers or arrays.
+    
+    Returns:
+        list: The float64 arrays.
+    """
+    return [np.asarray(value, dtype=np.float64) for value in values]
+
+
+def _financial_result(result):
+    """
+    Return a financial result as a float when it is a single value.
+    
+    Args:
+        result (numpy.ndarray): The result.
+    
+    Returns:
+        float or numpy.ndarray: The result.
+    """
+    result = np.asarray(result)
+    return float(result) if result.ndim == 0 else result
 
 
 class TranslateAPI:
     """
     Tool for translating text from one language to another.
+    
+    Text is translated offline with the phrase tables of the language pair
+    (see agent.tools.phrase_table), from TRANSLATION_DATA_DIR or the
+    bundled tables.
     """
     
     @staticmethod
@@ -126,5 +695,24 @@ class TranslateAPI:
         Returns:
             str: The translated text.
         """
-        # In a real implementation, this would call an actual translation API
-        return f"Translation of '{text}' from {source_lang} to {target_lang}: [translated text would appear here]"
+        return TranslateAPI.translate_many([text], source_lang, target_lang)[0]
+    
+    @staticmethod
+    def translate_many(texts, source_lang, target_lang):
+        """
+        Translate a batch of texts from one language to another.
+        
+        Args:
+            texts (list): The texts to translate.
+            source_lang (str): The source language code.
+            target_lang (str): The target language code.
+        
+        Returns:
+            list: The translated text of each text, in order.
+        """
+        translations = get_translator().translate_many(texts, source_lang, target_lang)
+        if translations is None:
+            return [f"Translation of '{text}' from {source_lang} to {target_lang}: Language pair not available"
+                    for text in texts]
+        return [f"Translation of '{text}' from {source_lang} to {target_lang}: {translation}"
+                for text, translation in zip(texts, translations)]
@@ -72,6 +72,82 @@ class ToolJudge:
             'resources': 0.8,
             'project management': 0.85
         }
+        self.compile()
+    
+    def compile(self):
+        """
+        Compile the keywords into a single matcher.
+        
+        The keywords are merged into a trie, written out as one regular
+        expression that matches the longest keyword starting at a position.
+        Scanning resumes one character after the start of each match, so
+        keywords overlapping others are still found. Each keyword's score is raised to the best score of
+        the keywords that are its prefixes, since those match wherever it
+        does. The matcher has to be compiled again whenever tool_keywords changes.
+        
+        Returns:
+            dict: The compiled state, with the "pattern" source and the keyword "scores".
+        """
+        scores = {}
+        for keyword, keyword_score in self.tool_keywords.items():
+            keyword = keyword.lower()
+            if keyword:
+                scores[keyword] = max(keyword_score, scores.get(keyword, 0.0))
+        
+        trie = {}
+        for keyword in scores:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+        
+        # A keyword's prefixes match wherever it does
+        for keyword in scores:
+            for end in range(1, len(keyword)):
+                prefix_score = scores.get(keyword[:end])
+                if prefix_score is not None and prefix_score > scores[keyword]:
+                    scores[keyword] = prefix_score
+        
+        state = {"pattern": None, "scores": scores}
+        if scores:
+            state["pattern"] = self._trie_pattern(trie)
+        self.load_compiled(state)
+        return state
+    
+    @staticmethod
+    def _trie_pattern(node):
+        """
+        Write a keyword trie as a regular expression preferring the longest match.
+        
+        Args:
+            node (dict): The trie node, mapping characters to child nodes and ""
+                to True where a keyword ends.
+        
+        Returns:
+            str: The pattern source.
+        """
+        branches = [
+            re.escape(char) + ToolJudge._trie_pattern(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword ends here; try its extensions first
+            pattern = ("(?:" + pattern + ")" if len(branches) == 1 else pattern) + "?"
+        return pattern
+    
+    def load_compiled(self, state):
+        """
+        Use a matcher compiled earlier, e.g. restored from a snapshot.
+        
+        Args:
+            state (dict): The state returned by compile().
+        """
+        self._keyword_scores = dict(state["scores"])
+        self._max_keyword_score = max(self._keyword_scores.values(), default=0.0)
+        self._matcher = re.compile(state["pattern"]) if state["pattern"] else None
     
     def check_tool_needed(self, hidden_state):
         """
@@ -109,10 +185,16 @@ class ToolJudge:
         content = hidden_state.lower()
         max_score = 0.0
         
-        # Check for keywords
-        for keyword, keyword_score in self.tool_keywords.items():
-            if keyword.lower() in content:
-                max_score = max(max_score, keyword_score)
+        # Check for keywords in one pass, stopping at the best possible score
+        position = 0
+        while self._matcher is not None:
+            match = self._matcher.search(content, position)
+            if match is None:
+                break
+            max_score = max(max_score, self._keyword_scores[match.group()])
+            if max_score >= self._max_keyword_score:
+                break
+            position = match.start() + 1
         
         # Add some randomness for demonstration
         randomness = np.random.uniform(-0.1, 0.1)
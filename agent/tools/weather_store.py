@@ -0,0 +1,323 @@
+# Offline Weather Store
+
+import csv
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from agent.tools.gazetteer import normalize_name
+
+
+STATS = ("mean", "min", "max", "sum", "count")
+
+
+def to_epoch_seconds(value):
+    """
+    Convert a time to seconds since the Unix epoch.
+    
+    Args:
+        value: A datetime (naive times are UTC), a "YYYY-MM-DD[ HH:MM[:SS]]" string
+            or a number of seconds.
+    
+    Returns:
+        int: The seconds since the epoch.
+    """
+    if isinstance(value, (int, float, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class WeatherStore:
+    """
+    Class for querying offline weather time series.
+    
+    A store is a directory holding manifest.json, which lists the stations
+    and the variables, and one NumPy array per column: times.npy with the
+    UTC epoch seconds of every observation, grouped by station and sorted
+    within each station, offsets.npy with the first row of each station
+    (plus the total row count), and <variable>.npy with the values. The
+    columns are memory-mapped, so opening a store reads no observations,
+    and a date range is located within its station by binary search.
+    Aggregates over many (station, range) pairs are computed together
+    with reduceat over the column arrays.
+    """
+    
+    def __init__(self, data_dir):
+        """
+        Open a store.
+        
+        Args:
+            data_dir (str): The store directory.
+        """
+        self.data_dir = data_dir
+        with open(os.path.join(data_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.stations = manifest["stations"]
+        self.units = manifest.get("variables", {})
+        
+        self.times = np.load(os.path.join(data_dir, "times.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(data_dir, "offsets.npy"))
+        self._columns = {}
+        
+        # Station lookup by normalized name, alias or ID
+        self._index = {}
+        for position, station in enumerate(self.stations):
+            for key in [station["id"], station["name"], *station.get("aliases", [])]:
+                self._index.setdefault(normalize_name(key), position)
+    
+    @property
+    def variables(self):
+        """
+        list: The names of the stored variables.
+        """
+        return list(self.units)
+    
+    def column(self, variable):
+        """
+        Get the memory-mapped values of a variable.
+        
+        Args:
+            variable (str): The variable, e.g. "temperature".
+        
+        Returns:
+            numpy.ndarray: The values of all stations, aligned with times.
+        """
+        values = self._columns.get(variable)
+        if values is None:
+            if variable not in self.units:
+                raise KeyError(f"Unknown weather variable: {variable}")
+            values = np.load(os.path.join(self.data_dir, f"{variable}.npy"), mmap_mode="r")
+            self._columns[variable] = values
+        return values
+    
+    def find_station(self, location):
+        """
+        Find the station of a location.
+        
+        Args:
+            location (str): A station ID, name or alias.
+        
+        Returns:
+            int: The station position, or None if there is no such station.
+        """
+        return self._index.get(normalize_name(location))
+    
+    def row_range(self, station, start, end):
+        """
+        Locate the observations of a station within a time range by binary search.
+        
+        Args:
+            station (int): The station position.
+            start: Start of the range, inclusive (see to_epoch_seconds()).
+            end: End of the range, exclusive.
+        
+        Returns:
+            tuple: (first, stop) rows of the range in the column arrays; a range
+                ending before it starts is empty.
+        """
+        offset = int(self.offsets[station])
+        times = self.times[offset:int(self.offsets[station + 1])]
+        first = offset + int(np.searchsorted(times, to_epoch_seconds(start), side="left"))
+        stop = offset + int(np.searchsorted(times, to_epoch_seconds(end), side="left"))
+        return first, max(first, stop)
+    
+    def series(self, location, start, end, variables=None):
+        """
+        Get the observations of a location within a time range.
+        
+        Args:
+            location (str): A station ID, name or alias.
+            start: Start of the range, inclusive.
+            end: End of the range, exclusive.
+            variables (list, optional): The variables to return. Defaults to None (all).
+        
+        Returns:
+            dict: "time" and one entry per variable, as array views, or None if
+                the location has no station.
+        """
+        station = self.find_station(location)
+        if station is None:
+            return None
+        first, stop = self.row_range(station, start, end)
+        series = {"time": self.times[first:stop]}
+        for variable in variables or self.variables:
+            series[variable] = self.column(variable)[first:stop]
+        return series
+    
+    def aggregate(self, locations, start, end, variables=None, stats=("mean", "min", "max")):
+        """
+        Aggregate variables over a time range for several locations at once.
+        
+        Args:
+            locations (list): Station IDs, names or aliases.
+            start: Start of the range, inclusive; one value or one per location.
+            end: End of the range, exclusive; one value or one per location.
+            variables (list, optional): The variables to aggregate. Defaults to None (all).
+            stats (tuple, optional): Any of "mean", "min", "max", "sum" and "count".
+                Defaults to ("mean", "min", "max").
+        
+        Returns:
+            dict: Mapping of variable to a mapping of statistic to an array with
+                one value per location. Locations without a station or without
+                observations in the range get NaN and a count of 0; missing
+                values within a range make its statistics NaN.
+        """
+        unknown = [stat for stat in stats if stat not in STATS]
+        if unknown:
+            raise ValueError(f"Unknown statistics: {', '.join(unknown)}")
+        
+        count = len(locations)
+        starts = np.broadcast_to(np.asarray(
+            [to_epoch_seconds(value) for value in start] if isinstance(start, (list, tuple)) else to_epoch_seconds(start)
+        ), (count,))
+        ends = np.broadcast_to(np.asarray(
+            [to_epoch_seconds(value) for value in end] if isinstance(end, (list, tuple)) else to_epoch_seconds(end)
+        ), (count,))
+        
+        firsts = np.zeros(count, dtype=np.int64)
+        stops = np.zeros(count, dtype=np.int64)
+        for i, location in enumerate(locations):
+            station = self.find_station(location)
+            if station is not None:
+                firsts[i], stops[i] = self.row_range(station, int(starts[i]), int(ends[i]))
+        sizes = stops - firsts
+        nonempty = sizes > 0
+        
+        # When the ranges cover most of the rows between the first and the
+        # last of them, reduceat over their interleaved (first, stop)
+        # boundaries reduces them all in one pass, the slots between ranges
+        # being discarded. Its cost grows with that span, so sparse ranges
+        # (e.g. one day at several stations) are reduced one by one. A stop
+        # at the end of the span is not a valid boundary, so ranges ending
+        # there are always reduced on their own. Values are accumulated in
+        # double precision.
+        ranges = np.flatnonzero(nonempty)
+        ranges = ranges[np.argsort(firsts[ranges], kind="stable")]
+        batched = ranges[:0]
+        if len(ranges) > 1:
+            low, high = firsts[ranges].min(), stops[ranges].max()
+            if 2 * sizes[ranges].sum() >= high - low:
+                batched = ranges[stops[ranges] < high]
+                bounds = np.stack([firsts[batched], stops[batched]], axis=1).ravel() - low
+        single = np.setdiff1d(ranges, batched, assume_unique=True)
+        
+        reductions = [("sum", np.add), ("min", np.minimum), ("max", np.maximum)]
+        needed = [(stat, ufunc) for stat, ufunc in reductions
+                  if stat in stats or (stat == "sum" and "mean" in stats)]
+        
+        results = {}
+        for variable in variables or self.variables:
+            values = self.column(variable)
+            reduced = {}
+            for stat, ufunc in needed:
+                reduced[stat] = np.full(count, np.nan)
+                if len(batched):
+                    reduced[stat][batched] = ufunc.reduceat(values[low:high], bounds, dtype=np.float64)[::2]
+                for i in single:
+                    reduced[stat][i] = ufunc.reduce(values[firsts[i]:stops[i]], dtype=np.float64)
+            
+            result = {}
+            for stat in stats:
+                if stat == "count":
+                    result[stat] = sizes.copy()
+                elif stat == "mean":
+                    result[stat] = reduced["sum"] / np.maximum(sizes, 1)
+                else:
+                    result[stat] = reduced[stat]
+            results[variable] = result
+        return results
+    
+    @staticmethod
+    def write(data_dir, stations, series, units):
+        """
+        Write a store.
+        
+        Args:
+            data_dir (str): The store directory, created if needed.
+            stations (list): Station dictionaries with "id", "name" and optional
+                "aliases", "latitude" and "longitude".
+            series (dict): Mapping of station ID to a dict with a "time" array of
+                epoch seconds and one array per variable.
+            units (dict): Mapping of variable to its unit, e.g. {"temperature": "°C"}.
+        """
+        os.makedirs(data_dir, exist_ok=True)
+        times = []
+        columns = {variable: [] for variable in units}
+        offsets = [0]
+        for station in stations:
+            data = series.get(station["id"], {})
+            station_times = np.asarray(data.get("time", []), dtype=np.int64)
+            order = np.argsort(station_times, kind="stable")
+            times.append(station_times[order])
+            for variable in units:
+                values = np.asarray(data.get(variable, np.full(len(station_times), np.nan)), dtype=np.float32)
+                columns[variable].append(values[order])
+            offsets.append(offsets[-1] + len(station_times))
+        
+        np.save(os.path.join(data_dir, "times.npy"),
+                np.concatenate(times) if times else np.empty(0, dtype=np.int64))
+        np.save(os.path.join(data_dir, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+        for variable, parts in columns.items():
+            np.save(os.path.join(data_dir, f"{variable}.npy"),
+                    np.concatenate(parts) if parts else np.empty(0, dtype=np.float32))
+        with open(os.path.join(data_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"stations": stations, "variables": units}, f, indent=2)
+    
+    @staticmethod
+    def import_csv(csv_path, data_dir, units=None):
+        """
+        Convert a CSV of observations into a store.
+        
+        The CSV has a "station" column with the station name, a "time"
+        column ("YYYY-MM-DD HH:MM" in UTC, or epoch seconds) and one column
+        per variable.
+        
+        Args:
+            csv_path (str): The CSV file.
+            data_dir (str): The store directory.
+            units (dict, optional): Mapping of variable to unit. Defaults to None
+                (every other column, without a unit).
+        """
+        series = {}
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            if units is None:
+                units = {name: "" for name in reader.fieldnames if name not in ("station", "time")}
+            for row in reader:
+                data = series.setdefault(row["station"], {"time": [], **{variable: [] for variable in units}})
+                time_value = row["time"]
+                data["time"].append(int(time_value) if time_value.isdigit() else to_epoch_seconds(time_value))
+                for variable in units:
+                    value = row.get(variable)
+                    data[variable].append(float(value) if value not in (None, "") else np.nan)
+        stations = [{"id": name, "name": name} for name in series]
+        WeatherStore.write(data_dir, stations, series, units)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_weather_store():
+    """
+    Get the shared weather store, opening it on first use.
+    
+    Returns:
+        WeatherStore: The store in WEATHER_DATA_DIR, or None if it is not configured.
+    """
+    global _store
+    data_dir = os.getenv("WEATHER_DATA_DIR")
+    if not data_dir:
+        return None
+    if _store is None or _store.data_dir != data_dir:
+        with _store_lock:
+            if _store is None or _store.data_dir != data_dir:
+                _store = WeatherStore(data_dir)
+    return _store
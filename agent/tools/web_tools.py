@@ -2,12 +2,21 @@
 
 from urllib.parse import quote_plus
 import json
+import re
 from datetime import datetime
 
+from agent.tools.http_fetcher import get_fetcher
+from agent.tools.news_index import get_news_index
+from agent.tools.search_index import get_search_index, html_to_text
+
 
 class WebSearch:
     """
     Tool for searching the web for information.
+    
+    When SEARCH_INDEX_DIR points to a search index (see
+    agent.tools.search_index), results are ranked from its documents;
+    otherwise simulated results are returned.
     """
     
     @staticmethod
@@ -22,9 +31,36 @@ class WebSearch:
         Returns:
             str: The search results.
         """
-        # In a real implementation, this would call an actual web search API
-        # For demonstration, we'll return simulated results
-        results = [
+        index = get_search_index()
+        if index is not None:
+            results = index.search(query, num_results)
+            if not results:
+                return f"Search results for '{query}':\n\nNo results found.\n"
+        else:
+            results = WebSearch._simulated_results(query)
+        
+        # Limit the number of results
+        results = results[:min(num_results, len(results))]
+        
+        # Format the results as a string
+        formatted_results = f"Search results for '{query}':\n"
+        for i, result in enumerate(results, 1):
+            formatted_results += f"\n{i}. {result['title']}\n   URL: {result['url']}\n   {result['snippet']}\n"
+        
+        return formatted_results
+    
+    @staticmethod
+    def _simulated_results(query):
+        """
+        Make up results for a query when no search index is configured.
+        
+        Args:
+            query (str): The search query.
+        
+        Returns:
+            list: The simulated results.
+        """
+        return [
             {
                 "title": f"Result 1 for {query}",
                 "url": f"https://example.com/search?q={quote_plus(query)}&id=1",
@@ -41,21 +77,15 @@ class WebSearch:
                 "snippet": f"This is the third result for {query}. It provides a different perspective on the topic."
             }
         ]
-        
-        # Limit the number of results
-        results = results[:min(num_results, len(results))]
-        
-        # Format the results as a string
-        formatted_results = f"Search results for '{query}':\n"
-        for i, result in enumerate(results, 1):
-            formatted_results += f"\n{i}. {result['title']}\n   URL: {result['url']}\n   {result['snippet']}\n"
-        
-        return formatted_results
 
 
 class NewsSearch:
     """
     Tool for searching news articles.
+    
+    When NEWS_INDEX_DIR points to a news index (see agent.tools.news_index),
+    articles published within the date range are ranked by relevance and
+    recency; otherwise simulated results are returned.
     """
     
     @staticmethod
@@ -72,9 +102,6 @@ class NewsSearch:
         Returns:
             str: The news search results.
         """
-        # In a real implementation, this would call an actual news search API
-        # For demonstration, we'll return simulated results
-        
         # Format date filters for display
         date_filter = ""
         if start_date and end_date:
@@ -84,7 +111,39 @@ class NewsSearch:
         elif end_date:
             date_filter = f" until {end_date}"
         
-        results = [
+        index = get_news_index()
+        if index is not None:
+            try:
+                results = index.search(query, start_date, end_date, num_results)
+            except ValueError:
+                return f"News search results for '{query}'{date_filter}:\n\nInvalid date, expected YYYY-MM-DD.\n"
+            if not results:
+                return f"News search results for '{query}'{date_filter}:\n\nNo results found.\n"
+        else:
+            results = NewsSearch._simulated_results(query)
+        
+        # Limit the number of results
+        results = results[:min(num_results, len(results))]
+        
+        # Format the results as a string
+        formatted_results = f"News search results for '{query}'{date_filter}:\n"
+        for i, result in enumerate(results, 1):
+            formatted_results += f"\n{i}. {result['title']} ({result['date']})\n   URL: {result['url']}\n   {result['snippet']}\n"
+        
+        return formatted_results
+    
+    @staticmethod
+    def _simulated_results(query):
+        """
+        Make up articles for a query when no news index is configured.
+        
+        Args:
+            query (str): The search query.
+        
+        Returns:
+            list: The simulated articles.
+        """
+        return [
             {
                 "title": f"News 1 about {query}",
                 "url": f"https://news-example.com/article?q={quote_plus(query)}&id=1",
@@ -104,21 +163,15 @@ class NewsSearch:
                 "date": "2025-03-15"
             }
         ]
-        
-        # Limit the number of results
-        results = results[:min(num_results, len(results))]
-        
-        # Format the results as a string
-        formatted_results = f"News search results for '{query}'{date_filter}:\n"
-        for i, result in enumerate(results, 1):
-            formatted_results += f"\n{i}. {result['title']} ({result['date']})\n   URL: {result['url']}\n   {result['snippet']}\n"
-        
-        return formatted_results
 
 
 class WebContentFetcher:
     """
     Tool for fetching content from a URL.
+    
+    When WEB_FETCH_ENABLED is set, pages are fetched over HTTP by the shared
+    fetcher (see agent.tools.http_fetcher), which pools connections per host
+    and can cache responses on disk; otherwise simulated content is returned.
     """
     
     @staticmethod
@@ -132,7 +185,66 @@ class WebContentFetcher:
         Returns:
             str: The fetched content.
         """
-        # In a real implementation, this would use a web scraping library
+        return WebContentFetcher.fetch_many([url])[0]
+    
+    @staticmethod
+    def fetch_many(urls):
+        """
+        Fetch content from several URLs concurrently.
+        
+        Args:
+            urls (list): The URLs to fetch content from.
+        
+        Returns:
+            list: The fetched content of each URL, in order.
+        """
+        fetcher = get_fetcher()
+        if fetcher is None:
+            return [WebContentFetcher._simulated_content(url) for url in urls]
+        return [WebContentFetcher._format_result(url, result) for url, result in zip(urls, fetcher.fetch_many(urls))]
+    
+    @staticmethod
+    def _format_result(url, result):
+        """
+        Format a fetch result as text.
+        
+        Args:
+            url (str): The requested URL.
+            result (dict): The result of HTTPFetcher.fetch().
+        
+        Returns:
+            str: The page text, or a message explaining why it is not available.
+        """
+        if result["error"]:
+            return f"Unable to fetch content from {url}. {result['error']}"
+        if result["status"] != 200:
+            return f"Unable to fetch content from {url}. The server responded with status {result['status']}."
+        
+        content_type = result["headers"].get("content-type", "")
+        charset = re.search(r"charset=[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+        try:
+            text = result["body"].decode(charset.group(1) if charset else "utf-8", errors="replace")
+        except LookupError:
+            text = result["body"].decode("utf-8", errors="replace")
+        if "html" in content_type.lower() or (not content_type and "<html" in text[:1000].lower()):
+            title, text = html_to_text(text)
+            text = f"{title}\n\n{text}" if title else text
+        text = re.sub(r"[ \t\r\f\v]*\n\s*", "\n", re.sub(r"[ \t\r\f\v]+", " ", text)).strip()
+        if result["truncated"]:
+            text += "\n\n[Content truncated]"
+        return f"Content from {result['url']}:\n\n{text}"
+    
+    @staticmethod
+    def _simulated_content(url):
+        """
+        Generate simulated content for a URL.
+        
+        Args:
+            url (str): The URL.
+        
+        Returns:
+            str: The simulated content.
+        """
         # For demonstration, we'll return simulated content based on the URL
         
         if "example.com" in url:
@@ -0,0 +1,288 @@
+# Span-Based Tracing for the Agent
+
+import atexit
+import itertools
+import json
+import threading
+import time
+
+
+class Span:
+    """
+    A timed, named unit of work with attributes and an optional parent span.
+    """
+    
+    __slots__ = ("tracer", "name", "attributes", "trace_id", "span_id", "parent_id",
+                 "start_time", "_start", "duration")
+    
+    def __init__(self, tracer, name, attributes):
+        """
+        Initialize the span. Timing starts when the span is entered.
+        
+        Args:
+            tracer (Tracer): The tracer that created the span.
+            name (str): The name of the span.
+            attributes (dict): Initial attributes of the span.
+        """
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = None
+        self.span_id = None
+        self.parent_id = None
+        self.start_time = None
+        self._start = None
+        self.duration = None
+    
+    def set_attribute(self, key, value):
+        """
+        Set an attribute on the span.
+        
+        Args:
+            key (str): The attribute name.
+            value: The attribute value.
+        """
+        self.attributes[key] = value
+    
+    def __enter__(self):
+        self.tracer._start_span(self)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc_value}"
+        self.tracer._end_span(self)
+        return False
+    
+    def to_dict(self):
+        """
+        Convert the finished span to a dictionary.
+        
+        Returns:
+            dict: The span data.
+        """
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration * 1000.0,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """
+    Span returned while tracing is disabled. Every operation does nothing.
+    """
+    
+    __slots__ = ()
+    
+    def set_attribute(self, key, value):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemoryCollector:
+    """
+    Span exporter that keeps finished spans in memory, for tests and load runs.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty collector.
+        """
+        self.spans = []
+        self._lock = threading.Lock()
+    
+    def export(self, span):
+        """
+        Store a finished span.
+        
+        Args:
+            span (Span): The finished span.
+        """
+        record = span.to_dict()
+        with self._lock:
+            self.spans.append(record)
+    
+    def get_spans(self, name=None):
+        """
+        Get the collected spans.
+        
+        Args:
+            name (str, optional): Only return spans with this name. Defaults to None.
+        
+        Returns:
+            list: The span dictionaries, in the order they finished.
+        """
+        with self._lock:
+            if name is None:
+                return list(self.spans)
+            return [span for span in self.spans if span["name"] == name]
+    
+    def clear(self):
+        """
+        Remove all collected spans.
+        """
+        with self._lock:
+            self.spans = []
+    
+    def close(self):
+        pass
+
+
+class JsonlExporter:
+    """
+    Span exporter that appends one JSON line per finished span to a file.
+    """
+    
+    def __init__(self, path):
+        """
+        Open the trace file for appending.
+        
+        Args:
+            path (str): Path to the JSONL trace file.
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def export(self, span):
+        """
+        Write a finished span to the trace file.
+        
+        Args:
+            span (Span): The finished span.
+        """
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+    
+    def close(self):
+        """
+        Flush and close the trace file.
+        """
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Creates spans, tracks their nesting per thread and hands finished spans
+    to an exporter.
+    """
+    
+    def __init__(self, exporter):
+        """
+        Initialize the tracer.
+        
+        Args:
+            exporter: Object with an export(span) method, e.g. JsonlExporter or InMemoryCollector.
+        """
+        self.exporter = exporter
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+    
+    def span(self, name, **attributes):
+        """
+        Create a span to be used as a context manager.
+        
+        Args:
+            name (str): The name of the span.
+            **attributes: Initial attributes of the span.
+        
+        Returns:
+            Span: The new span.
+        """
+        return Span(self, name, attributes)
+    
+    def current_span(self):
+        """
+        Get the innermost open span on the current thread.
+        
+        Returns:
+            Span: The current span, or None if there is none.
+        """
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+    
+    def _start_span(self, span):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span.span_id = next(self._ids)
+        if stack:
+            span.parent_id = stack[-1].span_id
+            span.trace_id = stack[-1].trace_id
+        else:
+            span.trace_id = span.span_id
+        stack.append(span)
+        span.start_time = time.time()
+        span._start = time.perf_counter()
+    
+    def _end_span(self, span):
+        span.duration = time.perf_counter() - span._start
+        stack = self._local.stack
+        if span in stack:
+            # Also drop children that were never closed, e.g. abandoned generators
+            del stack[stack.index(span):]
+        self.exporter.export(span)
+
+
+_tracer = None
+
+
+def configure_tracing(exporter=None):
+    """
+    Enable tracing with the given exporter, or disable it.
+    
+    Args:
+        exporter (optional): The span exporter. None disables tracing. Defaults to None.
+    
+    Returns:
+        Tracer: The active tracer, or None if tracing is disabled.
+    """
+    global _tracer
+    _tracer = Tracer(exporter) if exporter is not None else None
+    return _tracer
+
+
+def get_tracer():
+    """
+    Get the active tracer.
+    
+    Returns:
+        Tracer: The active tracer, or None if tracing is disabled.
+    """
+    return _tracer
+
+
+def span(name, **attributes):
+    """
+    Create a span on the active tracer.
+    
+    When tracing is disabled this returns a shared no-op span, so the cost
+    of an instrumented call site is a single function call.
+    
+    Args:
+        name (str): The name of the span.
+        **attributes: Initial attributes of the span.
+    
+    Returns:
+        Span: The new span, or a no-op span if tracing is disabled.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return Span(_tracer, name, attributes)
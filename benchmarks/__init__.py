@@ -0,0 +1,2 @@
+# __init__.py for the benchmarks package
+# This file makes the directory a Python package
@@ -0,0 +1,130 @@
+# End-to-End Agent Benchmarks
+
+import os
+import tempfile
+
+import numpy as np
+
+from agent.event_sink import NullSink
+from agent.interface import UserInterface
+from benchmarks.harness import make_result, measure
+
+
+QUERIES = [
+    "What's the weather like in New York today?",
+    "What is the capital of France?",
+    "Calculate 125 * 37 / 5",
+    "Translate 'hello' to French",
+    "I have a project file called 'new_product_launch.mpp'. Can you extract the key tasks?",
+]
+
+
+def create_agent(db_path):
+    """
+    Create a headless agent with simulated latency disabled.
+    
+    Args:
+        db_path (str): Path to the SQLite database used by the agent.
+    
+    Returns:
+        CoToolsAgent: The initialized agent.
+    """
+    from agent.main import CoToolsAgent
+    
+    # The agent reads its database path from the environment when created
+    database_path = os.environ.get("DATABASE_PATH")
+    os.environ["DATABASE_PATH"] = db_path
+    try:
+        agent = CoToolsAgent(interface=UserInterface(sinks=[NullSink()]))
+    finally:
+        if database_path is None:
+            os.environ.pop("DATABASE_PATH", None)
+        else:
+            os.environ["DATABASE_PATH"] = database_path
+    agent.simulate_latency = False
+    if not agent.initialize():
+        raise RuntimeError("Failed to initialize the agent.")
+    return agent
+
+
+def run(queries=QUERIES, min_time=1.0):
+    """
+    Benchmark headless end-to-end query processing.
+    
+    Args:
+        queries (list, optional): Queries processed round-robin.
+        min_time (float, optional): Minimum measured time. Defaults to 1.0.
+    
+    Returns:
+        list: The result records, with throughput in queries per second.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        agent = create_agent(os.path.join(tmp_dir, "bench.db"))
+        state = {"i": 0}
+        
+        def one_query():
+            agent.process_query(queries[state["i"] % len(queries)])
+            state["i"] += 1
+        
+        stats = measure(one_query, min_time=min_time)
+        agent.db.disconnect()
+        agent.tool_db.db.disconnect()
+    
+    result = make_result("e2e.process_query", {"mode": "headless"}, stats)
+    print(f"  process_query headless: {result['items_per_s']:.1f} queries/s")
+    return [result] + run_startup(min_time=min_time)
+
+
+def run_startup(tool_count=5000, embedding_dim=768, min_time=1.0):
+    """
+    Benchmark the time from creating an agent to answering its first query.
+    
+    A cold start loads and decodes the tool catalog from the database; a
+    warm start restores it from the agent's snapshot.
+    
+    Args:
+        tool_count (int, optional): Number of tools in the catalog. Defaults to 5000.
+        embedding_dim (int, optional): Dimension of the tool vectors. Defaults to 768.
+        min_time (float, optional): Minimum measured time per case. Defaults to 1.0.
+    
+    Returns:
+        list: The result records, one per start mode.
+    """
+    from agent.database import AgentDatabase
+    
+    results = []
+    snapshot_enabled = os.environ.get("SNAPSHOT_ENABLED")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        db = AgentDatabase(db_path)
+        db.initialize_database()
+        vectors = np.random.randn(tool_count, embedding_dim).astype(np.float32)
+        db.add_tools([
+            (f"Tool{i}", f"Synthetic tool number {i}.", vectors[i].tolist(), "synthetic")
+            for i in range(tool_count)
+        ])
+        
+        try:
+            for mode in ("cold", "warm"):
+                os.environ["SNAPSHOT_ENABLED"] = "True" if mode == "warm" else "False"
+                
+                def start_and_query():
+                    agent = create_agent(db_path)
+                    agent.process_query(QUERIES[1])
+                    agent.db.disconnect()
+                
+                # The warmup call saves the snapshot the warm starts restore
+                stats = measure(start_and_query, min_time=min_time, max_iterations=20)
+                results.append(make_result(
+                    "e2e.start_to_first_query",
+                    {"mode": mode, "tools": tool_count},
+                    stats,
+                ))
+                print(f"  start to first query ({mode}, {tool_count} tools): {stats['median_s'] * 1e3:.1f} ms")
+        finally:
+            if snapshot_enabled is None:
+                os.environ.pop("SNAPSHOT_ENABLED", None)
+            else:
+                os.environ["SNAPSHOT_ENABLED"] = snapshot_enabled
+            db.disconnect()
+    return results
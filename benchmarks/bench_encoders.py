@@ -0,0 +1,33 @@
+# Encoder Benchmarks
+
+from agent.tools.query_encoder import QueryEncoder
+from agent.tools.tool_encoder import ToolEncoder
+from benchmarks.harness import make_result, measure
+
+
+def run(batch_sizes=(1, 32, 256, 1024), dims=(64, 768), min_time=0.2):
+    """
+    Benchmark batch_encode throughput of the query and tool encoders.
+    
+    Args:
+        batch_sizes (tuple, optional): Number of texts per batch.
+        dims (tuple, optional): Embedding dimensions.
+        min_time (float, optional): Minimum measured time per case. Defaults to 0.2.
+    
+    Returns:
+        list: The result records, with throughput in texts per second.
+    """
+    results = []
+    for encoder_class in (QueryEncoder, ToolEncoder):
+        name = f"encoder.{encoder_class.__name__}.batch_encode"
+        for dim in dims:
+            encoder = encoder_class(embedding_dim=dim)
+            for batch_size in batch_sizes:
+                texts = [f"Describe the tool number {i} in a sentence." for i in range(batch_size)]
+                stats = measure(lambda: encoder.batch_encode(texts), min_time=min_time)
+                result = make_result(name, {"batch_size": batch_size, "dim": dim}, stats,
+                                     items_per_call=batch_size)
+                results.append(result)
+                print(f"  {encoder_class.__name__} batch={batch_size} dim={dim}: "
+                      f"{result['items_per_s']:.0f} texts/s")
+    return results
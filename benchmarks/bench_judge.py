@@ -0,0 +1,84 @@
+# Tool Judge Benchmarks
+
+import random
+
+from agent.tools.tool_judge import ToolJudge
+from benchmarks.harness import make_result, measure
+
+
+FILLER_WORDS = (
+    "the plan for next week includes a visit to the museum and a walk along "
+    "the river before dinner with friends who live near the old town square"
+).split()
+
+
+def make_text(length, seed=0):
+    """
+    Build a text of roughly the given length with no tool keywords.
+    
+    Args:
+        length (int): Target length in characters.
+        seed (int, optional): Random seed. Defaults to 0.
+    
+    Returns:
+        str: The generated text.
+    """
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def make_judge(keyword_count):
+    """
+    Build a ToolJudge with the default keywords padded to the given count.
+    
+    Args:
+        keyword_count (int): Total number of keywords.
+    
+    Returns:
+        ToolJudge: The judge.
+    """
+    judge = ToolJudge()
+    keywords = dict(list(judge.tool_keywords.items())[:keyword_count])
+    i = 0
+    while len(keywords) < keyword_count:
+        keywords[f"synthetic keyword {i}"] = 0.5
+        i += 1
+    judge.tool_keywords = keywords
+    judge.compile()
+    return judge
+
+
+def run(lengths=(100, 1000, 10000, 100000), keyword_counts=(10, 50, 200, 1000), min_time=0.2):
+    """
+    Benchmark ToolJudge.calculate_score against text length and keyword count.
+    
+    The text contains no keyword, which is the worst case for scanning.
+    
+    Args:
+        lengths (tuple, optional): Text lengths in characters.
+        keyword_counts (tuple, optional): Keyword table sizes.
+        min_time (float, optional): Minimum measured time per case. Defaults to 0.2.
+    
+    Returns:
+        list: The result records.
+    """
+    results = []
+    for keyword_count in keyword_counts:
+        judge = make_judge(keyword_count)
+        for length in lengths:
+            text = make_text(length)
+            stats = measure(lambda: judge.calculate_score(text), min_time=min_time)
+            results.append(make_result(
+                "judge.calculate_score",
+                {"text_length": length, "keywords": keyword_count},
+                stats,
+            ))
+            print(f"  calculate_score length={length} keywords={keyword_count}: "
+                  f"{stats['median_s'] * 1e6:.1f} us")
+    return results
@@ -0,0 +1,70 @@
+# Tool Retrieval Benchmarks
+
+import numpy as np
+
+from agent.tool_database import ToolDatabase
+from benchmarks.harness import make_result, make_skipped, measure
+
+
+def build_tool_database(num_tools, dim, seed=0):
+    """
+    Build an in-memory ToolDatabase holding random unit vectors.
+    
+    Args:
+        num_tools (int): Number of tools.
+        dim (int): Vector dimension.
+        seed (int, optional): Random seed. Defaults to 0.
+    
+    Returns:
+        ToolDatabase: The populated tool database (not connected to SQLite).
+    """
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((num_tools, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    tool_db = ToolDatabase(":memory:")
+    tool_db.index_tools(
+        (i, f"Tool{i}", f"Synthetic tool {i}", None, vector) for i, vector in enumerate(vectors, 1)
+    )
+    return tool_db
+
+
+def run(sizes=(10, 1000, 10000), dims=(64, 768), max_elements=20_000_000, k=5, min_time=0.2):
+    """
+    Benchmark find_similar_tool and find_similar_tools across catalog sizes and vector dimensions.
+    
+    Args:
+        sizes (tuple, optional): Catalog sizes to benchmark.
+        dims (tuple, optional): Vector dimensions to benchmark.
+        max_elements (int, optional): Cases with more than this many vector
+            elements are skipped to bound memory. Defaults to 20 million.
+        k (int, optional): Number of tools retrieved by find_similar_tools. Defaults to 5.
+        min_time (float, optional): Minimum measured time per case. Defaults to 0.2.
+    
+    Returns:
+        list: The result records.
+    """
+    results = []
+    rng = np.random.default_rng(1)
+    for dim in dims:
+        for size in sizes:
+            params = {"tools": size, "dim": dim}
+            top_k_params = {"tools": size, "dim": dim, "k": k}
+            if size * dim > max_elements:
+                reason = f"more than {max_elements} vector elements"
+                results.append(make_skipped("retrieval.find_similar_tool", params, reason))
+                results.append(make_skipped("retrieval.find_similar_tools", top_k_params, reason))
+                continue
+            
+            tool_db = build_tool_database(size, dim)
+            query = rng.standard_normal(dim)
+            query = (query / np.linalg.norm(query)).tolist()
+            
+            stats = measure(lambda: tool_db.find_similar_tool(query), min_time=min_time)
+            results.append(make_result("retrieval.find_similar_tool", params, stats))
+            print(f"  find_similar_tool tools={size} dim={dim}: {stats['median_s'] * 1e3:.3f} ms")
+            
+            stats = measure(lambda: tool_db.find_similar_tools(query, k=k), min_time=min_time)
+            results.append(make_result("retrieval.find_similar_tools", top_k_params, stats))
+            print(f"  find_similar_tools tools={size} dim={dim} k={k}: {stats['median_s'] * 1e3:.3f} ms")
+    return results
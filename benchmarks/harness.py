@@ -0,0 +1,203 @@
+# Benchmark Harness
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+def measure(func, min_time=0.2, max_iterations=10000, warmup=1):
+    """
+    Time repeated calls of a function.
+    
+    The function is called until at least min_time seconds have been spent,
+    or max_iterations calls have been made, whichever comes first.
+    
+    Args:
+        func (callable): The function to time, called without arguments.
+        min_time (float, optional): Minimum total measured time in seconds. Defaults to 0.2.
+        max_iterations (int, optional): Maximum number of measured calls. Defaults to 10000.
+        warmup (int, optional): Number of unmeasured calls made first. Defaults to 1.
+    
+    Returns:
+        dict: Timing statistics in seconds per call.
+    """
+    for _ in range(warmup):
+        func()
+    
+    timings = []
+    total = 0.0
+    while total < min_time and len(timings) < max_iterations:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    
+    return {
+        "iterations": len(timings),
+        "mean_s": statistics.fmean(timings),
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def make_result(name, params, stats, items_per_call=1):
+    """
+    Build a benchmark result record.
+    
+    Args:
+        name (str): The benchmark name, e.g. "retrieval.find_similar_tool".
+        params (dict): The parameters of this case.
+        stats (dict): Timing statistics from measure().
+        items_per_call (int, optional): Items processed per call, used for throughput. Defaults to 1.
+    
+    Returns:
+        dict: The result record.
+    """
+    result = {"name": name, "params": params}
+    result.update(stats)
+    result["items_per_s"] = items_per_call / stats["median_s"] if stats["median_s"] > 0 else None
+    return result
+
+
+def make_skipped(name, params, reason):
+    """
+    Build a record for a case that was not run.
+    
+    Args:
+        name (str): The benchmark name.
+        params (dict): The parameters of this case.
+        reason (str): Why the case was skipped.
+    
+    Returns:
+        dict: The result record.
+    """
+    return {"name": name, "params": params, "skipped": reason}
+
+
+def result_key(result):
+    """
+    Build a key identifying a benchmark case across runs.
+    
+    Args:
+        result (dict): A result record.
+    
+    Returns:
+        str: The case key.
+    """
+    params = ",".join(f"{k}={result['params'][k]}" for k in sorted(result["params"]))
+    return f"{result['name']}[{params}]"
+
+
+def environment_info():
+    """
+    Describe the machine and interpreter the benchmarks ran on.
+    
+    Returns:
+        dict: The environment description.
+    """
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(results, path):
+    """
+    Write benchmark results to a JSON file.
+    
+    Args:
+        results (list): The result records.
+        path (str): The output path.
+    """
+    report = {"environment": environment_info(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    """
+    Load a benchmark report written by write_report().
+    
+    Args:
+        path (str): The report path.
+    
+    Returns:
+        dict: The report, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Compare results against a baseline report by median time per call.
+    
+    Args:
+        results (list): The current result records.
+        baseline (dict): A report loaded with load_report().
+        threshold (float, optional): Relative slowdown reported as a regression. Defaults to 0.10.
+    
+    Returns:
+        list: One comparison dict per case present in both runs, with the
+            ratio current/baseline and a status of "faster", "slower" or "same".
+    """
+    baseline_by_key = {
+        result_key(r): r for r in baseline.get("results", []) if "median_s" in r
+    }
+    comparisons = []
+    for result in results:
+        if "median_s" not in result:
+            continue
+        key = result_key(result)
+        previous = baseline_by_key.get(key)
+        if previous is None or previous["median_s"] <= 0:
+            continue
+        ratio = result["median_s"] / previous["median_s"]
+        if ratio > 1.0 + threshold:
+            status = "slower"
+        elif ratio < 1.0 - threshold:
+            status = "faster"
+        else:
+            status = "same"
+        comparisons.append({
+            "case": key,
+            "baseline_median_s": previous["median_s"],
+            "median_s": result["median_s"],
+            "ratio": ratio,
+            "status": status,
+        })
+    return comparisons
+
+
+def format_duration(seconds):
+    """
+    Format a duration with an appropriate unit.
+    
+    Args:
+        seconds (float): The duration in seconds.
+    
+    Returns:
+        str: The formatted duration.
+    """
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.0f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1.0:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
@@ -0,0 +1,485 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Load Generator for the Chain-of-Tools AI Agent
+
+Replays the showcase scenario queries (and optionally a query file) against
+a single agent, a pool of agents or the HTTP front end, and reports latency
+percentiles, time to first token, throughput and a per-stage breakdown.
+
+Two arrival modes are supported:
+    closed loop: a fixed number of clients, each sending its next query as
+        soon as the previous one completes (--concurrency).
+    open loop: queries arrive as a Poisson process at a target rate
+        regardless of completions (--rate), so queueing delay shows up in
+        the latency. Passing several rates sweeps them to find saturation.
+
+Usage:
+    python benchmarks/load_test.py --target pool --workers 4 --concurrency 8 --requests 200
+    python benchmarks/load_test.py --target pool --workers 4 --rate 50,100,200 --duration 10
+    python benchmarks/load_test.py --target http --url http://127.0.0.1:8000 --rate 20
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent import tracing
+from benchmarks.harness import environment_info
+
+
+def load_queries(query_file=None, include_scenarios=True):
+    """
+    Collect the queries to replay.
+    
+    Args:
+        query_file (str, optional): File with one query per line, or JSON lines
+            with a "query" key. Defaults to None.
+        include_scenarios (bool, optional): Include the showcase scenario queries. Defaults to True.
+    
+    Returns:
+        list: The queries.
+    """
+    queries = []
+    if include_scenarios:
+        from showcase_scenarios import SCENARIO_QUERIES
+        queries.extend(SCENARIO_QUERIES.values())
+    
+    if query_file:
+        with open(query_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("{"):
+                    queries.append(json.loads(line)["query"])
+                else:
+                    queries.append(line)
+    
+    if not queries:
+        raise ValueError("No queries to replay.")
+    return queries
+
+
+class LocalTarget:
+    """
+    Runs queries on in-process agents, one agent per worker thread.
+    
+    With a single worker this is one agent serving every request in turn;
+    with several it is a pool.
+    """
+    
+    def __init__(self, workers=1, simulate_latency=False):
+        """
+        Create the agent workers.
+        
+        Args:
+            workers (int, optional): Number of agents. Defaults to 1.
+            simulate_latency (bool, optional): Keep the agent's simulated sleeps. Defaults to False.
+        """
+        from agent.server import AgentWorker, create_headless_agent
+        
+        def factory():
+            agent = create_headless_agent()
+            if agent is not None:
+                agent.simulate_latency = simulate_latency
+            return agent
+        
+        self.workers = [AgentWorker(factory) for _ in range(workers)]
+        self._idle = queue.Queue()
+        for worker in self.workers:
+            self._idle.put(worker)
+    
+    def run(self, query):
+        """
+        Process a query on the next idle agent.
+        
+        Args:
+            query (str): The query.
+        
+        Returns:
+            float: Seconds from the start of processing to the first token, or None.
+        """
+        worker = self._idle.get()
+        try:
+            return worker.executor.submit(self._process, worker.agent, query).result()
+        finally:
+            self._idle.put(worker)
+    
+    @staticmethod
+    def _process(agent, query):
+        start = time.perf_counter()
+        first_token = None
+        for event in agent.process_query_stream(query):
+            if first_token is None and event["type"] == "token":
+                first_token = time.perf_counter() - start
+        return first_token
+    
+    def close(self):
+        for worker in self.workers:
+            worker.shutdown()
+
+
+class HttpTarget:
+    """
+    Sends queries to the HTTP front end and reads the streamed events.
+    """
+    
+    def __init__(self, url, timeout=120.0):
+        """
+        Initialize the target.
+        
+        Args:
+            url (str): Base URL of the server, e.g. http://127.0.0.1:8000.
+            timeout (float, optional): Socket timeout in seconds. Defaults to 120.
+        """
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+    
+    def run(self, query):
+        """
+        Send a query and consume the NDJSON event stream.
+        
+        Args:
+            query (str): The query.
+        
+        Returns:
+            float: Seconds from sending the request to the first token, or None.
+        """
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("POST", "/query", body=json.dumps({"query": query}),
+                         headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: {response.read()[:200]!r}")
+            first_token = None
+            for line in response:
+                if first_token is None and b'"type": "token"' in line:
+                    first_token = time.perf_counter() - start
+            return first_token
+        finally:
+            conn.close()
+    
+    def close(self):
+        pass
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """
+    Compute percentiles of a list of values.
+    
+    Args:
+        values (list): The values.
+        points (tuple, optional): The percentiles to compute. Defaults to (50, 95, 99).
+    
+    Returns:
+        dict: Mapping "p50" etc. to the value, or an empty dict if there are no values.
+    """
+    if not values:
+        return {}
+    result = np.percentile(np.asarray(values), points)
+    return {f"p{p}": float(v) for p, v in zip(points, result)}
+
+
+class LoadRun:
+    """
+    Records request outcomes during a load run.
+    """
+    
+    def __init__(self):
+        self.latencies = []
+        self.first_tokens = []
+        self.errors = []
+        self._lock = threading.Lock()
+    
+    def record(self, target, query, scheduled):
+        """
+        Run one request and record its latency, measured from its scheduled start.
+        
+        Args:
+            target: The target to send the request to.
+            query (str): The query.
+            scheduled (float): perf_counter time at which the request was due.
+        """
+        try:
+            first_token = target.run(query)
+        except Exception as e:
+            with self._lock:
+                self.errors.append(str(e))
+            return
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            self.latencies.append(latency)
+            if first_token is not None:
+                self.first_tokens.append(first_token)
+    
+    def summary(self, elapsed):
+        """
+        Summarize the run.
+        
+        Args:
+            elapsed (float): Wall time of the run in seconds.
+        
+        Returns:
+            dict: Request counts, throughput and latency percentiles in milliseconds.
+        """
+        return {
+            "completed": len(self.latencies),
+            "errors": len(self.errors),
+            "error_samples": self.errors[:5],
+            "elapsed_s": elapsed,
+            "throughput_qps": len(self.latencies) / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": {k: v * 1000.0 for k, v in percentiles(self.latencies).items()},
+            "first_token_ms": {k: v * 1000.0 for k, v in percentiles(self.first_tokens).items()},
+        }
+
+
+def run_closed_loop(target, queries, concurrency, requests=None, duration=None):
+    """
+    Run a closed-loop test: each client sends its next query when the previous one completes.
+    
+    Args:
+        target: The target to load.
+        queries (list): Queries replayed round-robin.
+        concurrency (int): Number of concurrent clients.
+        requests (int, optional): Total number of requests. Defaults to None.
+        duration (float, optional): Run length in seconds, used when requests is None.
+    
+    Returns:
+        dict: The run summary.
+    """
+    run = LoadRun()
+    counter = iter(range(requests if requests is not None else sys.maxsize))
+    counter_lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+    
+    def client():
+        while deadline is None or time.perf_counter() < deadline:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            run.record(target, queries[i % len(queries)], time.perf_counter())
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = run.summary(time.perf_counter() - start)
+    summary["mode"] = "closed"
+    summary["concurrency"] = concurrency
+    return summary
+
+
+def run_open_loop(target, queries, rate, duration, max_outstanding=1024, seed=0):
+    """
+    Run an open-loop test: queries arrive as a Poisson process at a fixed rate.
+    
+    Latency is measured from each request's scheduled arrival, so time spent
+    waiting behind a saturated target counts against it.
+    
+    Args:
+        target: The target to load.
+        queries (list): Queries replayed round-robin.
+        rate (float): Mean arrivals per second.
+        duration (float): Length of the arrival window in seconds.
+        max_outstanding (int, optional): Maximum number of in-flight requests. Defaults to 1024.
+        seed (int, optional): Random seed for inter-arrival times. Defaults to 0.
+    
+    Returns:
+        dict: The run summary.
+    """
+    run = LoadRun()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    next_arrival = start
+    sent = 0
+    with ThreadPoolExecutor(max_workers=max_outstanding) as executor:
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - start > duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(run.record, target, queries[sent % len(queries)], next_arrival)
+            sent += 1
+    summary = run.summary(time.perf_counter() - start)
+    summary["mode"] = "open"
+    summary["target_rate_qps"] = rate
+    summary["sent"] = sent
+    return summary
+
+
+def stage_breakdown(collector):
+    """
+    Aggregate collected spans into per-stage timing statistics.
+    
+    Args:
+        collector (tracing.InMemoryCollector): The span collector.
+    
+    Returns:
+        dict: Per span name: count, total and percentiles in milliseconds.
+    """
+    durations = {}
+    for span in collector.get_spans():
+        durations.setdefault(span["name"], []).append(span["duration_ms"])
+    return {
+        name: {"count": len(values), "total_ms": float(sum(values)), **percentiles(values)}
+        for name, values in sorted(durations.items())
+    }
+
+
+def print_summary(summary):
+    """
+    Print a run summary.
+    
+    Args:
+        summary (dict): The run summary.
+    """
+    if summary["mode"] == "open":
+        label = f"open loop @ {summary['target_rate_qps']:g} q/s"
+    else:
+        label = f"closed loop x{summary['concurrency']}"
+    latency = summary["latency_ms"]
+    print(f"\n{label}: {summary['completed']} ok, {summary['errors']} errors, "
+          f"{summary['throughput_qps']:.1f} q/s")
+    if latency:
+        print(f"  latency ms      p50={latency['p50']:.1f}  p95={latency['p95']:.1f}  p99={latency['p99']:.1f}")
+    first = summary["first_token_ms"]
+    if first:
+        print(f"  first token ms  p50={first['p50']:.1f}  p95={first['p95']:.1f}  p99={first['p99']:.1f}")
+    for name, stats in summary.get("stages", {}).items():
+        print(f"  {name:<32} n={stats['count']:<6} p50={stats['p50']:.3f} ms  p95={stats['p95']:.3f} ms")
+
+
+def parse_args():
+    """
+    Parse command line arguments for the load generator.
+    
+    Returns:
+        argparse.Namespace: Parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Load test the Chain-of-Tools agent")
+    parser.add_argument(
+        "--target", choices=["agent", "pool", "http"], default="agent",
+        help="Single in-process agent, a pool of agents, or the HTTP front end (default: agent)."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Number of agents in the pool target (default: 4)."
+    )
+    parser.add_argument(
+        "--url", type=str, default="http://127.0.0.1:8000",
+        help="Base URL of the HTTP front end (default: http://127.0.0.1:8000)."
+    )
+    parser.add_argument(
+        "--query-file", type=str,
+        help="Additional queries, one per line or JSON lines with a 'query' key."
+    )
+    parser.add_argument(
+        "--no-scenarios", action="store_true",
+        help="Do not replay the showcase scenario queries."
+    )
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=1,
+        help="Number of closed-loop clients (default: 1)."
+    )
+    parser.add_argument(
+        "-n", "--requests", type=int,
+        help="Total closed-loop requests. Defaults to running for --duration."
+    )
+    parser.add_argument(
+        "-r", "--rate", type=str,
+        help="Open-loop arrival rate in queries per second; a comma-separated list sweeps several rates."
+    )
+    parser.add_argument(
+        "-t", "--duration", type=float, default=10.0,
+        help="Run length in seconds (default: 10)."
+    )
+    parser.add_argument(
+        "--simulate-latency", action="store_true",
+        help="Keep the agent's simulated token and tool sleeps for in-process targets."
+    )
+    parser.add_argument(
+        "-o", "--output", type=str,
+        help="Write the results as JSON to this path."
+    )
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main function to run the load generator.
+    """
+    args = parse_args()
+    queries = load_queries(args.query_file, include_scenarios=not args.no_scenarios)
+    
+    collector = None
+    tmp_dir = None
+    if args.target == "http":
+        target = HttpTarget(args.url)
+    else:
+        # Keep load-test logs out of the demo database
+        tmp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(tmp_dir.name, "load_test.db")
+        collector = tracing.InMemoryCollector()
+        tracing.configure_tracing(collector)
+        workers = args.workers if args.target == "pool" else 1
+        target = LocalTarget(workers, simulate_latency=args.simulate_latency)
+    
+    runs = []
+    try:
+        rates = [float(r) for r in args.rate.split(",")] if args.rate else [None]
+        for rate in rates:
+            if collector is not None:
+                collector.clear()
+            if rate is None:
+                summary = run_closed_loop(target, queries, args.concurrency, args.requests, args.duration)
+            else:
+                summary = run_open_loop(target, queries, rate, args.duration)
+            if collector is not None:
+                summary["stages"] = stage_breakdown(collector)
+            print_summary(summary)
+            runs.append(summary)
+    finally:
+        target.close()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+    
+    if args.output:
+        report = {
+            "environment": environment_info(),
+            "target": args.target,
+            "workers": args.workers if args.target == "pool" else None,
+            "queries": len(queries),
+            "runs": runs,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
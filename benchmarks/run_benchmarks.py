@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark Suite for the Chain-of-Tools AI Agent
+
+Runs micro benchmarks of the agent hot paths (tool retrieval, tool judge,
+encoders) and an end-to-end headless throughput benchmark, writes the
+results as JSON and compares them against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --suite retrieval --sizes 10,1000,100000,1000000 --dims 64 --max-elements 100000000
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import bench_e2e, bench_encoders, bench_judge, bench_retrieval
+from benchmarks.harness import compare, load_report, write_report
+
+
+SUITES = ["retrieval", "judge", "encoders", "e2e"]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_int_list(value):
+    """
+    Parse a comma-separated list of integers.
+    
+    Args:
+        value (str): The list, e.g. "10,1000,10000".
+    
+    Returns:
+        tuple: The integers.
+    """
+    return tuple(int(v) for v in value.split(",") if v)
+
+
+def parse_args():
+    """
+    Parse command line arguments for the benchmark runner.
+    
+    Returns:
+        argparse.Namespace: Parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Run the Chain-of-Tools agent benchmarks")
+    parser.add_argument(
+        "--suite", action="append", choices=SUITES,
+        help="Suite to run; may be repeated. Defaults to all suites."
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, default="bench_results.json",
+        help="Path of the JSON results file (default: bench_results.json)."
+    )
+    parser.add_argument(
+        "--baseline", type=str, default=DEFAULT_BASELINE,
+        help="Baseline JSON report to compare against (default: benchmarks/baseline.json)."
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true",
+        help="Also write the results to the baseline path."
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="Relative slowdown reported as a regression (default: 0.10)."
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true",
+        help="Exit with status 1 if any case is slower than the baseline."
+    )
+    parser.add_argument(
+        "--sizes", type=parse_int_list, default=(10, 1000, 10000),
+        help="Tool catalog sizes for the retrieval suite (default: 10,1000,10000)."
+    )
+    parser.add_argument(
+        "--dims", type=parse_int_list, default=(64, 768),
+        help="Vector dimensions for the retrieval and encoder suites (default: 64,768)."
+    )
+    parser.add_argument(
+        "--max-elements", type=int, default=20_000_000,
+        help="Retrieval cases with more vector elements (tools x dimension) are skipped (default: 20000000)."
+    )
+    parser.add_argument(
+        "--top-k", type=int, default=5,
+        help="Number of tools retrieved in the top-k retrieval cases (default: 5)."
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.2,
+        help="Minimum measured time per micro benchmark case in seconds (default: 0.2)."
+    )
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main function to run the benchmark suite.
+    """
+    args = parse_args()
+    suites = args.suite or SUITES
+    
+    results = []
+    if "retrieval" in suites:
+        print("Tool retrieval:")
+        results += bench_retrieval.run(sizes=args.sizes, dims=args.dims, max_elements=args.max_elements,
+                                       k=args.top_k, min_time=args.min_time)
+    if "judge" in suites:
+        print("Tool judge:")
+        results += bench_judge.run(min_time=args.min_time)
+    if "encoders" in suites:
+        print("Encoders:")
+        results += bench_encoders.run(dims=args.dims, min_time=args.min_time)
+    if "e2e" in suites:
+        print("End to end:")
+        results += bench_e2e.run(min_time=max(args.min_time, 1.0))
+    
+    write_report(results, args.output)
+    print(f"\nResults written to {args.output}")
+    
+    regressions = []
+    baseline = load_report(args.baseline)
+    if baseline is not None:
+        comparisons = compare(results, baseline, args.threshold)
+        print(f"\nComparison against {args.baseline}:")
+        for c in comparisons:
+            print(f"  {c['status']:>6}  x{c['ratio']:.2f}  {c['case']}")
+        regressions = [c for c in comparisons if c["status"] == "slower"]
+    else:
+        print(f"\nNo baseline found at {args.baseline}.")
+    
+    if args.save_baseline:
+        write_report(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
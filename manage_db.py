@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Chain-of-Tools AI Agent Database Maintenance
+
+This script provides maintenance commands for the agent's SQLite database.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from dotenv import load_dotenv
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from agent.database import AgentDatabase
+from agent.tool_ingest import ingest_tools, read_tool_catalog
+
+
+def parse_args():
+    """
+    Parse command line arguments for the maintenance script.
+    
+    Returns:
+        argparse.Namespace: Parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Maintain the Chain-of-Tools AI Agent database")
+    parser.add_argument(
+        "--db", type=str, default=None,
+        help="Path to the database (default: DATABASE_PATH or database/agent_data.db)."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    compact = commands.add_parser(
+        "compact",
+        help="Move tool results stored inline in logs into the deduplicated blob table."
+    )
+    compact.add_argument(
+        "--batch-size", type=int, default=500,
+        help="Number of logs rewritten per transaction (default: 500)."
+    )
+    compact.add_argument(
+        "--no-vacuum", action="store_true",
+        help="Do not VACUUM the database afterwards."
+    )
+    
+    archive = commands.add_parser(
+        "archive",
+        help="Move logs older than the retention period into date-partitioned archive files."
+    )
+    archive.add_argument(
+        "--retention-days", type=int, default=None,
+        help="Number of days of logs to keep, counting today (default: LOG_RETENTION_DAYS or 30)."
+    )
+    archive.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Number of logs moved per transaction (default: 1000)."
+    )
+    
+    commands.add_parser(
+        "reindex-fts",
+        help="Rebuild and optimize the full-text index of logged queries and answers."
+    )
+    
+    ingest = commands.add_parser(
+        "ingest-tools",
+        help="Encode and add the tools of a JSONL or CSV catalog."
+    )
+    ingest.add_argument(
+        "catalog", type=str,
+        help="Catalog file with name, description and optional category fields."
+    )
+    ingest.add_argument(
+        "--format", choices=["jsonl", "csv"], default=None,
+        help="Catalog format (default: from the file extension)."
+    )
+    ingest.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of encoding processes, 0 to encode in this process (default: one per CPU)."
+    )
+    ingest.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Number of descriptions per encoding batch (default: 1000)."
+    )
+    ingest.add_argument(
+        "--transaction-size", type=int, default=20000,
+        help="Number of tools written per transaction (default: 20000)."
+    )
+    ingest.add_argument(
+        "--embedding-dim", type=int, default=None,
+        help="Dimension of the tool vectors (default: EMBEDDING_DIM or 768)."
+    )
+    return parser.parse_args()
+
+
+def format_size(size):
+    """
+    Format a size in bytes with an appropriate unit.
+    
+    Args:
+        size (int): The size in bytes.
+    
+    Returns:
+        str: The formatted size.
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def compact_command(db, args):
+    """
+    Run the compact command.
+    
+    Args:
+        db (AgentDatabase): The initialized database.
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        int: The exit code.
+    """
+    stats = db.compact_logs(batch_size=args.batch_size, vacuum=not args.no_vacuum)
+    if stats is None:
+        return 1
+    print(f"Rewrote {stats['logs']} logs, added {stats['blobs']} blobs")
+    print(f"Database size: {format_size(stats['before'])} -> {format_size(stats['after'])}")
+    return 0
+
+
+def archive_command(db, args):
+    """
+    Run the archive command.
+    
+    Args:
+        db (AgentDatabase): The initialized database.
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        int: The exit code.
+    """
+    stats = db.archive_logs(retention_days=args.retention_days, batch_size=args.batch_size)
+    if stats is None:
+        return 1
+    print(f"Archived {stats['logs']} logs into {len(stats['partitions'])} partitions in {db.archive.archive_dir}")
+    print(f"Database size: {format_size(stats['before'])} -> {format_size(stats['after'])}")
+    return 0
+
+
+def reindex_fts_command(db, args):
+    """
+    Run the reindex-fts command.
+    
+    Args:
+        db (AgentDatabase): The initialized database.
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        int: The exit code.
+    """
+    if not db.rebuild_search_index():
+        return 1
+    print("Rebuilt the full-text index of logs")
+    return 0
+
+
+def ingest_tools_command(db, args):
+    """
+    Run the ingest-tools command.
+    
+    Args:
+        db (AgentDatabase): The initialized database.
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        int: The exit code.
+    """
+    start = time.perf_counter()
+    
+    def progress(written):
+        elapsed = time.perf_counter() - start
+        print(f"  {written} tools written ({written / elapsed:.0f} tools/s)")
+    
+    embedding_dim = args.embedding_dim or int(os.getenv("EMBEDDING_DIM", "768"))
+    try:
+        written = ingest_tools(
+            db,
+            read_tool_catalog(args.catalog, args.format),
+            batch_size=args.batch_size,
+            workers=args.workers,
+            transaction_size=args.transaction_size,
+            embedding_dim=embedding_dim,
+            progress=progress
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    if written == -1:
+        return 1
+    print(f"Added {written} tools in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+def main():
+    """
+    Main function to run the maintenance script.
+    
+    Returns:
+        int: The exit code.
+    """
+    args = parse_args()
+    load_dotenv()
+    
+    db_path = args.db or os.getenv("DATABASE_PATH", "database/agent_data.db")
+    db = AgentDatabase(db_path)
+    if not db.initialize_database():
+        print("Failed to initialize the database.")
+        return 1
+    
+    commands = {
+        "compact": compact_command,
+        "archive": archive_command,
+        "reindex-fts": reindex_fts_command,
+        "ingest-tools": ingest_tools_command,
+    }
+    try:
+        return commands[args.command](db, args)
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -56,6 +56,26 @@ def parse_args():
         "-d", "--debug", action="store_true",
         help="Run in debug mode with additional logging."
     )
+    parser.add_argument(
+        "-s", "--serve", action="store_true",
+        help="Serve queries over HTTP, streaming events back to the client."
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1",
+        help="Address for the HTTP server to bind (default: 127.0.0.1)."
+    )
+    parser.add_argument(
+        "--port", type=int, default=8000,
+        help="Port for the HTTP server to listen on (default: 8000)."
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=4,
+        help="Maximum number of queries the HTTP server processes at once (default: 4)."
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=64,
+        help="Maximum number of requests waiting for a free agent before the server answers 503 (default: 64)."
+    )
     return parser.parse_args()
 
 
@@ -227,6 +247,28 @@ def auto_demo_mode(debug=False):
     print("The Chain-of-Tools AI Agent successfully demonstrated various tool capabilities.")
 
 
+def serve_mode(host, port, max_concurrency, max_queue):
+    """
+    Run the Chain-of-Tools AI Agent behind the asyncio HTTP front end.
+    
+    Args:
+        host (str): Address to bind.
+        port (int): Port to listen on.
+        max_concurrency (int): Maximum number of queries processed at once.
+        max_queue (int): Maximum number of requests waiting for a free agent.
+    """
+    from agent.server import serve
+    
+    # Load environment variables
+    load_dotenv()
+    
+    # Create necessary directories
+    os.makedirs("database", exist_ok=True)
+    os.makedirs("models", exist_ok=True)
+    
+    serve(host, port, max_concurrency, max_queue)
+
+
 def main():
     """
     Main function to run the demonstration script.
@@ -234,8 +276,11 @@ def main():
     # Parse command line arguments
     args = parse_args()
     
+    # Serve queries over HTTP
+    if args.serve:
+        serve_mode(args.host, args.port, args.max_concurrency, args.max_queue)
     # Additional auto-demo option
-    if hasattr(args, 'auto_demo') and args.auto_demo:
+    elif hasattr(args, 'auto_demo') and args.auto_demo:
         auto_demo_mode(args.debug)
     # Run in interactive mode if specified
     elif args.interactive:
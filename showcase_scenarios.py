@@ -15,6 +15,7 @@ Date: April 2, 2025
 import os
 import sys
 import time
+import numpy as np
 from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
@@ -22,6 +23,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 # Import the agent components
 from agent.main import CoToolsAgent
+from agent.tools.tool_implementations import CalculatorAPI
+
+
+# Queries of the showcase scenarios, also replayed by benchmarks/load_test.py
+SCENARIO_QUERIES = {
+    "Travel Planning": "I'm planning a trip to Paris next week. What's the weather forecast, what are the must-see attractions, and any local tips I should know?",
+    "Research": "I'm doing research on solar energy advancements. Can you find recent academic articles and summarize the key findings about efficiency improvements?",
+    "Calculation": "If I invest $10,000 with an annual interest rate of 5.75% compounded monthly, how much will I have after 10 years? And how much of that will be interest?",
+    "Translation": "I received an email in French that says 'Je suis ravi de vous rencontrer la semaine prochaine.' What does it mean and how should I respond politely?",
+    "News Analysis": "What are the major global economic news from the past week, and how might they affect international markets?",
+    "Project Management": "I have a project file called 'new_product_launch.mpp'. Can you extract the key tasks, analyze the critical path, and recommend any optimization opportunities?",
+}
 
 
 def clear_screen():
@@ -59,7 +72,7 @@ def run_travel_planning_scenario(agent):
         "The user is planning a trip to Paris and needs information about weather, attractions, and local tips."
     )
     
-    query = "I'm planning a trip to Paris next week. What's the weather forecast, what are the must-see attractions, and any local tips I should know?"
+    query = SCENARIO_QUERIES["Travel Planning"]
     
     print(f"User Query: {query}\n")
     time.sleep(1)
@@ -84,7 +97,7 @@ def run_research_scenario(agent):
         "The user is researching renewable energy and needs to find recent articles and data."
     )
     
-    query = "I'm doing research on solar energy advancements. Can you find recent academic articles and summarize the key findings about efficiency improvements?"
+    query = SCENARIO_QUERIES["Research"]
     
     print(f"User Query: {query}\n")
     time.sleep(1)
@@ -109,7 +122,7 @@ def run_calculation_scenario(agent):
         "The user needs to perform a complex calculation and interpret the results."
     )
     
-    query = "If I invest $10,000 with an annual interest rate of 5.75% compounded monthly, how much will I have after 10 years? And how much of that will be interest?"
+    query = SCENARIO_QUERIES["Calculation"]
     
     print(f"User Query: {query}\n")
     time.sleep(1)
@@ -117,6 +130,16 @@ def run_calculation_scenario(agent):
     # Process the query using the agent
     answer = agent.process_query(query)
     
+    # Sweep the interest rate with a single vectorized evaluation
+    rates = np.arange(0.04, 0.0801, 0.0025)
+    balances = CalculatorAPI.evaluate_batch(
+        "principal * (1 + rate / 12) ** (12 * years)",
+        {"principal": 10000, "rate": rates, "years": 10}
+    )
+    print("\nBalance after 10 years by annual rate (compounded monthly):")
+    for rate, balance in zip(rates, balances):
+        print(f"  {rate:6.2%}  ${balance:,.2f}  (interest ${balance - 10000:,.2f})")
+    
     print("\nScenario complete!\n")
     input("Press Enter to continue to the next scenario...")
 
@@ -134,7 +157,7 @@ def run_translation_scenario(agent):
         "The user needs to translate text and understand cultural context."
     )
     
-    query = "I received an email in French that says 'Je suis ravi de vous rencontrer la semaine prochaine.' What does it mean and how should I respond politely?"
+    query = SCENARIO_QUERIES["Translation"]
     
     print(f"User Query: {query}\n")
     time.sleep(1)
@@ -159,7 +182,7 @@ def run_news_analysis_scenario(agent):
         "The user wants to understand recent events and their implications."
     )
     
-    query = "What are the major global economic news from the past week, and how might they affect international markets?"
+    query = SCENARIO_QUERIES["News Analysis"]
     
     print(f"User Query: {query}\n")
     time.sleep(1)
@@ -184,7 +207,7 @@ def run_project_management_scenario(agent):
         "The user needs to analyze a project schedule file and get recommendations."
     )
     
-    query = "I have a project file called 'new_product_launch.mpp'. Can you extract the key tasks, analyze the critical path, and recommend any optimization opportunities?"
+    query = SCENARIO_QUERIES["Project Management"]
     
     print(f"User Query: {query}\n")
     time.sleep(1)
@@ -0,0 +1,128 @@
+# Tests of the content-addressed blob store and log compaction
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+
+from agent.blob_store import content_hash, decode_blob, encode_blob, load_blobs, store_blobs
+from agent.database import AgentDatabase
+
+
+def random_text(rng, length):
+    return " ".join(rng.choice(["sunny", "cloudy", "72°F", "Paris", "result", "€"]) for _ in range(length))
+
+
+class BlobStoreTest(unittest.TestCase):
+    """
+    Check that blobs are stored once per content and read back unchanged.
+    """
+    
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE blobs (hash TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                          "compressed INTEGER NOT NULL, data BLOB NOT NULL)")
+    
+    def tearDown(self):
+        self.conn.close()
+    
+    def test_encode_round_trip(self):
+        rng = random.Random(2)
+        for length in (0, 1, 10, 100, 1000):
+            text = random_text(rng, length)
+            size, compressed, data = encode_blob(text, compress_threshold=64)
+            self.assertEqual(size, len(text.encode("utf-8")))
+            self.assertEqual(compressed, size >= 64)
+            self.assertEqual(decode_blob(compressed, data), text)
+        # Compression is dropped when it does not make the blob smaller
+        text = "".join(chr(rng.randint(0x4E00, 0x9FFF)) for _ in range(40))
+        size, compressed, data = encode_blob(text, compress_threshold=1)
+        self.assertFalse(compressed)
+        self.assertEqual(decode_blob(compressed, data), text)
+    
+    def test_identical_texts_are_stored_once(self):
+        rng = random.Random(4)
+        texts = [random_text(rng, rng.choice([3, 300])) for _ in range(20)]
+        hashes = store_blobs(self.conn, texts + texts[:10], compress_threshold=100)
+        self.assertEqual(hashes, {text: content_hash(text) for text in texts})
+        # Storing the same texts again writes nothing
+        store_blobs(self.conn, texts[5:], compress_threshold=100)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0], len(set(texts)))
+        
+        self.assertEqual(load_blobs(self.conn, list(hashes.values()) + ["missing"]),
+                         {digest: text for text, digest in hashes.items()})
+        compressed = dict(self.conn.execute("SELECT hash, compressed FROM blobs"))
+        for text, digest in hashes.items():
+            self.assertEqual(bool(compressed[digest]), len(text.encode("utf-8")) >= 100)
+
+
+class CompactLogsTest(unittest.TestCase):
+    """
+    Check that compacting inline tool results keeps every log readable unchanged.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+        self.rng = random.Random(8)
+        self.results = [random_text(self.rng, self.rng.choice([2, 20, 400])) for _ in range(6)]
+    
+    def tearDown(self):
+        self.db.disconnect()
+        self.temp_dir.cleanup()
+    
+    def test_get_blob_after_compression(self):
+        result = random_text(self.rng, 500)
+        log_id = self.db.log_interaction("query", "answer", [{"name": "Search", "result": result}])
+        row = self.db.manager.reader().execute("SELECT compressed, size, length(data) FROM blobs").fetchone()
+        self.assertEqual(row[0], 1)
+        self.assertLess(row[2], row[1])
+        self.assertEqual(self.db.get_blob(content_hash(result)), result)
+        self.assertIsNone(self.db.get_blob(content_hash("missing")))
+        self.assertEqual(self.db.get_log(log_id)["tools_used"], [{"name": "Search", "result": result}])
+    
+    def test_compaction_keeps_logs_identical(self):
+        # Logs written before results were stored as blobs hold them inline
+        with self.db.manager.writer() as conn:
+            for log_id in range(1, 41):
+                tools = [{"name": f"Tool{self.rng.randint(0, 3)}", "result": self.rng.choice(self.results)}
+                         for _ in range(self.rng.randint(0, 3))]
+                if log_id % 7 == 0:
+                    tools.append("PlainTool")
+                conn.execute("INSERT INTO logs VALUES (?, '2025-01-01 00:00:00', ?, 'answer', ?)",
+                             (log_id, f"query {log_id}", json.dumps(tools) if tools else None))
+                conn.executemany(
+                    "INSERT INTO tool_calls (log_id, position, timestamp, tool_name, result_length, response_length) "
+                    "VALUES (?, ?, '2025-01-01 00:00:00', ?, ?, 6)",
+                    [(log_id, position, tool["name"] if isinstance(tool, dict) else tool,
+                      len(tool["result"]) if isinstance(tool, dict) else None)
+                     for position, tool in enumerate(tools)]
+                )
+        before = [self.db.get_log(log_id) for log_id in range(1, 41)]
+        inline = sum(1 for log in before if any(isinstance(tool, dict) for tool in log["tools_used"] or []))
+        
+        stats = self.db.compact_logs(batch_size=6)
+        self.assertEqual(stats["logs"], inline)
+        conn = self.db.manager.reader()
+        self.assertEqual(stats["blobs"], conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0])
+        self.assertLessEqual(stats["blobs"], len(self.results))
+        self.assertEqual([self.db.get_log(log_id) for log_id in range(1, 41)], before)
+        
+        # Results are referenced by hash, from the logs and their tool calls
+        for log_id in range(1, 41):
+            stored = self.db.get_log(log_id, resolve_results=False)["tools_used"] or []
+            self.assertFalse(any(isinstance(tool, dict) and "result" in tool for tool in stored))
+        self.assertEqual(conn.execute(
+            "SELECT COUNT(*) FROM tool_calls WHERE tool_name != 'PlainTool' AND result_hash IS NULL"
+        ).fetchone()[0], 0)
+        
+        # Compacting again finds nothing left to move
+        self.assertEqual(self.db.compact_logs(vacuum=False)["logs"], 0)
+        self.assertEqual([self.db.get_log(log_id) for log_id in range(1, 41)], before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Tests of the restricted calculator
+
+import time
+import unittest
+
+import numpy as np
+
+from agent.tools.tool_implementations import CalculatorAPI
+
+
+class CalculatorTest(unittest.TestCase):
+    """
+    Check the evaluator's results and the expressions it refuses.
+    """
+    
+    def test_arithmetic(self):
+        self.assertEqual(CalculatorAPI.evaluate("2 ** 10 % 7 + max(3, 4)"), 2 ** 10 % 7 + 4)
+        self.assertEqual(CalculatorAPI.evaluate("round(2.567, 2)"), 2.57)
+        self.assertAlmostEqual(CalculatorAPI.evaluate("principal * (1 + rate) ** 3",
+                                                      {"principal": 100, "rate": 0.1}), 133.1)
+        results = CalculatorAPI.evaluate_batch("p * (1 + r) ** y", {"p": 100, "r": [0.1, 0.2], "y": 2})
+        np.testing.assert_allclose(results, [121.0, 144.0])
+    
+    def test_oversized_integers_are_refused_quickly(self):
+        for expression in ("(10**10000)**10000", "-(10**10000)**10000 // 7", "2 ** 10 ** 8",
+                           "(2**600000) * (2**600000)"):
+            started = time.perf_counter()
+            with self.assertRaisesRegex(ValueError, "too large"):
+                CalculatorAPI.evaluate(expression)
+            self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(CalculatorAPI.evaluate("2 ** 100000 % 1000"), 2 ** 100000 % 1000)
+    
+    def test_argument_counts(self):
+        with self.assertRaisesRegex(ValueError, r"max\(\) takes 2 arguments \(3 given\)"):
+            CalculatorAPI.evaluate("max(1, 2, 3)")
+        with self.assertRaisesRegex(ValueError, r"sqrt\(\) takes 1 argument \(0 given\)"):
+            CalculatorAPI.evaluate("sqrt()")
+        with self.assertRaisesRegex(ValueError, r"round\(\) takes 1 to 2 arguments"):
+            CalculatorAPI.evaluate("round(1, 2, 3)")
+        self.assertIn("max() takes 2 arguments", CalculatorAPI.calculate("max(1, 2, 3)"))
+    
+    def test_financial_functions(self):
+        self.assertTrue(CalculatorAPI.calculate("fv(0.05, 10, 0, -1000)").startswith(
+            "Calculation result: fv(0.05, 10, 0, -1000) = 1628.89"))
+        self.assertAlmostEqual(CalculatorAPI.evaluate("fv(0.05, 10, 0, -1000)"), 1628.89, places=2)
+        rate = 0.05 / 12
+        self.assertAlmostEqual(CalculatorAPI.evaluate("pmt(0.05/12, 360, 200000)"),
+                               -200000 * rate / (1 - (1 + rate) ** -360))
+        self.assertAlmostEqual(CalculatorAPI.evaluate("pv(0.05, 10, -100)"),
+                               100 * (1 - 1.05 ** -10) / 0.05)
+        
+        rates = np.array([0.01, 0.05, 0.1])
+        np.testing.assert_allclose(CalculatorAPI.evaluate_batch("fv(r, n, 0, -p)", {"r": rates, "n": 10, "p": 1000}),
+                                   1000 * (1 + rates) ** 10)
+        np.testing.assert_allclose(CalculatorAPI.evaluate_batch("pv(r, 10, -100)", {"r": rates}),
+                                   100 * (1 - (1 + rates) ** -10) / rates)
+        np.testing.assert_allclose(CalculatorAPI.evaluate_batch("pmt(r, 360, 200000)", {"r": rates / 12}),
+                                   -200000 * (rates / 12) / (1 - (1 + rates / 12) ** -360))
+        with self.assertRaisesRegex(ValueError, r"pmt\(\) takes 3 to 5 arguments \(2 given\)"):
+            CalculatorAPI.evaluate("pmt(0.05, 10)")
+    
+    def test_function_names_as_variables(self):
+        results = CalculatorAPI.evaluate_batch("pv * (1 + rate) ** years",
+                                               {"pv": [100, 200], "rate": 0.05, "years": 10})
+        np.testing.assert_allclose(results, [100 * 1.05 ** 10, 200 * 1.05 ** 10])
+        self.assertAlmostEqual(CalculatorAPI.evaluate("fv(rate, 10, 0, -pv)", {"pv": 1000, "rate": 0.05}),
+                               1000 * 1.05 ** 10)
+        with self.assertRaisesRegex(ValueError, "both as a function and as a variable: pv"):
+            CalculatorAPI.evaluate("pv(pv, 10, 1)", {"pv": 1})
+    
+    def test_unsafe_syntax_is_refused(self):
+        for expression in ("__import__('os')", "(1).__class__", "open('x')", "[1, 2]", "_pow(2, 3)"):
+            with self.assertRaises(ValueError):
+                CalculatorAPI.evaluate(expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Tests of the shared SQLite connection manager
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from agent.connection import ConnectionManager
+
+
+class ConnectionManagerTest(unittest.TestCase):
+    """
+    Check the per-thread readers and single writer of a WAL database.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = ConnectionManager.get(os.path.join(self.temp_dir.name, "agent.db"))
+        with self.manager.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+    
+    def tearDown(self):
+        self.manager.close()
+        self.temp_dir.cleanup()
+    
+    def count(self):
+        return self.manager.reader().execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    
+    def test_managers_are_shared_per_file(self):
+        path = os.path.join(self.temp_dir.name, "agent.db")
+        self.assertIs(ConnectionManager.get(path), self.manager)
+        self.assertIs(ConnectionManager.get(os.path.join(self.temp_dir.name, ".", "agent.db")), self.manager)
+        memory = ConnectionManager.get(":memory:")
+        self.assertIsNot(ConnectionManager.get(":memory:"), memory)
+        memory.close()
+        self.assertEqual(self.manager.reader().execute("PRAGMA journal_mode").fetchone()[0], "wal")
+    
+    def test_readers_are_per_thread_and_read_only(self):
+        readers = []
+        threads = [threading.Thread(target=lambda: readers.append(self.manager.reader())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        readers.append(self.manager.reader())
+        self.assertEqual(len({id(reader) for reader in readers}), 5)
+        self.assertIs(self.manager.reader(), self.manager.reader())
+        with self.assertRaises(sqlite3.OperationalError):
+            self.manager.reader().execute("INSERT INTO items (value) VALUES ('x')")
+    
+    def test_other_threads_see_committed_writes(self):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for expected in range(1, 6):
+                with self.manager.writer() as conn:
+                    conn.execute("INSERT INTO items (value) VALUES (?)", (f"item {expected}",))
+                self.assertEqual(list(pool.map(lambda _: self.count(), range(8))), [expected] * 8)
+    
+    def test_readers_do_not_wait_for_the_writer(self):
+        counts = []
+        with self.manager.writer() as conn:
+            conn.execute("INSERT INTO items (value) VALUES ('uncommitted')")
+            # A reader on another thread sees the last committed state without blocking
+            reader = threading.Thread(target=lambda: counts.append(self.count()))
+            reader.start()
+            reader.join(timeout=2)
+            self.assertFalse(reader.is_alive())
+        self.assertEqual(counts, [0])
+        self.assertEqual(self.count(), 1)
+    
+    def test_failed_transactions_are_rolled_back(self):
+        with self.assertRaises(RuntimeError):
+            with self.manager.writer() as conn:
+                conn.execute("INSERT INTO items (value) VALUES ('discarded')")
+                raise RuntimeError("abort")
+        self.assertEqual(self.count(), 0)
+    
+    def test_concurrent_writers_are_serialized(self):
+        def write(thread):
+            for i in range(25):
+                with self.manager.writer() as conn:
+                    conn.execute("INSERT INTO items (value) VALUES (?)", (f"{thread}-{i}",))
+        
+        threads = [threading.Thread(target=write, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.count(), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# Tests of the event sinks
+
+import gc
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+import weakref
+from datetime import date
+
+from agent.event_sink import AsyncBatchedSink, NullSink, RingBufferSink, format_event_json
+
+
+class RecordingStream(io.StringIO):
+    """
+    Text stream that counts writes and flushes.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+    
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+    
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def token(i):
+    return {"type": "token", "content": f"t{i} "}
+
+
+class SinkTest(unittest.TestCase):
+    """
+    Check the in-memory sinks and the JSON formatter.
+    """
+    
+    def test_null_sink(self):
+        sink = NullSink()
+        sink.emit(token(0))
+        sink.flush()
+        sink.close()
+    
+    def test_ring_buffer_keeps_the_newest_events(self):
+        sink = RingBufferSink(maxlen=3)
+        for i in range(5):
+            sink.emit(token(i))
+        self.assertEqual(len(sink), 3)
+        self.assertEqual(sink.get_events(), [token(2), token(3), token(4)])
+        sink.clear()
+        self.assertEqual(sink.get_events(), [])
+    
+    def test_format_event_json(self):
+        # Values JSON cannot encode are written as strings
+        line = format_event_json({"type": "tool_check", "content": 0.5, "at": date(2024, 6, 1)})
+        self.assertTrue(line.endswith("\n"))
+        self.assertEqual(json.loads(line), {"type": "tool_check", "content": 0.5, "at": "2024-06-01"})
+
+
+class AsyncBatchedSinkTest(unittest.TestCase):
+    """
+    Check that the background writer keeps every event, in order, in few writes.
+    """
+    
+    def test_events_are_written_in_order_and_batched(self):
+        stream = RecordingStream()
+        sink = AsyncBatchedSink(stream, batch_size=64, flush_interval=0.5)
+        for i in range(1000):
+            sink.emit(token(i))
+        sink.flush()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [token(i) for i in range(1000)])
+        self.assertLessEqual(stream.writes, 1000 // 64 + 2)
+        self.assertEqual(stream.flushes, stream.writes)
+        sink.close()
+    
+    def test_events_from_many_threads(self):
+        stream = RecordingStream()
+        sink = AsyncBatchedSink(stream, formatter=lambda event: event["content"] + "\n", max_queue=50)
+        
+        def emit(thread):
+            for i in range(200):
+                sink.emit({"type": "token", "content": f"{thread}:{i}"})
+        
+        threads = [threading.Thread(target=emit, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sink.close()
+        
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1600)
+        for thread in range(8):
+            # Each thread's own events keep their order
+            own = [line for line in lines if line.startswith(f"{thread}:")]
+            self.assertEqual(own, [f"{thread}:{i}" for i in range(200)])
+    
+    def test_file_target_is_closed_with_the_sink(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "events.jsonl")
+            sink = AsyncBatchedSink(path)
+            sink.emit(token(0))
+            sink.close()
+            self.assertTrue(sink.stream.closed)
+            # Emitting and flushing after close are ignored
+            sink.emit(token(1))
+            sink.flush()
+            sink.close()
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual([json.loads(line) for line in f], [token(0)])
+    
+    def test_borrowed_stream_stays_open(self):
+        stream = RecordingStream()
+        sink = AsyncBatchedSink(stream)
+        sink.close()
+        self.assertFalse(stream.closed)
+    
+    def test_closed_sink_is_released(self):
+        sink = AsyncBatchedSink(RecordingStream())
+        sink.emit(token(0))
+        sink.close()
+        reference = weakref.ref(sink)
+        del sink
+        gc.collect()
+        # The exit hook no longer holds the sink
+        self.assertIsNone(reference())
+
+
+if __name__ == "__main__":
+    unittest.main()
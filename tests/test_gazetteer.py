@@ -0,0 +1,94 @@
+# Tests of the offline gazetteer
+
+import random
+import unittest
+
+from agent.tools.gazetteer import BKTree, Gazetteer, edit_distance, get_gazetteer, normalize_name
+from agent.tools.tool_implementations import CapitalAPI
+
+
+def naive_edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class EditDistanceTest(unittest.TestCase):
+    """
+    Compare the bit-parallel edit distance and the BK-tree against brute force.
+    """
+    
+    def test_matches_dynamic_programming(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            # Small alphabets give many near matches; lengths cross the 64-bit word size
+            alphabet = rng.choice(["ab", "abc", "acgt", "abcdefghijklmnopqrstuvwxyz", "aé€中 "])
+            a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 90)))
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 90)))
+            self.assertEqual(edit_distance(a, b), naive_edit_distance(a, b), (a, b))
+            self.assertEqual(edit_distance(b, a), edit_distance(a, b))
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "abc"), 3)
+    
+    def test_tree_search_matches_brute_force(self):
+        rng = random.Random(2)
+        terms = {"".join(rng.choice("abcd") for _ in range(rng.randint(1, 8))) for _ in range(400)}
+        tree = BKTree()
+        for term in terms:
+            tree.add(term)
+        self.assertEqual(len(tree), len(terms))
+        for _ in range(200):
+            query = "".join(rng.choice("abcde") for _ in range(rng.randint(1, 8)))
+            max_distance = rng.randint(0, 3)
+            expected = sorted((naive_edit_distance(query, term), term) for term in terms
+                              if naive_edit_distance(query, term) <= max_distance)
+            self.assertEqual(tree.search(query, max_distance), expected)
+
+
+class GazetteerTest(unittest.TestCase):
+    """
+    Check name normalization and lookups in the bundled gazetteer.
+    """
+    
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("U.S."), "us")
+        self.assertEqual(normalize_name("the Bahamas"), "bahamas")
+        self.assertEqual(normalize_name("Côte d'Ivoire"), "cote divoire")
+        self.assertEqual(normalize_name("St. Lucia"), "saint lucia")
+        self.assertEqual(normalize_name("Trinidad & Tobago"), "trinidad and tobago")
+        self.assertEqual(normalize_name("  BOSNIA-and---Herzegovina "), "bosnia and herzegovina")
+        self.assertEqual(normalize_name("The"), "")
+    
+    def test_lookups(self):
+        gazetteer = get_gazetteer()
+        self.assertIs(get_gazetteer(), gazetteer)
+        self.assertEqual(gazetteer.lookup("U.S.")["name"], "United States")
+        self.assertEqual(gazetteer.lookup("the Bahamas")["name"], "Bahamas")
+        france = gazetteer.lookup("Frnace")
+        self.assertEqual((france["name"], france["capital"], france["distance"]), ("France", "Paris", 2))
+        self.assertEqual(gazetteer.lookup("Untied States")["name"], "United States")
+        # Short names must match exactly
+        self.assertIsNone(gazetteer.lookup("USB"))
+        self.assertIsNone(gazetteer.lookup("Atlantis"))
+        self.assertEqual([entry and entry["name"] for entry in gazetteer.lookup_many(["US", "us", "Nowhere"])],
+                         ["United States", "United States", None])
+        
+        self.assertEqual(CapitalAPI.get_capital("Frnace"), "The capital of France is Paris")
+        self.assertEqual(CapitalAPI.get_capital("atlantis"), "Capital information for Atlantis not found")
+    
+    def test_first_listed_place_wins(self):
+        gazetteer = Gazetteer()
+        gazetteer.add("Georgia", "country", "Tbilisi")
+        gazetteer.add("Georgia", "region", "Atlanta")
+        gazetteer.add("Gambia", "country", "Banjul", aliases=["The Gambia"])
+        self.assertEqual(gazetteer.lookup("georgia")["capital"], "Tbilisi")
+        self.assertEqual(gazetteer.lookup("Georgai")["capital"], "Tbilisi")
+        self.assertEqual(gazetteer.lookup("the gambia")["match"], "gambia")
+
+
+if __name__ == "__main__":
+    unittest.main()
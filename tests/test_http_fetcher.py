@@ -0,0 +1,246 @@
+# Tests of pooled HTTP fetching against a local server
+
+import http.server
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from agent.tools import http_fetcher
+from agent.tools.http_fetcher import HTTPFetcher
+from agent.tools.web_tools import WebContentFetcher
+
+
+PAGE = (b"<html><head><title>Local &amp; Test</title></head>"
+        b"<body><p>Hello</p><script>hidden()</script> world</body></html>")
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def unused_port():
+    """
+    Get a local port nothing listens on.
+    
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Keep-alive handler serving the test routes and counting what it sees.
+    """
+    
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    connections = set()
+    active = 0
+    max_active = 0
+    not_modified = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def send_body(self, body, content_type="text/html; charset=utf-8", **headers):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.connections.add(self.client_address)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            self.route()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+    
+    def route(self):
+        path = self.path.split("?")[0]
+        if path == "/page":
+            self.send_body(PAGE)
+        elif path == "/slow":
+            time.sleep(0.2)
+            self.send_body(b"slow")
+        elif path == "/big":
+            self.send_body(b"x" * 500000, "text/plain")
+        elif path == "/latin1":
+            self.send_body("café".encode("latin-1"), "text/plain; charset=iso-8859-1")
+        elif path == "/trickle":
+            # Every read succeeds within the socket timeout, the whole body does not
+            self.send_response(200)
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            for _ in range(100):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.05)
+        elif path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/page")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.not_modified_response(ETag='"v1"')
+            else:
+                self.send_body(b"etag body", "text/plain", ETag='"v1"')
+        elif path == "/last-modified":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                self.not_modified_response()
+            else:
+                self.send_body(b"dated body", "text/plain", Last_Modified=LAST_MODIFIED)
+        elif path == "/no-store":
+            self.send_body(b"private", "text/plain", ETag='"p"', Cache_Control="no-store")
+        else:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+    
+    def not_modified_response(self, **headers):
+        with type(self).lock:
+            type(self).not_modified += 1
+        self.send_response(304)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+
+class HTTPFetcherTest(unittest.TestCase):
+    """
+    Fetch from a ThreadingHTTPServer on a free local port.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.daemon_threads = True
+        # Connections the fetcher drops are expected; keep the test output clean
+        cls.server.handle_error = lambda request, client_address: None
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        Handler.connections = set()
+        Handler.active = Handler.max_active = Handler.not_modified = 0
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.fetcher = HTTPFetcher(max_per_host=3, timeout=1.0, max_body_bytes=100000,
+                                   cache_dir=self.temp_dir.name)
+    
+    def tearDown(self):
+        self.fetcher.close()
+        self.temp_dir.cleanup()
+    
+    def test_connections_are_reused(self):
+        for i in range(20):
+            result = self.fetcher.fetch(f"{self.base}/page?{i}")
+            self.assertEqual((result["status"], result["body"]), (200, PAGE))
+        self.assertEqual(self.fetcher.stats["connections"], 1)
+        self.assertEqual(self.fetcher.stats["reused"], 19)
+        self.assertEqual(len(Handler.connections), 1)
+    
+    def test_fetch_many_limits_requests_per_host(self):
+        urls = [f"{self.base}/slow?{i}" for i in range(9)]
+        started = time.perf_counter()
+        results = self.fetcher.fetch_many(urls + urls[:2])
+        elapsed = time.perf_counter() - started
+        
+        self.assertEqual(len(results), 11)
+        self.assertTrue(all(result["status"] == 200 for result in results))
+        self.assertEqual([result["url"] for result in results], urls + urls[:2])
+        # Duplicates are fetched once, three at a time: three rounds of 0.2 s
+        self.assertEqual(self.fetcher.stats["requests"], 9)
+        self.assertEqual(Handler.max_active, 3)
+        self.assertLessEqual(self.fetcher.stats["connections"], 3)
+        self.assertGreaterEqual(elapsed, 0.55)
+    
+    def test_body_is_truncated(self):
+        result = self.fetcher.fetch(f"{self.base}/big")
+        self.assertTrue(result["truncated"])
+        self.assertEqual(len(result["body"]), 100000)
+        self.assertIsNone(result["error"])
+        # A connection with unread body is not reused
+        self.assertEqual(self.fetcher.fetch(f"{self.base}/page")["status"], 200)
+        self.assertEqual(self.fetcher.stats["reused"], 0)
+    
+    def test_trickling_response_times_out(self):
+        started = time.perf_counter()
+        result = self.fetcher.fetch(f"{self.base}/trickle")
+        self.assertIn("deadline", result["error"])
+        self.assertLess(time.perf_counter() - started, 2.0)
+    
+    def test_redirects_and_errors(self):
+        result = self.fetcher.fetch(f"{self.base}/redirect")
+        self.assertEqual((result["status"], result["url"]), (200, f"{self.base}/page"))
+        self.assertEqual(self.fetcher.fetch(f"{self.base}/missing")["status"], 404)
+        self.assertIn("Unsupported URL", self.fetcher.fetch("ftp://127.0.0.1/file")["error"])
+        self.assertIn("ConnectionRefusedError", self.fetcher.fetch(f"http://127.0.0.1:{unused_port()}/")["error"])
+    
+    def test_conditional_requests(self):
+        for path in ("/etag", "/last-modified"):
+            first = self.fetcher.fetch(self.base + path)
+            second = self.fetcher.fetch(self.base + path)
+            self.assertFalse(first["from_cache"])
+            self.assertTrue(second["from_cache"])
+            self.assertEqual((second["status"], second["body"]), (200, first["body"]))
+        self.assertEqual(Handler.not_modified, 2)
+        self.assertEqual(self.fetcher.stats["not_modified"], 2)
+        
+        # The cache is on disk, so a new fetcher revalidates too
+        other = HTTPFetcher(cache_dir=self.temp_dir.name)
+        self.assertTrue(other.fetch(f"{self.base}/etag")["from_cache"])
+        other.close()
+        
+        self.fetcher.fetch(f"{self.base}/no-store")
+        self.assertEqual(self.fetcher.cache.validators(f"{self.base}/no-store"), {})
+    
+    def test_stale_connection_is_retried(self):
+        self.assertEqual(self.fetcher.fetch(f"{self.base}/page")["status"], 200)
+        # Close the pooled connection behind the fetcher's back, as an idle timeout would
+        for pool in self.fetcher._pools.values():
+            for connection in pool.idle:
+                connection.sock.shutdown(2)
+        result = self.fetcher.fetch(f"{self.base}/page")
+        self.assertEqual((result["status"], result["error"]), (200, None))
+        self.assertEqual((self.fetcher.stats["connections"], self.fetcher.stats["reused"]), (2, 0))
+    
+    def test_web_content_fetcher(self):
+        with mock.patch.dict(os.environ, {"WEB_FETCH_ENABLED": "True", "WEB_FETCH_MAX_BYTES": "1000"}), \
+                mock.patch.object(http_fetcher, "_fetcher", None):
+            page, big, latin1, missing = WebContentFetcher.fetch_many(
+                [f"{self.base}/page", f"{self.base}/big", f"{self.base}/latin1", f"{self.base}/missing"]
+            )
+            http_fetcher.get_fetcher().close()
+        self.assertEqual(page, f"Content from {self.base}/page:\n\nLocal & Test\nHello world")
+        self.assertTrue(big.endswith("[Content truncated]"))
+        self.assertTrue(latin1.endswith("café"))
+        self.assertIn("status 404", missing)
+        
+        with mock.patch.dict(os.environ, {"WEB_FETCH_ENABLED": "False"}):
+            self.assertIn("simulated", WebContentFetcher.fetch_content("https://example.com/page"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# Tests of archiving old logs into date partitions
+
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from agent.database import AgentDatabase
+from agent.log_writer import insert_logs
+
+
+TOOLS = ["Calculator", "Weather", "Search", "Capital"]
+
+
+def random_tools(rng):
+    tools = []
+    for _ in range(rng.randint(0, 3)):
+        # Some results repeat across logs and some are long enough to be compressed
+        result = rng.choice(["42", "Sunny, 72°F", "Paris " * rng.randint(100, 200), f"result {rng.randint(0, 5)}"])
+        tools.append({"name": rng.choice(TOOLS), "result": result})
+    return tools
+
+
+class LogArchiveTest(unittest.TestCase):
+    """
+    Check that queries return the same data before and after logs are archived.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ)
+        self.environ.start()
+        os.environ.pop("LOG_ARCHIVE_DIR", None)
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+        
+        self.rng = random.Random(5)
+        self.today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.old_days = [(self.today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in (10, 9, 8)]
+        self.start = f"{self.old_days[0]} 00:00:00"
+        self.end = self.today.strftime("%Y-%m-%d 23:59:59")
+        for day in self.old_days + [self.today.strftime("%Y-%m-%d")]:
+            self.add_logs(day, 15)
+    
+    def tearDown(self):
+        self.db.disconnect()
+        self.environ.stop()
+        self.temp_dir.cleanup()
+    
+    def add_logs(self, day, count):
+        records = []
+        for second in sorted(self.rng.sample(range(86400), count)):
+            timestamp = f"{day} {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            answer = " ".join(self.rng.choice(["the", "answer", "is", "clear"]) for _ in range(self.rng.randint(1, 30)))
+            records.append((timestamp, f"question at {timestamp}", answer, random_tools(self.rng)))
+        with self.db.manager.writer() as conn:
+            insert_logs(conn, records)
+    
+    def hot_log_count(self):
+        return self.db.manager.reader().execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    
+    def snapshot(self):
+        logs = self.db.get_logs(start=self.start, end=self.end, resolve_results=True)
+        return {
+            "logs": logs,
+            "by_id": {log["id"]: self.db.get_log(log["id"]) for log in logs},
+            "unresolved": self.db.get_logs(start=self.start, end=self.end),
+            "day": self.db.get_logs(start=f"{self.old_days[1]} 06:00:00", end=f"{self.old_days[1]} 18:00:00"),
+            "usage": self.db.get_tool_usage(start=self.start, end=self.end),
+            "limited_usage": self.db.get_tool_usage(start=self.start, end=self.end, limit=2),
+            "responses": self.db.get_tool_length_percentiles(start=self.start, end=self.end),
+            "results": self.db.get_tool_length_percentiles("result_length", (10, 50, 90), start=self.start,
+                                                           end=self.end),
+            "weather": self.db.get_tool_length_percentiles(start=self.start, end=self.end, tool_name="Weather"),
+            "counts": self.db.get_interaction_counts(bucket_seconds=6 * 3600, start=self.start, end=self.end)
+        }
+    
+    def test_queries_are_unchanged_by_archiving(self):
+        before = self.snapshot()
+        self.assertEqual(len(before["logs"]), 60)
+        
+        stats = self.db.archive_logs(retention_days=5, batch_size=7)
+        self.assertEqual(stats["logs"], 45)
+        self.assertEqual(stats["partitions"], self.old_days)
+        self.assertEqual(self.db.archive.partitions(), self.old_days)
+        self.assertEqual(self.hot_log_count(), 15)
+        
+        after = self.snapshot()
+        for key in before:
+            self.assertEqual(after[key], before[key], key)
+        self.assertIsNone(self.db.get_log(max(after["by_id"]) + 1))
+    
+    def test_rerun_and_zero_retention(self):
+        expected = self.db.get_logs(start=self.start, end=self.end, resolve_results=True)
+        self.db.archive_logs(retention_days=5)
+        
+        # A second run has nothing left to move
+        stats = self.db.archive_logs(retention_days=5)
+        self.assertEqual((stats["logs"], stats["partitions"]), (0, []))
+        
+        # Logs arriving late for an archived day are added to its partition
+        self.add_logs(self.old_days[1], 3)
+        expected = self.db.get_logs(start=self.start, end=self.end, resolve_results=True)
+        self.assertEqual(len(expected), 63)
+        self.assertEqual(expected, sorted(expected, key=lambda log: (log["timestamp"], log["id"])))
+        self.assertEqual(self.db.get_logs(start=self.start, end=self.end, limit=25, resolve_results=True),
+                         expected[:25])
+        stats = self.db.archive_logs(retention_days=5)
+        self.assertEqual((stats["logs"], stats["partitions"]), (3, [self.old_days[1]]))
+        self.assertEqual(self.db.get_logs(start=self.start, end=self.end, resolve_results=True), expected)
+        self.assertEqual(len(self.db.get_logs(start=f"{self.old_days[1]} 00:00:00",
+                                              end=f"{self.old_days[1]} 23:59:59")), 18)
+        
+        # Keeping zero days archives today's logs too
+        stats = self.db.archive_logs(retention_days=0)
+        self.assertEqual((stats["logs"], stats["partitions"]), (15, [self.today.strftime("%Y-%m-%d")]))
+        self.assertEqual(self.hot_log_count(), 0)
+        self.assertEqual(self.db.get_logs(start=self.start, end=self.end, resolve_results=True), expected)
+        self.assertEqual(self.db.get_log(expected[-1]["id"]), expected[-1])
+        
+        # New logs never reuse the IDs of archived ones
+        self.assertGreater(self.db.log_interaction("new question", "new answer"), expected[-1]["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
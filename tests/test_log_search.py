@@ -0,0 +1,95 @@
+# Tests of the full-text search over logs
+
+import os
+import random
+import tempfile
+import unittest
+
+from agent.database import AgentDatabase
+from tests.test_search_index import random_documents
+
+
+class LogSearchTest(unittest.TestCase):
+    """
+    Check that log search follows inserts, updates and deletes, and a rebuilt index.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+        self.rng = random.Random(13)
+        self.vocabulary = [f"word{i}" for i in range(40)]
+        # Mapping of log ID to (user_query, agent_response)
+        self.logs = {}
+        for _ in range(60):
+            self.add_log()
+    
+    def tearDown(self):
+        self.db.disconnect()
+        self.temp_dir.cleanup()
+    
+    def add_log(self):
+        query, answer = random_documents(self.rng, 2, self.vocabulary)
+        log_id = self.db.log_interaction(query, answer)
+        self.logs[log_id] = (query, answer)
+        return log_id
+    
+    def check_search(self):
+        for _ in range(100):
+            terms = self.rng.sample(self.vocabulary, self.rng.randint(1, 2))
+            expected = {
+                log_id for log_id, (query, answer) in self.logs.items()
+                if all(term in f"{query} {answer}".split() for term in terms)
+            }
+            results = self.db.search_logs(" ".join(terms), limit=1000)
+            self.assertEqual({result["id"] for result in results}, expected, terms)
+            for result in results:
+                self.assertEqual((result["user_query"], result["agent_response"]), self.logs[result["id"]])
+            self.assertEqual([result["score"] for result in results], sorted(result["score"] for result in results))
+    
+    def test_search_follows_changes(self):
+        self.check_search()
+        
+        updated = self.rng.sample(sorted(self.logs), 15)
+        with self.db.manager.writer() as conn:
+            for log_id in updated:
+                query, answer = random_documents(self.rng, 2, self.vocabulary)
+                conn.execute("UPDATE logs SET user_query = ?, agent_response = ? WHERE id = ?", (query, answer, log_id))
+                self.logs[log_id] = (query, answer)
+        self.check_search()
+        
+        deleted = self.rng.sample(sorted(self.logs), 10)
+        with self.db.manager.writer() as conn:
+            conn.executemany("DELETE FROM logs WHERE id = ?", [(log_id,) for log_id in deleted])
+        for log_id in deleted:
+            del self.logs[log_id]
+        for _ in range(10):
+            self.add_log()
+        self.check_search()
+        
+        self.assertTrue(self.db.rebuild_search_index())
+        self.check_search()
+    
+    def test_rebuild_indexes_logs_missed_by_the_triggers(self):
+        with self.db.manager.writer() as conn:
+            trigger = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'logs_fts_insert'").fetchone()[0]
+            conn.execute("DROP TRIGGER logs_fts_insert")
+        missed = [self.add_log() for _ in range(5)]
+        with self.db.manager.writer() as conn:
+            conn.execute(trigger)
+        
+        query = self.logs[missed[0]][0].split()[0]
+        self.assertNotIn(missed[0], {result["id"] for result in self.db.search_logs(query, limit=1000)})
+        self.assertTrue(self.db.rebuild_search_index())
+        self.assertIn(missed[0], {result["id"] for result in self.db.search_logs(query, limit=1000)})
+        self.check_search()
+    
+    def test_operators_are_matched_literally(self):
+        log_id = self.db.log_interaction('what is "NEAR" AND (word1 OR word2)*', "answer")
+        self.assertEqual([result["id"] for result in self.db.search_logs("near AND or")], [log_id])
+        self.assertEqual(self.db.search_logs("*"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
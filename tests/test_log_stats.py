@@ -0,0 +1,88 @@
+# Tests of the windowed log statistics
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from agent.database import AgentDatabase
+
+
+# (timestamp, tool name, result length, response length) of each hand-built call
+CALLS = [
+    ("2025-03-01 09:00:00", "Calculator", 10, 40),
+    ("2025-03-01 09:10:00", "Calculator", 12, 55),
+    ("2025-03-01 09:20:00", "Weather", 200, 80),
+    ("2025-03-01 09:50:00", "Calculator", 7, 41),
+    ("2025-03-01 10:05:00", "Weather", 180, 95),
+    ("2025-03-01 10:30:00", "Calculator", 30, None),
+    ("2025-03-01 11:00:00", "Search", 500, 300),
+    ("2025-03-01 11:45:00", "Calculator", 9, 60),
+    ("2025-03-01 12:15:00", "Weather", 150, 70),
+    ("2025-03-01 12:20:00", "Calculator", 11, 38)
+]
+
+
+class LogStatisticsTest(unittest.TestCase):
+    """
+    Compare the windowed aggregates over a small hand-built log against plain Python.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+        with self.db.manager.writer() as conn:
+            for log_id, (timestamp, name, result_length, response_length) in enumerate(CALLS, 1):
+                conn.execute("INSERT INTO logs (id, timestamp, user_query, agent_response, tools_used) "
+                             "VALUES (?, ?, ?, ?, '[]')", (log_id, timestamp, f"query {log_id}", "answer"))
+                conn.execute("INSERT INTO tool_calls (log_id, position, timestamp, tool_name, result_length, "
+                             "response_length) VALUES (?, 0, ?, ?, ?, ?)",
+                             (log_id, timestamp, name, result_length, response_length))
+    
+    def tearDown(self):
+        self.db.disconnect()
+        self.temp_dir.cleanup()
+    
+    def expected_lengths(self, column, start, end):
+        index = 2 if column == "result_length" else 3
+        lengths = {}
+        for call in CALLS:
+            if start <= call[0] <= end and call[index] is not None:
+                lengths.setdefault(call[1], []).append(call[index])
+        return lengths
+    
+    def test_length_percentiles(self):
+        percentiles = (0, 25, 50, 90, 95, 99, 100)
+        windows = [("2025-03-01 00:00:00", "2025-03-01 23:59:59"),
+                   ("2025-03-01 09:10:00", "2025-03-01 11:45:00"),
+                   ("2025-03-01 12:00:00", "2025-03-01 12:15:00")]
+        for column in ("response_length", "result_length"):
+            for start, end in windows:
+                stats = self.db.get_tool_length_percentiles(column, percentiles, start=start, end=end)
+                expected = self.expected_lengths(column, start, end)
+                self.assertEqual(sorted(stats), sorted(expected))
+                for name, lengths in expected.items():
+                    self.assertEqual(stats[name]["calls"], len(lengths))
+                    for p, value in zip(percentiles, np.percentile(lengths, percentiles)):
+                        self.assertAlmostEqual(stats[name][f"p{p:g}"], value)
+        
+        stats = self.db.get_tool_length_percentiles(tool_name="Weather", start="2025-03-01 00:00:00",
+                                                    end="2025-03-01 23:59:59")
+        self.assertEqual(stats, {"Weather": {"calls": 3, "p50": 80.0, "p95": 93.5, "p99": 94.7}})
+        self.assertEqual(self.db.get_tool_length_percentiles(tool_name="Unknown"), {})
+    
+    def test_tool_usage_and_interaction_counts(self):
+        usage = self.db.get_tool_usage(start="2025-03-01 09:10:00", end="2025-03-01 12:15:00")
+        self.assertEqual(usage, [{"name": "Calculator", "calls": 4}, {"name": "Weather", "calls": 3},
+                                 {"name": "Search", "calls": 1}])
+        
+        counts = self.db.get_interaction_counts(bucket_seconds=3600, start="2025-03-01 09:00:00",
+                                                end="2025-03-01 12:59:59")
+        self.assertEqual(counts, [("2025-03-01 09:00:00", 4), ("2025-03-01 10:00:00", 2),
+                                  ("2025-03-01 11:00:00", 2), ("2025-03-01 12:00:00", 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# Tests of the batched background log writer
+
+import os
+import tempfile
+import threading
+import unittest
+
+from agent.database import AgentDatabase
+
+
+class LogWriterTest(unittest.TestCase):
+    """
+    Check that logs queued from many threads are all written, in batches.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+        self.db.enable_async_logging(batch_size=32, flush_interval=0.05)
+    
+    def tearDown(self):
+        self.db.manager.close()
+        self.temp_dir.cleanup()
+    
+    def test_logs_from_many_threads(self):
+        returned = []
+        
+        def log(thread):
+            for i in range(50):
+                tools = [{"name": f"Tool{i % 3}", "result": f"result {i}"}] if i % 2 else None
+                returned.append(self.db.log_interaction(f"query {thread}-{i}", f"answer {thread}-{i}", tools))
+        
+        threads = [threading.Thread(target=log, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Queued logs have no ID yet
+        self.assertEqual(returned, [0] * 400)
+        
+        self.db.flush_logs()
+        self.assertEqual(self.db.log_writer.pending(), 0)
+        conn = self.db.manager.reader()
+        self.assertEqual(
+            {row[0] for row in conn.execute("SELECT user_query FROM logs")},
+            {f"query {thread}-{i}" for thread in range(8) for i in range(50)}
+        )
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0], 400)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM tool_calls").fetchone()[0], 200)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0], 25)
+        self.assertEqual((self.db.log_writer.written, self.db.log_writer.failed), (400, 0))
+        self.assertLess(self.db.log_writer.batches, 400)
+        
+        log = self.db.get_logs(start="2000-01-01 00:00:00", limit=1, resolve_results=True)[0]
+        self.assertEqual(log["agent_response"], log["user_query"].replace("query", "answer"))
+    
+    def test_close_writes_pending_logs(self):
+        other = AgentDatabase(self.db.db_path)
+        other.enable_async_logging()
+        # Every AgentDatabase on a file shares its writer
+        self.assertIs(other.log_writer, self.db.log_writer)
+        
+        for i in range(100):
+            self.assertEqual(other.log_interaction(f"query {i}", "answer"), 0)
+        self.db.manager.close()
+        self.assertEqual(self.db.log_writer.written, 100)
+        # A closed writer refuses new logs
+        self.assertEqual(self.db.log_interaction("late query", "answer"), -1)
+        
+        reopened = AgentDatabase(self.db.db_path)
+        self.assertEqual(len(reopened.get_logs(start="2000-01-01 00:00:00")), 100)
+        reopened.disconnect()
+
+
+if __name__ == "__main__":
+    unittest.main()
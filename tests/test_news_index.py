@@ -0,0 +1,109 @@
+# Tests of the date-partitioned news index
+
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import numpy as np
+
+from agent.tools.news_index import NewsIndex, parse_day
+from agent.tools.search_index import SearchIndex
+from agent.tools.web_tools import NewsSearch
+from tests.test_search_index import ExhaustiveBM25, random_documents
+
+
+class NewsIndexTest(unittest.TestCase):
+    """
+    Compare recency-weighted searches over many partitions against exhaustive scoring.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.rng = random.Random(11)
+        cls.vocabulary = [f"word{i}" for i in range(300)]
+        cls.days = [(date(2025, 1, 1) + timedelta(days=offset)).isoformat() for offset in range(60)]
+        cls.texts = {day: random_documents(cls.rng, cls.rng.randint(5, 40), cls.vocabulary) for day in cls.days}
+        cls.oracles = {day: ExhaustiveBM25(texts) for day, texts in cls.texts.items()}
+        
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.news_dir = cls.temp_dir.name
+        cls.index = NewsIndex(cls.news_dir, half_life_days=10)
+        cls.index.add_articles(
+            {"title": "", "url": f"https://news.example/{day}/{position}", "text": text, "date": day}
+            for day, texts in cls.texts.items() for position, text in enumerate(texts)
+        )
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+    
+    def expected(self, query, start, end, k):
+        days = [day for day in self.days if start <= day <= end]
+        scored = []
+        for day in days:
+            weight = self.index.weight(day, days[-1])
+            for position, score in enumerate(self.oracles[day].scores(query)):
+                if score > 0:
+                    scored.append((score * weight, day, position))
+        return sorted(scored, reverse=True)[:k]
+    
+    def test_matches_exhaustive_scoring(self):
+        min_scores = []
+        original_top_k = SearchIndex.top_k
+        
+        def recording_top_k(index, query, k=10, min_score=0.0):
+            min_scores.append(min_score)
+            return original_top_k(index, query, k, min_score)
+        
+        with mock.patch.object(SearchIndex, "top_k", recording_top_k):
+            for _ in range(200):
+                query = " ".join(self.rng.sample(self.vocabulary, self.rng.randint(1, 4)))
+                first, last = sorted(self.rng.sample(range(len(self.days)), 2))
+                start, end = self.days[first], self.days[last]
+                k = self.rng.choice([1, 3, 10])
+                
+                results = self.index.search(query, start, end, k)
+                expected = self.expected(query, start, end, k)
+                self.assertEqual(len(results), len(expected), query)
+                for result, (score, day, _) in zip(results, expected):
+                    self.assertAlmostEqual(result["score"], score, delta=1e-4 * max(1.0, score), msg=query)
+                    self.assertTrue(start <= result["date"] <= end)
+        
+        # Later partitions were searched with the k-th score found so far
+        self.assertTrue(any(min_score > 0 for min_score in min_scores))
+    
+    def test_news_search_tool(self):
+        with mock.patch.dict(os.environ, {"NEWS_INDEX_DIR": self.news_dir}):
+            for _ in range(50):
+                query = " ".join(self.rng.sample(self.vocabulary, 3))
+                output = NewsSearch.search(query, self.days[0], self.days[-1], num_results=5)
+                self.assertTrue(output.startswith(f"News search results for '{query}'"))
+            self.assertIn("Invalid date", NewsSearch.search("word1", "2025-13-40"))
+            self.assertIn("No results found.", NewsSearch.search("unknownword", self.days[0], self.days[-1]))
+    
+    
+    def test_unpadded_dates(self):
+        self.assertEqual(parse_day("2024-3-5"), "2024-03-05")
+        self.assertEqual(parse_day("2024-3-5T08:30:00"), "2024-03-05")
+        self.assertEqual(parse_day(" 2024-03-05 08:30 "), "2024-03-05")
+        with self.assertRaises(ValueError):
+            parse_day("2024-13-05")
+        
+        with tempfile.TemporaryDirectory() as news_dir:
+            index = NewsIndex(news_dir)
+            index.add_articles([
+                {"title": "", "url": "https://news.example/a", "text": "harbour ferry strike", "date": "2024-3-5"},
+                {"title": "", "url": "https://news.example/b", "text": "harbour ferry strike", "date": "2024-3-12"}
+            ])
+            self.assertEqual(sorted(os.listdir(news_dir)), ["2024-03-05", "2024-03-12"])
+            # "2024-3-10" < "2024-3-5" as strings, so unpadded bounds compared
+            # as text would find nothing
+            results = index.search("ferry", "2024-3-5", "2024-3-10")
+            self.assertEqual([result["url"] for result in results], ["https://news.example/a"])
+            self.assertEqual(results[0]["date"], "2024-03-05")
+
+if __name__ == "__main__":
+    unittest.main()
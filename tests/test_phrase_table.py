@@ -0,0 +1,53 @@
+# Tests of offline phrase-table translation
+
+import os
+import tempfile
+import unittest
+
+from agent.tools.phrase_table import PhraseTable, Translator, tokenize
+
+
+class PhraseTableTest(unittest.TestCase):
+    """
+    Check segmentation and the case of translated and copied tokens.
+    """
+    
+    def setUp(self):
+        self.translator = Translator()
+    
+    def test_longest_phrase_wins(self):
+        table = PhraseTable()
+        table.add("good", "bon")
+        table.add("good morning", "bonjour")
+        segments = table.segment(tokenize("Good morning good"))
+        self.assertEqual(segments, [(["good", "morning"], ["bonjour"]), (["good"], ["bon"])])
+    
+    def test_uncovered_tokens_keep_their_case(self):
+        self.assertEqual(self.translator.translate("I live in Paris with John.", "en", "fr"),
+                         "Je live dans Paris avec John.")
+        self.assertEqual(self.translator.translate("Hello! Good morning, John.", "en", "fr"),
+                         "Bonjour! Bonjour, John.")
+        self.assertEqual(self.translator.translate("hello. thank you", "en", "fr"), "bonjour. merci")
+    
+    def test_target_case_is_kept(self):
+        self.assertEqual(self.translator.translate("Bonjour, je suis désolé.", "fr", "en"),
+                         "Hello, I am sorry.")
+    
+    def test_language_codes_cannot_escape_the_phrase_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            phrase_dir = os.path.join(temp_dir, "phrases")
+            os.makedirs(phrase_dir)
+            with open(os.path.join(temp_dir, "x-en.tsv"), "w", encoding="utf-8") as f:
+                f.write("secret\tleaked\n")
+            with open(os.path.join(phrase_dir, "es-en.tsv"), "w", encoding="utf-8") as f:
+                f.write("hola\thello\n")
+            
+            translator = Translator(phrase_dir)
+            self.assertIsNone(translator.translate("secret", "../x", "en"))
+            self.assertIsNone(translator.translate("secret", "en", "fr/../../x"))
+            self.assertEqual(translator.translate("Hola", "Spanish", "English"), "Hello")
+            self.assertEqual(translator.pairs(), [("es", "en")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# Tests of the terminal renderer and event formatting
+
+import random
+import unittest
+
+from agent.event_sink import NullSink
+from agent.interface import UserInterface, format_event
+from agent.renderer import TerminalRenderer, truncate_lines
+from tests.test_event_sink import RecordingStream
+
+
+class TerminalStream(RecordingStream):
+    """
+    Recording stream that reports itself as a terminal.
+    """
+    
+    def isatty(self):
+        return True
+
+
+def tokens(count):
+    return [{"type": "token", "content": f"t{i} "} for i in range(count)]
+
+
+class TruncateLinesTest(unittest.TestCase):
+    """
+    Compare truncate_lines against splitting the whole text.
+    """
+    
+    def test_matches_split(self):
+        rng = random.Random(4)
+        for _ in range(500):
+            text = "".join(rng.choice("ab\n") for _ in range(rng.randint(0, 30)))
+            max_lines = rng.randint(1, 8)
+            lines = text.split("\n")
+            expected = ("\n".join(lines[:max_lines]), len(lines) > max_lines)
+            self.assertEqual(truncate_lines(text, max_lines), expected, (text, max_lines))
+
+
+class TerminalRendererTest(unittest.TestCase):
+    """
+    Check that terminal output is drawn in frames and other streams are written directly.
+    """
+    
+    def test_terminal_output_is_batched_into_frames(self):
+        stream = TerminalStream()
+        renderer = TerminalRenderer(stream, formatter=lambda event: event["content"], refresh_rate=20)
+        self.assertTrue(renderer.is_tty)
+        events = tokens(2000)
+        for event in events:
+            renderer.emit(event)
+        renderer.close()
+        self.assertEqual(stream.getvalue(), "".join(event["content"] for event in events))
+        self.assertLess(stream.writes, 100)
+        self.assertLess(stream.flushes, 100)
+        
+        # Flush draws pending output without waiting for the next frame
+        stream = TerminalStream()
+        renderer = TerminalRenderer(stream, formatter=lambda event: event["content"], refresh_rate=20)
+        renderer.emit(tokens(1)[0])
+        renderer.flush()
+        self.assertEqual(stream.getvalue(), "t0 ")
+        renderer.close()
+    
+    def test_other_streams_are_written_directly(self):
+        stream = RecordingStream()
+        renderer = TerminalRenderer(stream, formatter=lambda event: event["content"])
+        self.assertFalse(renderer.is_tty)
+        for event in tokens(50):
+            renderer.emit(event)
+        self.assertEqual(stream.writes, 50)
+        self.assertEqual(stream.flushes, 0)
+        renderer.close()
+        self.assertEqual(stream.flushes, 1)
+        self.assertEqual(stream.getvalue(), "".join(event["content"] for event in tokens(50)))
+    
+    def test_zero_refresh_rate_writes_directly(self):
+        stream = TerminalStream()
+        renderer = TerminalRenderer(stream, formatter=lambda event: event["content"], refresh_rate=0)
+        renderer.emit(tokens(1)[0])
+        self.assertEqual(stream.getvalue(), "t0 ")
+        renderer.close()
+
+
+class FormatEventTest(unittest.TestCase):
+    """
+    Check the text of each kind of event and the interface fan-out.
+    """
+    
+    def test_format_event(self):
+        self.assertIn("User Query: Weather?\n", format_event({"type": "query", "content": "Weather?"}))
+        self.assertEqual(format_event({"type": "tool_check", "content": 0.456}), "Tool Check: Score = 0.46\n")
+        self.assertEqual(format_event({"type": "tool_call", "content": {"name": "CapitalAPI",
+                                                                        "parameters": {"country": "France"}}}),
+                         "Calling: CapitalAPI(country=France)\n")
+        self.assertEqual(format_event({"type": "token", "content": "Paris "}), "Paris ")
+        self.assertIn("Final Answer:\nParis\n", format_event({"type": "result", "content": "Paris"}))
+    
+    def test_web_content_is_truncated(self):
+        page = "\n".join(f"line {i}" for i in range(25))
+        text = format_event({"type": "tool_result", "content": {"name": "WebContentFetcher", "result": page}})
+        self.assertIn("line 9\n...\n", text)
+        self.assertNotIn("line 10", text)
+        self.assertIn(f"[Content truncated, total length: {len(page)} characters]", text)
+        
+        short = format_event({"type": "tool_result", "content": {"name": "WebContentFetcher", "result": "one line"}})
+        self.assertIn("one line\n", short)
+        self.assertNotIn("truncated", short)
+    
+    def test_interface_keeps_a_bounded_history(self):
+        stream = RecordingStream()
+        interface = UserInterface(sinks=[NullSink(), TerminalRenderer(stream, formatter=format_event)],
+                                  history_size=3)
+        interface.display_query("Weather?")
+        for token in ["It ", "is ", "sunny"]:
+            interface.display_token_generation(token)
+        interface.display_result("It is sunny")
+        interface.close()
+        self.assertEqual([event["type"] for event in interface.get_history()], ["token", "token", "result"])
+        self.assertIn("User Query: Weather?", stream.getvalue())
+        self.assertIn("It is sunny\n", stream.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
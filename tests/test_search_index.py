@@ -0,0 +1,117 @@
+# Tests of the BM25 search index
+
+import math
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from agent.tools.search_index import IndexWriter, SearchIndex, tokenize
+
+
+def random_documents(rng, count, vocabulary):
+    """
+    Generate documents over a small vocabulary with a skewed term distribution.
+    
+    Args:
+        rng (random.Random): The random generator.
+        count (int): Number of documents.
+        vocabulary (list): The words.
+    
+    Returns:
+        list: The document texts.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [" ".join(rng.choices(vocabulary, weights, k=rng.randint(1, 30))) for _ in range(count)]
+
+
+class ExhaustiveBM25:
+    """
+    Plain BM25 scoring of every document, as a reference for the index.
+    """
+    
+    def __init__(self, texts, k1=1.2, b=0.75):
+        self.documents = [Counter(tokenize(f" {text}")) for text in texts]
+        lengths = np.array([sum(terms.values()) for terms in self.documents], dtype=np.float64)
+        # The index stores the length norms in single precision
+        self.norms = (k1 * (1 - b + b * lengths / max(lengths.mean(), 1e-9))).astype(np.float32)
+        self.k1 = k1
+    
+    def scores(self, query):
+        """
+        Score every document for a query.
+        
+        Args:
+            query (str): The query.
+        
+        Returns:
+            numpy.ndarray: The score of every document.
+        """
+        scores = np.zeros(len(self.documents))
+        for term in dict.fromkeys(tokenize(query)):
+            postings = [(doc_id, terms[term]) for doc_id, terms in enumerate(self.documents) if term in terms]
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.documents) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings:
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + float(self.norms[doc_id]))
+        return scores
+
+
+class TopKTest(unittest.TestCase):
+    """
+    Compare top_k() against exhaustive BM25 scoring.
+    """
+    
+    def check(self, index, expected, query, k, min_score):
+        results = index.top_k(query, k, min_score=min_score)
+        ranked = np.sort(expected)[::-1]
+        
+        # Documents clearly above the minimum must all be found, up to k
+        reaching = np.count_nonzero((ranked > 0) & (ranked >= min_score * (1 + 1e-5)))
+        self.assertGreaterEqual(len(results), min(k, reaching), query)
+        self.assertLessEqual(len(results), k, query)
+        for rank, (doc_id, score) in enumerate(results):
+            self.assertAlmostEqual(score, expected[doc_id], delta=1e-4 * max(1.0, score), msg=query)
+            self.assertAlmostEqual(score, ranked[rank], delta=1e-4 * max(1.0, score), msg=query)
+            self.assertGreaterEqual(score, min_score * (1 - 1e-5), query)
+    
+    def test_matches_exhaustive_scoring(self):
+        rng = random.Random(7)
+        vocabulary = [f"word{i}" for i in range(120)]
+        texts = random_documents(rng, 1500, vocabulary)
+        oracle = ExhaustiveBM25(texts)
+        
+        for block_size in (128, 3):
+            writer = IndexWriter(block_size=block_size)
+            for text in texts:
+                writer.add(text)
+            with tempfile.TemporaryDirectory() as index_dir:
+                writer.write(index_dir)
+                index = SearchIndex(index_dir)
+                for _ in range(150):
+                    query = " ".join(rng.sample(vocabulary, rng.randint(1, 4)))
+                    k = rng.choice([1, 5, 10, 50])
+                    expected = oracle.scores(query)
+                    ranked = np.sort(expected)[::-1]
+                    # Minimum scores below, around and above the k-th score
+                    for min_score in (0.0, float(ranked[k - 1]) * rng.uniform(0.5, 1.5), float(ranked[0]) * 2):
+                        self.check(index, expected, query, k, min_score)
+    
+    def test_min_score_above_every_document(self):
+        writer = IndexWriter()
+        texts = ["apple banana", "banana cherry", "cherry apple apple"]
+        for text in texts:
+            writer.add(text)
+        with tempfile.TemporaryDirectory() as index_dir:
+            writer.write(index_dir)
+            index = SearchIndex(index_dir)
+            self.assertEqual(index.top_k("apple cherry", 2, min_score=100.0), [])
+            self.assertEqual(index.top_k("durian", 2), [])
+            self.assertEqual([doc_id for doc_id, _ in index.top_k("apple", 1)], [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+# Tests of the asyncio HTTP front end
+
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from agent.server import AgentServer, create_headless_agent
+
+
+class ServerThread:
+    """
+    An AgentServer listening on a free local port, run by an event loop on its own thread.
+    """
+    
+    def __init__(self, **options):
+        self.server = AgentServer(host="127.0.0.1", port=0, **options)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.port = self.run(self.server.start())
+    
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(60)
+    
+    def connection(self):
+        return http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+    
+    def request(self, method, path, body=None, headers=None):
+        connection = self.connection()
+        try:
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.getheader("Content-Type"), response.read()
+        finally:
+            connection.close()
+    
+    def close(self):
+        self.run(self.server.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class ScriptedAgent:
+    """
+    Agent stand-in whose queries wait for an event before answering.
+    """
+    
+    def __init__(self, release):
+        self.release = release
+    
+    def process_query_stream(self, query):
+        yield {"type": "query", "content": query}
+        self.release.wait(30)
+        yield {"type": "result", "content": f"Answer to {query}"}
+
+
+class AgentServerTest(unittest.TestCase):
+    """
+    Run queries through the server and a real headless agent.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        environment = {
+            "DATABASE_PATH": os.path.join(cls.temp_dir.name, "agent.db"),
+            "SIMULATE_LATENCY": "False",
+            "SNAPSHOT_ENABLED": "False",
+            "ASYNC_LOGGING": "False"
+        }
+        with mock.patch.dict(os.environ, environment):
+            cls.server = ServerThread(max_concurrency=1, agent_factory=create_headless_agent)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        cls.temp_dir.cleanup()
+    
+    def test_health(self):
+        status, content_type, body = self.server.request("GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(content_type, "application/json")
+        self.assertEqual(json.loads(body)["status"], "ok")
+    
+    def test_ndjson_stream(self):
+        connection = self.server.connection()
+        connection.request("POST", "/query", body=json.dumps({"query": "What is the capital of France?"}))
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "application/x-ndjson")
+        self.assertEqual(response.getheader("Transfer-Encoding"), "chunked")
+        
+        # Events can be read one line at a time as they arrive
+        first = json.loads(response.readline())
+        self.assertEqual(first, {"type": "query", "content": "What is the capital of France?"})
+        events = [first] + [json.loads(line) for line in response.read().splitlines()]
+        connection.close()
+        self.assertEqual(events[-1]["type"], "result")
+        self.assertIn("thinking", {event["type"] for event in events})
+    
+    def test_sse_stream(self):
+        status, content_type, body = self.server.request(
+            "GET", "/query?q=Calculate+125+*+37", headers={"Accept": "text/event-stream"}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(content_type, "text/event-stream")
+        messages = [message for message in body.decode("utf-8").split("\n\n") if message]
+        event_lines = [message.split("\n") for message in messages]
+        self.assertEqual(event_lines[0][0], "event: query")
+        self.assertEqual(event_lines[-1][0], "event: result")
+        for lines in event_lines:
+            self.assertTrue(lines[1].startswith("data: "))
+            self.assertEqual(json.loads(lines[1][6:])["type"], lines[0][7:])
+    
+    def test_errors(self):
+        self.assertEqual(self.server.request("GET", "/missing")[0], 404)
+        self.assertEqual(self.server.request("GET", "/query")[0], 400)
+        self.assertEqual(self.server.request("POST", "/query", body=b"[not json")[0], 400)
+        self.assertEqual(self.server.request("DELETE", "/query")[0], 405)
+        self.assertEqual(self.server.request("POST", "/query", body=b"x" * 70000)[0], 413)
+
+
+class QueueLimitTest(unittest.TestCase):
+    """
+    Check that requests beyond the wait queue are rejected with 503.
+    """
+    
+    def wait_for(self, server, key, value):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if json.loads(server.request("GET", "/health")[2])[key] == value:
+                return
+            time.sleep(0.01)
+        self.fail(f"{key} never reached {value}")
+    
+    def test_queue_limit(self):
+        release = threading.Event()
+        server = ServerThread(max_concurrency=1, max_queue=1, agent_factory=lambda: ScriptedAgent(release))
+        try:
+            results = {}
+            
+            def query(name):
+                results[name] = server.request("GET", f"/query?q={name}")
+            
+            threads = [threading.Thread(target=query, args=("first",))]
+            threads[0].start()
+            self.wait_for(server, "active", 1)
+            threads.append(threading.Thread(target=query, args=("second",)))
+            threads[1].start()
+            self.wait_for(server, "queued", 1)
+            
+            status, _, body = server.request("GET", "/query?q=third")
+            self.assertEqual(status, 503)
+            self.assertIn("busy", json.loads(body)["error"])
+            
+            release.set()
+            for thread in threads:
+                thread.join(30)
+            for name in ("first", "second"):
+                status, _, body = results[name]
+                self.assertEqual(status, 200)
+                self.assertEqual(json.loads(body.splitlines()[-1])["content"], f"Answer to {name}")
+            health = json.loads(server.request("GET", "/health")[2])
+            self.assertEqual((health["completed"], health["rejected"]), (2, 1))
+        finally:
+            release.set()
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
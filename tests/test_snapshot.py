@@ -0,0 +1,92 @@
+# Tests of warm-start snapshots
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from agent import snapshot
+from agent.main import CoToolsAgent
+
+
+class SnapshotTest(unittest.TestCase):
+    """
+    Check that a snapshot is restored only while the state it was built from is unchanged.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ, {
+            "DATABASE_PATH": os.path.join(self.temp_dir.name, "agent.db"),
+            "SNAPSHOT_DIR": os.path.join(self.temp_dir.name, "snapshots"),
+            "SNAPSHOT_ENABLED": "True",
+            "SIMULATE_LATENCY": "False",
+            "ASYNC_LOGGING": "False"
+        })
+        self.environ.start()
+    
+    def tearDown(self):
+        self.environ.stop()
+        self.temp_dir.cleanup()
+    
+    def start(self, expected):
+        agent = CoToolsAgent()
+        agent.initialize()
+        self.assertEqual(agent.startup_stats["snapshot"], expected)
+        return agent
+    
+    def manifest(self, agent):
+        with open(os.path.join(agent.snapshot.path, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    
+    def names(self, agent):
+        return sorted(tool["name"] for tool in agent.tool_db.tools.values())
+    
+    def test_restored_state_matches_a_fresh_start(self):
+        first = self.start("saved")
+        second = self.start("restored")
+        self.assertEqual(second.tool_db.tools, first.tool_db.tools)
+        self.assertEqual(second.tool_judge.compile(), first.tool_judge.compile())
+        query = first.query_encoder.encode("what is the weather in Paris")
+        self.assertEqual(second.tool_db.find_similar_tools(query, k=5), first.tool_db.find_similar_tools(query, k=5))
+    
+    def test_catalog_change_rejects_the_snapshot(self):
+        first = self.start("saved")
+        first.db.add_tools([("ExtraTool", "An extra tool for testing", None, "test")])
+        
+        rebuilt = self.start("saved")
+        self.assertIn("ExtraTool", self.names(rebuilt))
+        self.assertEqual(self.manifest(rebuilt)["tool_catalog_version"], rebuilt.db.get_tool_catalog_version())
+        restored = self.start("restored")
+        self.assertEqual(self.names(restored), self.names(rebuilt))
+    
+    def test_source_change_rejects_the_snapshot(self):
+        # Hash copies of the sources, so one can be edited
+        package_dir = os.path.dirname(os.path.abspath(snapshot.__file__))
+        copy_dir = os.path.join(self.temp_dir.name, "agent")
+        for name in snapshot.SOURCE_FILES:
+            os.makedirs(os.path.dirname(os.path.join(copy_dir, name)), exist_ok=True)
+            shutil.copyfile(os.path.join(package_dir, name), os.path.join(copy_dir, name))
+        
+        with mock.patch.object(snapshot, "__file__", os.path.join(copy_dir, "snapshot.py")):
+            self.start("saved")
+            self.start("restored")
+            with open(os.path.join(copy_dir, "tools", "tool_encoder.py"), "a", encoding="utf-8") as f:
+                f.write("\n# edited\n")
+            rebuilt = self.start("saved")
+            self.assertEqual(self.manifest(rebuilt)["sources"], snapshot.source_hashes())
+            self.start("restored")
+    
+    def test_damaged_snapshot_is_rebuilt(self):
+        first = self.start("saved")
+        with open(os.path.join(first.snapshot.path, "matrix.npy"), "wb") as f:
+            f.write(b"not a matrix")
+        rebuilt = self.start("saved")
+        self.assertEqual(self.names(rebuilt), self.names(first))
+        self.start("restored")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# Tests of the streamed agent events
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from agent.event_sink import NullSink
+from agent.interface import UserInterface
+from agent.main import CoToolsAgent
+
+
+# Tool decisions per reasoning step: tokens, then a tool call, and the answer at step eight
+DECISIONS = [False, False, False, True, False, True, False, False]
+
+QUERY = "What was the weather in Paris yesterday?"
+
+
+def is_subsequence(items, sequence):
+    remaining = iter(sequence)
+    return all(item in remaining for item in items)
+
+
+class StreamTest(unittest.TestCase):
+    """
+    Check that process_query_stream yields the whole interaction in order.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ, {
+            "DATABASE_PATH": os.path.join(self.temp_dir.name, "agent.db"),
+            "SIMULATE_LATENCY": "False",
+            "SNAPSHOT_ENABLED": "False",
+            "ASYNC_LOGGING": "False"
+        })
+        self.environ.start()
+        self.interface = UserInterface(sinks=[NullSink()])
+        self.agent = CoToolsAgent(interface=self.interface)
+        self.agent.initialize()
+    
+    def tearDown(self):
+        self.environ.stop()
+        self.temp_dir.cleanup()
+    
+    def decide(self):
+        return mock.patch.object(self.agent.tool_judge, "check_tool_needed", side_effect=DECISIONS)
+    
+    def test_event_order(self):
+        with self.decide():
+            events = list(self.agent.process_query_stream(QUERY))
+        types = [event["type"] for event in events]
+        self.assertEqual(events[0], {"type": "query", "content": QUERY})
+        self.assertEqual(types[-1], "result")
+        self.assertEqual(types.count("result"), 1)
+        self.assertEqual(types.count("tool_check"), len(DECISIONS))
+        self.assertEqual(types.count("tool_call"), DECISIONS.count(True))
+        # Every call is announced by its selection and followed by its result
+        for i, event_type in enumerate(types):
+            if event_type == "tool_call":
+                self.assertEqual(types[i - 1], "tool_selection")
+                self.assertEqual(types[i + 2], "tool_result")
+                self.assertEqual(events[i + 2]["content"]["name"], events[i]["content"]["name"])
+        
+        answer = events[-1]["content"]
+        # The answer is made of the streamed tokens and tool results, in order
+        tokens = [event["content"].strip() for event in events if event["type"] == "token"]
+        self.assertTrue(tokens)
+        self.assertTrue(is_subsequence("".join(tokens), "".join(answer.split())))
+        for event in events:
+            if event["type"] == "tool_result":
+                self.assertIn(f"Using a tool, I found: {event['content']['result']}", answer)
+        self.assertTrue(answer.endswith("Paris is the capital of France."))
+        self.assertEqual([tool["name"] for tool in self.agent.tools_used],
+                         [event["content"]["name"] for event in events if event["type"] == "tool_call"])
+    
+    def test_events_are_yielded_lazily(self):
+        logs = len(self.agent.db.get_logs())
+        with self.decide():
+            stream = self.agent.process_query_stream(QUERY)
+            self.assertEqual(next(stream)["type"], "query")
+            self.assertEqual(len(self.agent.db.get_logs()), logs)
+            # An abandoned stream logs nothing
+            stream.close()
+        self.assertEqual(len(self.agent.db.get_logs()), logs)
+        
+        with self.decide():
+            answer = list(self.agent.process_query_stream(QUERY))[-1]["content"]
+        log = self.agent.db.get_logs(limit=1)[0]
+        self.assertEqual((log["user_query"], log["agent_response"]), (QUERY, answer))
+    
+    def test_process_query_forwards_the_stream(self):
+        with self.decide():
+            events = list(self.agent.process_query_stream(QUERY))
+        with self.decide():
+            answer = self.agent.process_query(QUERY)
+        self.assertEqual(answer, events[-1]["content"])
+        # Judge scores vary between runs; everything else is replayed to the interface
+        history = self.interface.get_history()
+        self.assertEqual([event["type"] for event in history], [event["type"] for event in events])
+        self.assertEqual([event for event in history if event["type"] != "tool_check"],
+                         [event for event in events if event["type"] != "tool_check"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# Tests of the tool catalog's vector index
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from agent.database import AgentDatabase
+from agent.tool_database import ToolDatabase
+from agent.tool_registry import ToolRegistry
+from agent.tools.tool_encoder import ToolEncoder
+
+
+def unit_vector(rng, dimension):
+    vector = rng.standard_normal(dimension)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class ToolDatabaseDimensionTest(unittest.TestCase):
+    """
+    Check that a catalog holding vectors of another dimension still serves queries.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+        rng = np.random.default_rng(3)
+        # A catalog encoded at 768 dimensions, with a few tools added later at 384
+        self.db.add_tools(
+            [(f"Tool{i}", f"Tool number {i}", unit_vector(rng, 768), "test") for i in range(20)]
+            + [(f"Small{i}", f"Small tool {i}", unit_vector(rng, 384), "test") for i in range(5)]
+        )
+        self.query = unit_vector(rng, 384)
+    
+    def tearDown(self):
+        self.db.disconnect()
+        self.temp_dir.cleanup()
+    
+    def open(self, tool_encoder):
+        tool_db = ToolDatabase(None, tool_encoder, db=self.db, registry=ToolRegistry())
+        tool_db.initialize()
+        return tool_db
+    
+    def test_mismatched_vectors_are_reencoded(self):
+        tool_db = self.open(ToolEncoder(embedding_dim=384))
+        results = tool_db.find_similar_tools(self.query, k=1000)
+        self.assertEqual(len(results), len(tool_db.tools))
+        self.assertEqual(len(tool_db.get_tool_vector(results[0][0])), 384)
+        tool_id, _ = tool_db.find_similar_tool(self.query, category="test")
+        self.assertIsNotNone(tool_id)
+    
+    def test_mismatched_vectors_are_skipped_without_encoder(self):
+        tool_db = self.open(None)
+        # The first vectors indexed set the dimension
+        results = tool_db.find_similar_tools([0.0] * 768, k=1000)
+        names = sorted(tool_db.get_tool(tool_id)["name"] for tool_id, _ in results)
+        self.assertEqual(names, sorted(f"Tool{i}" for i in range(20)))
+        with self.assertRaisesRegex(ValueError, "384 dimensions"):
+            tool_db.find_similar_tool(self.query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+# Tests of bulk tool catalog ingestion
+
+import os
+import tempfile
+import unittest
+
+from agent.database import AgentDatabase
+from agent.tool_ingest import ingest_tools
+
+
+class IngestDimensionTest(unittest.TestCase):
+    """
+    Check that ingestion refuses to mix vector dimensions in one catalog.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = AgentDatabase(os.path.join(self.temp_dir.name, "agent.db"))
+        self.db.initialize_database()
+    
+    def tearDown(self):
+        self.db.disconnect()
+        self.temp_dir.cleanup()
+    
+    def tools(self, prefix, count=3):
+        return [{"name": f"{prefix}{i}", "description": f"{prefix} tool {i}", "category": "test"}
+                for i in range(count)]
+    
+    def test_mixed_dimensions_are_rejected(self):
+        self.assertIsNone(self.db.get_tool_vector_dimension())
+        self.assertEqual(ingest_tools(self.db, self.tools("Big"), workers=0, embedding_dim=64), 3)
+        self.assertEqual(self.db.get_tool_vector_dimension(), 64)
+        
+        with self.assertRaisesRegex(ValueError, "64-dimensional"):
+            ingest_tools(self.db, self.tools("Small"), workers=0, embedding_dim=32)
+        self.assertEqual(len(self.db.get_all_tools()), 3)
+        
+        self.assertEqual(ingest_tools(self.db, self.tools("More"), workers=0, embedding_dim=64), 3)
+        self.assertEqual({len(tool["vector_data"]) for tool in self.db.get_all_tools()}, {64})
+
+
+if __name__ == "__main__":
+    unittest.main()
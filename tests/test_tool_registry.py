@@ -0,0 +1,78 @@
+# Tests of the lazy tool registry
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from agent.tool_registry import TOOL_REGISTRY, ToolRegistry
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_MODULES = sorted({entry["target"].split(":")[0] for entry in TOOL_REGISTRY.values()})
+
+
+def loaded_tool_modules(script, **environ):
+    """
+    Run a script in a fresh interpreter and list the tool modules it imported.
+    """
+    code = (
+        "import json, sys\n"
+        f"{script}\n"
+        f"print(json.dumps(sorted(set({TOOL_MODULES!r}) & set(sys.modules))))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=dict(os.environ, **environ),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class ToolRegistryTest(unittest.TestCase):
+    """
+    Check that tool modules are only imported when a tool is first used.
+    """
+    
+    def test_importing_the_agent_loads_no_tools(self):
+        self.assertEqual(loaded_tool_modules("import agent.main"), [])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            script = (
+                "from agent.main import CoToolsAgent\n"
+                "agent = CoToolsAgent()\n"
+                "agent.initialize()\n"
+                "agent.tools.metadata()"
+            )
+            self.assertEqual(loaded_tool_modules(script, DATABASE_PATH=os.path.join(temp_dir, "agent.db"),
+                                                 SIMULATE_LATENCY="False", ASYNC_LOGGING="False"), [])
+    
+    def test_get_imports_on_first_use(self):
+        script = (
+            "from agent.tool_registry import ToolRegistry\n"
+            "registry = ToolRegistry()\n"
+            "assert not registry.is_loaded('WebSearch')\n"
+            "tool = registry.get('WebSearch')\n"
+            "assert registry.is_loaded('WebSearch') and registry.get('WebSearch') is tool\n"
+            "assert not registry.is_loaded('CalculatorAPI')"
+        )
+        self.assertEqual(loaded_tool_modules(script), ["agent.tools.web_tools"])
+    
+    def test_registered_tools(self):
+        registry = ToolRegistry({})
+        registry.register("Echo", "collections:OrderedDict", "get", "Echo a value.", "test", ["key"])
+        self.assertIn("Echo", registry)
+        self.assertEqual(registry.metadata("Echo")["parameters"], ["key"])
+        self.assertFalse(registry.is_loaded("Echo"))
+        first = registry.get("Echo")
+        self.assertIs(registry.get("Echo"), first)
+        # Registering again replaces the loaded instance
+        registry.register("Echo", "collections:OrderedDict", "get", "Echo a value.")
+        self.assertFalse(registry.is_loaded("Echo"))
+        self.assertIsNot(registry.get("Echo"), first)
+        self.assertIsNone(registry.get("Missing"))
+        with self.assertRaisesRegex(ValueError, "module:Class"):
+            registry.register("Bad", "collections.OrderedDict", "get", "Bad target.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# Tests of span tracing
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from agent import tracing
+from agent.server import create_headless_agent
+from tests.test_server import ServerThread
+
+
+class TracerTest(unittest.TestCase):
+    """
+    Check span nesting, attributes and exporters.
+    """
+    
+    def setUp(self):
+        self.collector = tracing.InMemoryCollector()
+        tracing.configure_tracing(self.collector)
+    
+    def tearDown(self):
+        tracing.configure_tracing(None)
+    
+    def test_nesting_and_attributes(self):
+        with tracing.span("outer", size=3) as outer:
+            with tracing.span("inner") as inner:
+                inner.set_attribute("result", "ok")
+            self.assertIs(tracing.get_tracer().current_span(), outer)
+        
+        inner, outer = self.collector.get_spans()
+        self.assertEqual((inner["name"], outer["name"]), ("inner", "outer"))
+        self.assertEqual(inner["parent_id"], outer["span_id"])
+        self.assertEqual(inner["trace_id"], outer["trace_id"])
+        self.assertIsNone(outer["parent_id"])
+        self.assertEqual(outer["attributes"], {"size": 3})
+        self.assertEqual(inner["attributes"], {"result": "ok"})
+        self.assertGreaterEqual(outer["duration_ms"], inner["duration_ms"])
+        self.assertIsNone(tracing.get_tracer().current_span())
+    
+    def test_errors_are_recorded(self):
+        with self.assertRaises(KeyError):
+            with tracing.span("failing"):
+                raise KeyError("missing")
+        self.assertEqual(self.collector.get_spans("failing")[0]["attributes"]["error"], "KeyError: 'missing'")
+    
+    def test_threads_have_separate_traces(self):
+        def work(name):
+            with tracing.span(name):
+                with tracing.span(f"{name}.child"):
+                    pass
+        
+        threads = [threading.Thread(target=work, args=(f"thread{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for i in range(8):
+            parent = self.collector.get_spans(f"thread{i}")[0]
+            child = self.collector.get_spans(f"thread{i}.child")[0]
+            self.assertEqual(child["parent_id"], parent["span_id"])
+            self.assertIsNone(parent["parent_id"])
+        self.assertEqual(len({span["trace_id"] for span in self.collector.get_spans()}), 8)
+    
+    def test_disabled_tracing_is_a_noop(self):
+        tracing.configure_tracing(None)
+        with tracing.span("ignored") as span:
+            span.set_attribute("key", "value")
+        self.assertIs(span, tracing.NOOP_SPAN)
+        self.assertEqual(self.collector.get_spans(), [])
+    
+    def test_jsonl_exporter(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "trace.jsonl")
+            exporter = tracing.JsonlExporter(path)
+            tracing.configure_tracing(exporter)
+            with tracing.span("written", count=2):
+                pass
+            exporter.close()
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual([(record["name"], record["attributes"]) for record in records],
+                         [("written", {"count": 2})])
+
+
+class AgentTracingTest(unittest.TestCase):
+    """
+    Check the spans of queries answered by a real agent behind the HTTP front end.
+    """
+    
+    def test_query_spans(self):
+        collector = tracing.InMemoryCollector()
+        tracing.configure_tracing(collector)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            environment = {
+                "DATABASE_PATH": os.path.join(temp_dir, "agent.db"),
+                "SIMULATE_LATENCY": "False",
+                "SNAPSHOT_ENABLED": "False",
+                "ASYNC_LOGGING": "False"
+            }
+            with mock.patch.dict(os.environ, environment):
+                server = ServerThread(max_concurrency=2, agent_factory=create_headless_agent)
+            try:
+                collector.clear()
+                results = []
+                threads = [
+                    threading.Thread(target=lambda q=query: results.append(server.request("GET", f"/query?q={q}")))
+                    for query in ("capital+of+France", "weather+in+Paris")
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(60)
+            finally:
+                server.close()
+                tracing.configure_tracing(None)
+        
+        self.assertEqual([status for status, _, _ in results], [200, 200])
+        queries = collector.get_spans("process_query")
+        self.assertEqual(len(queries), 2)
+        spans = collector.get_spans()
+        by_id = {span["span_id"]: span for span in spans}
+        for query in queries:
+            steps = [span for span in spans if span["parent_id"] == query["span_id"]]
+            self.assertIn("reasoning_step", {span["name"] for span in steps})
+            self.assertTrue(all(span["trace_id"] == query["trace_id"] for span in steps))
+        # Every span of a query belongs to that query's trace, even with queries running concurrently
+        for span in spans:
+            if span["parent_id"] is not None:
+                self.assertEqual(span["trace_id"], by_id[span["parent_id"]]["trace_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# Tests of the offline weather store
+
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from agent.tools.weather_store import WeatherStore, to_epoch_seconds
+
+
+DAY = 86400
+FIRST_DAY = to_epoch_seconds("2024-06-01")
+
+
+class WeatherStoreTest(unittest.TestCase):
+    """
+    Compare batched and single-range aggregates against plain NumPy reductions.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(6)
+        cls.stations = [
+            {"id": "PAR", "name": "Paris", "aliases": ["Paris, France"]},
+            {"id": "LON", "name": "London"},
+            {"id": "NYC", "name": "New York", "aliases": ["NY"]},
+            {"id": "TOK", "name": "Tokyo"},
+            {"id": "EMP", "name": "Empty Station"}
+        ]
+        cls.series = {}
+        for station in cls.stations[:4]:
+            # Irregular observations over ten days, given out of order
+            times = FIRST_DAY + np.sort(rng.choice(10 * DAY, size=rng.integers(50, 400), replace=False))
+            times = rng.permutation(times)
+            temperature = rng.normal(20, 5, len(times)).astype(np.float32)
+            humidity = rng.uniform(30, 90, len(times)).astype(np.float32)
+            cls.series[station["id"]] = {"time": times, "temperature": temperature, "humidity": humidity}
+        # Missing readings at one station
+        cls.series["LON"]["humidity"][::17] = np.nan
+        
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        WeatherStore.write(cls.temp_dir.name, cls.stations, cls.series, {"temperature": "°C", "humidity": "%"})
+        cls.store = WeatherStore(cls.temp_dir.name)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+    
+    def expected(self, location, start, end, variable):
+        station = next((station for station in self.stations
+                        if location in (station["id"], station["name"], *station.get("aliases", []))), None)
+        data = self.series.get(station["id"]) if station else None
+        if data is None:
+            values = np.empty(0)
+        else:
+            inside = (data["time"] >= to_epoch_seconds(start)) & (data["time"] < to_epoch_seconds(end))
+            values = data[variable][inside].astype(np.float64)
+        if len(values) == 0:
+            return {"mean": np.nan, "min": np.nan, "max": np.nan, "sum": np.nan, "count": 0}
+        return {"mean": values.mean(), "min": values.min(), "max": values.max(), "sum": values.sum(),
+                "count": len(values)}
+    
+    def check(self, locations, start, end):
+        stats = ("mean", "min", "max", "sum", "count")
+        result = self.store.aggregate(locations, start, end, stats=stats)
+        self.assertEqual(sorted(result), ["humidity", "temperature"])
+        for variable, values in result.items():
+            for i, location in enumerate(locations):
+                location_start = start[i] if isinstance(start, list) else start
+                location_end = end[i] if isinstance(end, list) else end
+                expected = self.expected(location, location_start, location_end, variable)
+                for stat in stats:
+                    np.testing.assert_allclose(values[stat][i], expected[stat], rtol=1e-9,
+                                               err_msg=f"{variable} {stat} of {location}")
+    
+    def test_dense_ranges(self):
+        # Whole-period ranges at every station are reduced in one batched pass
+        names = ["Paris", "London", "New York", "Tokyo"]
+        self.check(names, "2024-05-30", "2024-06-20")
+        self.check(names[::-1] + ["Paris"], "2024-06-01", "2024-06-09")
+    
+    def test_sparse_ranges(self):
+        # One day at several stations is reduced range by range
+        self.check(["Paris", "London", "NY", "Tokyo"], "2024-06-03", "2024-06-04")
+        self.check(["London"], "2024-06-02 06:00", "2024-06-02 18:30")
+    
+    def test_random_ranges(self):
+        rng = random.Random(9)
+        names = ["Paris", "London", "NYC", "Tokyo", "Paris, France", "Empty Station", "Atlantis"]
+        for _ in range(200):
+            locations = [rng.choice(names) for _ in range(rng.randint(1, 8))]
+            if rng.random() < 0.5:
+                start = FIRST_DAY + rng.randint(-DAY, 10 * DAY)
+                end = start + rng.randint(0, 11 * DAY)
+            else:
+                start = [FIRST_DAY + rng.randint(-DAY, 10 * DAY) for _ in locations]
+                # Some ranges end before they start
+                end = [value + rng.randint(-DAY, 11 * DAY) for value in start]
+            self.check(locations, start, end)
+    
+    def test_empty_and_unknown(self):
+        # An empty range, an unknown location, a station without data and a reversed range
+        result = self.store.aggregate(["Paris", "Atlantis", "Empty Station", "Tokyo"],
+                                      ["2024-06-02", "2024-06-02", "2024-06-02", "2024-06-05"],
+                                      ["2024-06-02", "2024-06-03", "2024-06-03", "2024-06-04"],
+                                      variables=["temperature"], stats=("mean", "count"))
+        self.assertEqual(list(result["temperature"]["count"]), [0, 0, 0, 0])
+        self.assertTrue(np.isnan(result["temperature"]["mean"]).all())
+        
+        # A missing reading makes the statistics of its range NaN
+        london = self.store.aggregate(["London"], "2024-05-01", "2024-07-01", variables=["humidity"])
+        self.assertTrue(np.isnan(london["humidity"]["mean"][0]))
+        
+        with self.assertRaisesRegex(ValueError, "Unknown statistics: median"):
+            self.store.aggregate(["Paris"], "2024-06-01", "2024-06-02", stats=("median",))
+        with self.assertRaises(KeyError):
+            self.store.aggregate(["Paris"], "2024-06-01", "2024-06-02", variables=["wind"])
+    
+    def test_series(self):
+        series = self.store.series("paris, france", "2024-06-02", "2024-06-04", variables=["temperature"])
+        data = self.series["PAR"]
+        inside = (data["time"] >= to_epoch_seconds("2024-06-02")) & (data["time"] < to_epoch_seconds("2024-06-04"))
+        order = np.argsort(data["time"][inside])
+        np.testing.assert_array_equal(series["time"], data["time"][inside][order])
+        np.testing.assert_array_equal(series["temperature"], data["temperature"][inside][order])
+        self.assertIsNone(self.store.series("Atlantis", "2024-06-02", "2024-06-04"))
+
+
+if __name__ == "__main__":
+    unittest.main()